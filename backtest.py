@@ -1,16 +1,26 @@
 import argparse
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import json
+import os
+from contextlib import nullcontext
 from utils.utils import load_data, get_data
-from strategies.trend_following import moving_average_trend_following
-from strategies.buy_and_hold import buy_and_hold
-from strategies.mean_reversion import rsi_strategy, bollinger_band_strategy
-from strategies.pairs_trading import pairs_trading_strategy
+from strategies.registry import STRATEGIES, get_strategy
 from execution.execution import simulate_trades
+from execution.long_short import SIZING_METHODS, simulate_long_short_trades
 from metrics.metrics import calculate_performance_metrics
+from utils.profiling import PeakMemory, Profiler, stage
+from utils.downsample import downsample_series, thin_markers
+from utils.results import RESULTS_DIR, ResultStore, result_key
+
+JOB_KEYS = ('ticker', 'pair_ticker', 'strategy', 'initial_cash', 'short_window', 'long_window',
+            'rsi_period', 'rsi_lower', 'rsi_upper', 'bollinger_window', 'bollinger_std', 'cost_bps',
+            'allow_short', 'sizing', 'fraction', 'target_vol', 'cost_per_share', 'slippage')
 
 def plot_time_series(df, y_column, title, xlabel, ylabel, legend_label):
-    plt.plot(df.index, df[y_column], label=legend_label, color='purple')
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
+    series = downsample_series(df[y_column])
+    plt.plot(series.index, series, label=legend_label, color='purple')
     plt.title(title)
     plt.xlabel(xlabel)
     plt.ylabel(ylabel)
@@ -28,6 +38,8 @@ def plot_signals(df, strategy_choice):
     """
     Plot buy/sell signals based on the strategy used.
     """
+    import matplotlib.pyplot as plt
+
     if strategy_choice == 'trend_following':
         df['Signal_Change'] = df['Signal'].diff()
         buy_signals = df[df['Signal_Change'] == 2]
@@ -41,8 +53,10 @@ def plot_signals(df, strategy_choice):
         buy_signals = df[(df['Signal_Change'] == 1) & (df['Signal'] == 1)]
         sell_signals = df[(df['Signal_Change'] == -1) & (df['Signal'] == -1)]
 
-        plt.plot(df.index, df['Upper_Band'], label='Upper Band', linestyle='--', color='purple')
-        plt.plot(df.index, df['Lower_Band'], label='Lower Band', linestyle='--', color='orange')
+        upper_band = downsample_series(df['Upper_Band'])
+        lower_band = downsample_series(df['Lower_Band'])
+        plt.plot(upper_band.index, upper_band, label='Upper Band', linestyle='--', color='purple')
+        plt.plot(lower_band.index, lower_band, label='Lower Band', linestyle='--', color='orange')
     elif strategy_choice == 'pairs':
         df['Signal_Change'] = df['Signal'].diff()
         buy_signals = df[df['Signal_Change'] == 1]
@@ -51,90 +65,157 @@ def plot_signals(df, strategy_choice):
         buy_signals = df.iloc[[0]]
         sell_signals = df.iloc[[]]
 
+    buy_signals = thin_markers(buy_signals, df.index)
+    sell_signals = thin_markers(sell_signals, df.index)
     plt.scatter(buy_signals.index, buy_signals['Close'], label='Buy Signal', marker='^', color='green', s=100)
     plt.scatter(sell_signals.index, sell_signals['Close'], label='Sell Signal', marker='v', color='red', s=100)
 
-def main():
-    parser = argparse.ArgumentParser(description="Quantitative Strategy Backtester")
-    parser.add_argument('--ticker', type=str, required=True, help='Ticker symbol')
-    parser.add_argument('--pair-ticker', type=str, help='Second ticker for pairs trading')
-    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
-    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
-    parser.add_argument('--strategy', type=str, choices=['trend_following', 'buy_and_hold', 'rsi', 'bollinger', 'pairs'], default='trend_following')
-    parser.add_argument('--initial-cash', type=float, default=10000)
-    parser.add_argument('--short-window', type=int, default=10)
-    parser.add_argument('--long-window', type=int, default=30)
-    parser.add_argument('--rsi-period', type=int, default=14)
-    parser.add_argument('--rsi-lower', type=int, default=30)
-    parser.add_argument('--rsi-upper', type=int, default=70)
-    parser.add_argument('--bollinger-window', type=int, default=20,
-                        help='Window size for Bollinger Bands (default: 20)')
-    parser.add_argument('--bollinger-std', type=float, default=2.0,
-                        help='Standard deviation multiplier for Bollinger Bands (default: 2.0)')
-    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+def strategy_kwargs(job):
+    """
+    Keyword arguments of the job's strategy function, taken from its CLI parameters.
+    """
+    if job['strategy'] == 'trend_following':
+        return {'short_window': job['short_window'], 'long_window': job['long_window']}
+    if job['strategy'] == 'rsi':
+        return {'period': job['rsi_period'], 'lower': job['rsi_lower'], 'upper': job['rsi_upper']}
+    if job['strategy'] == 'bollinger':
+        return {'window': job['bollinger_window'], 'num_std': job['bollinger_std']}
+    return {}
 
-    args = parser.parse_args()
+def execution_kwargs(job):
+    """
+    Options of the long/short kernel for the job, or None for the default long/flat simulation.
+    """
+    kwargs = {'allow_short': job.get('allow_short', False), 'sizing': job.get('sizing', 'fixed'),
+              'fraction': job.get('fraction', 1.0), 'target_vol': job.get('target_vol', 0.15),
+              'cost_per_share': job.get('cost_per_share', 0.0), 'slippage': job.get('slippage', 0.0)}
+    if (not kwargs['allow_short'] and kwargs['sizing'] == 'fixed' and kwargs['fraction'] == 1
+            and not kwargs['cost_per_share'] and not kwargs['slippage']):
+        return None
+    return kwargs
 
-    if args.strategy == 'pairs':
-        print(f"Checking data for {args.ticker}...")
-        print(f"Checking data for {args.pair_ticker}...")
-        get_data([args.ticker, args.pair_ticker], args.start, args.end)
-        print(f"Loading data for {args.ticker}...")
-        print(f"Loading data for {args.pair_ticker}...")
-        df1 = load_data(args.ticker, args.start, args.end)
-        df2 = load_data(args.pair_ticker, args.start, args.end)
-    else:
-        print(f"Checking data for {args.ticker}...")
-        get_data([args.ticker], args.start, args.end)
-        print(f"Loading data for {args.ticker}...")
-        df = load_data(args.ticker, args.start, args.end)
-
-    print("Running strategy...")
-    if args.strategy == 'trend_following':
-        df = moving_average_trend_following(df, short_window=args.short_window, long_window=args.long_window)
-    elif args.strategy == 'buy_and_hold':
-        df = buy_and_hold(df)
-    elif args.strategy == 'rsi':
-        df = rsi_strategy(df, period=args.rsi_period, lower=args.rsi_lower, upper=args.rsi_upper)
-    elif args.strategy == 'bollinger':
-        df = bollinger_band_strategy(df, window=args.bollinger_window, num_std=args.bollinger_std)
-    elif args.strategy == 'pairs':
-        df = pairs_trading_strategy(df1, df2)
+def job_label(job):
+    if job['strategy'] == 'pairs':
+        return f"{job['ticker']}_{job['pair_ticker']}_{job['strategy']}"
+    return f"{job['ticker']}_{job['strategy']}"
+
+def run_backtest(job, frames, results=None):
+    """
+    Run one ticker/strategy job: strategy, trade simulation and metrics.
+
+    Parameters:
+        job (dict): Ticker, strategy and parameters, keyed like the CLI options
+        frames (dict): Ticker -> loaded OHLCV DataFrame, shared across jobs
+        results (ResultStore): Optional store to serve the run from, or to add it to
+
+    Returns:
+        tuple: (DataFrame with signals and 'Portfolio Value', metrics dict)
+    """
+    pair = job['strategy'] == 'pairs'
+    inputs = [frames[job['ticker']]] + ([frames[job['pair_ticker']]] if pair else [])
+    if results is not None:
+        key = result_key(inputs, job['strategy'], strategy_kwargs(job), job['initial_cash'],
+                         job['cost_bps'], execution_kwargs(job))
+        stored = results.get(key)
+        if stored is not None:
+            print(f"Loaded stored result of {job['strategy']} on {job['ticker']}")
+            return stored
+
+    print(f"Running {job['strategy']} on {job['ticker']}...")
+    strategy = get_strategy(job['strategy'])
+    df = strategy(*inputs, **strategy_kwargs(job))
 
     print("Simulating trades...")
-    df = simulate_trades(df, initial_cash=args.initial_cash, cost_bps=args.cost_bps)
+    # The strategy returned a frame of its own, so the simulation can add to it.
+    kwargs = execution_kwargs(job)
+    if kwargs is None:
+        df = simulate_trades(df, initial_cash=job['initial_cash'], cost_bps=job['cost_bps'], copy=False)
+    else:
+        df = simulate_long_short_trades(df, initial_cash=job['initial_cash'], cost_bps=job['cost_bps'],
+                                        copy=False, **kwargs)
 
     print("Calculating performance metrics...")
     metrics = calculate_performance_metrics(df)
-    print("\n--- Performance Metrics ---")
-    for k, v in metrics.items():
-        print(f"{k}: {v}")
+    if results is not None:
+        results.put(key, df, metrics, ticker=job['ticker'], pair_ticker=job['pair_ticker'] if pair else None,
+                    strategy=job['strategy'], params=strategy_kwargs(job), initial_cash=job['initial_cash'],
+                    cost_bps=job['cost_bps'], execution=kwargs)
+    return df, metrics
+
+def write_results(df, metrics, job, output_dir):
+    """
+    Write a job's metrics as JSON and its equity curve as CSV into output_dir.
+    """
+    label = job_label(job)
+    with open(os.path.join(output_dir, f"{label}_metrics.json"), 'w') as f:
+        json.dump({'job': job, 'metrics': metrics}, f, indent=2, default=float)
+    columns = [c for c in ('Close', 'Signal', 'Portfolio Value') if c in df.columns]
+    df[columns].to_csv(os.path.join(output_dir, f"{label}_equity.csv"), index_label='Date')
+
+def plot_job(df, job, output_dir=None):
+    """
+    Plot signals and portfolio value of a job; save PNGs to output_dir or show them interactively.
+    """
+    import matplotlib.pyplot as plt
 
+    label = job_label(job)
     print("Plotting results...")
+    with stage('plot'):
+        plot_results(df, job)
+    if output_dir:
+        plt.savefig(os.path.join(output_dir, f"{label}_signals.png"))
+        plt.close()
+    else:
+        plt.show()
+
+    print("Plotting portfolio performance...")
+    if job['strategy'] == 'pairs':
+        title = f"{job['ticker']} & {job['pair_ticker']} - Portfolio Value Over Time"
+    else:
+        title = f"{job['ticker']} - Portfolio Value Over Time"
+
+    with stage('plot'):
+        plot_time_series(df, 'Portfolio Value', title, "Date", "Portfolio Value ($)", "Portfolio Value")
+    if output_dir:
+        plt.savefig(os.path.join(output_dir, f"{label}_portfolio.png"))
+        plt.close()
+    else:
+        plt.show()
+
+def plot_results(df, job):
+    """
+    Draw prices, strategy overlays and buy/sell signals for a backtest run.
+    """
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
     plt.figure(figsize=(14, 6))
-    plt.plot(df.index, df['Close'], label='Price', alpha=0.6)
+    price = downsample_series(df['Close'])
+    plt.plot(price.index, price, label='Price', alpha=0.6)
 
     if 'SMA_Short' in df.columns:
-        plt.plot(df.index, df['SMA_Short'], label='Short MA', linestyle='--')
+        sma_short = downsample_series(df['SMA_Short'])
+        plt.plot(sma_short.index, sma_short, label='Short MA', linestyle='--')
     if 'SMA_Long' in df.columns:
-        plt.plot(df.index, df['SMA_Long'], label='Long MA', linestyle='--')
+        sma_long = downsample_series(df['SMA_Long'])
+        plt.plot(sma_long.index, sma_long, label='Long MA', linestyle='--')
 
-    plot_signals(df, args.strategy)
+    plot_signals(df, job['strategy'])
 
     ax = plt.gca()
     ax.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
     plt.xticks(rotation=45)
 
-    strategy_title = args.strategy.replace('_', ' ').title()
-    if args.strategy == 'pairs':
-        title = f"{args.ticker} & {args.pair_ticker} - {strategy_title} Strategy with Signals"
+    strategy_title = job['strategy'].replace('_', ' ').title()
+    if job['strategy'] == 'pairs':
+        title = f"{job['ticker']} & {job['pair_ticker']} - {strategy_title} Strategy with Signals"
     else:
-        title = f"{args.ticker} - {strategy_title} Strategy with Signals"
+        title = f"{job['ticker']} - {strategy_title} Strategy with Signals"
     plt.title(title)
     plt.xlabel("Date")
-    if args.strategy == 'pairs':
-        plt.ylabel(f"Spread: {args.ticker} - {args.pair_ticker}")
+    if job['strategy'] == 'pairs':
+        plt.ylabel(f"Spread: {job['ticker']} - {job['pair_ticker']}")
     else:
         plt.ylabel("Price")
     plt.legend()
@@ -142,16 +223,147 @@ def main():
     valid_range = df.dropna(subset=['Close']).index
     plt.xlim(valid_range.min(), valid_range.max())
     plt.tight_layout()
-    plt.show()
 
-    print("Plotting portfolio performance...")
-    if args.strategy == 'pairs':
-        title = f"{args.ticker} & {args.pair_ticker} - Portfolio Value Over Time"
-    else:
-        title = f"{args.ticker} - Portfolio Value Over Time"
+def build_jobs(args):
+    """
+    Expand the CLI options and an optional jobs file into a list of job dicts.
+
+    Every --ticker is combined with every --strategy. Each line of the jobs
+    file is a JSON object overriding any of the CLI options for one job.
+    """
+    defaults = {key: getattr(args, key) for key in JOB_KEYS if key not in ('ticker', 'strategy')}
+    jobs = [dict(defaults, ticker=ticker, strategy=strategy)
+            for ticker in (args.ticker or []) for strategy in args.strategy]
+
+    if args.jobs_file:
+        with open(args.jobs_file) as f:
+            for line in f:
+                if line.strip():
+                    override = json.loads(line)
+                    unknown = set(override) - set(JOB_KEYS)
+                    if unknown:
+                        raise ValueError(f"Unknown job keys in {args.jobs_file}: {sorted(unknown)}")
+                    jobs.append({**defaults, 'strategy': args.strategy[0], **override})
+
+    for job in jobs:
+        if job['strategy'] == 'pairs' and not job.get('pair_ticker'):
+            raise ValueError(f"Pairs job for {job['ticker']} needs a pair ticker")
+    return jobs
+
+def run_jobs(args):
+    """
+    Run every job in one process, loading each ticker's data only once.
+    """
+    jobs = build_jobs(args)
+    tickers = list(dict.fromkeys(
+        t for job in jobs for t in (job['ticker'], job['pair_ticker'] if job['strategy'] == 'pairs' else None) if t))
+
+    print(f"Checking data for {', '.join(tickers)}...")
+    get_data(tickers, args.start, args.end)
+    frames = {}
+    for ticker in tickers:
+        print(f"Loading data for {ticker}...")
+        frames[ticker] = load_data(ticker, args.start, args.end, lean=args.lean)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    results = None if args.no_results else ResultStore(args.results_dir, max_bytes=args.results_max_mb * 1024 ** 2)
+
+    summary = {}
+    for job in jobs:
+        with PeakMemory() as memory:
+            df, metrics = run_backtest(job, frames, results)
+        summary[job_label(job)] = metrics
+
+        print("\n--- Performance Metrics ---")
+        for k, v in metrics.items():
+            print(f"{k}: {v}")
+        print(f"Peak memory: {memory}")
+
+        if args.output_dir:
+            write_results(df, metrics, job, args.output_dir)
+        if not args.no_plot:
+            plot_job(df, job, args.output_dir)
+
+    if args.output_dir and len(jobs) > 1:
+        import pandas as pd
+
+        summary_path = os.path.join(args.output_dir, 'summary.csv')
+        pd.DataFrame(summary).T.to_csv(summary_path, index_label='Job')
+        print(f"Saved summary to {summary_path}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantitative Strategy Backtester")
+    parser.add_argument('--ticker', type=str, nargs='+', help='Ticker symbol(s)')
+    parser.add_argument('--pair-ticker', type=str, help='Second ticker for pairs trading')
+    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--strategy', type=str, nargs='+', choices=list(STRATEGIES), default=['trend_following'],
+                        help='Strategy or strategies; every ticker is run with each of them')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--short-window', type=int, default=10)
+    parser.add_argument('--long-window', type=int, default=30)
+    parser.add_argument('--rsi-period', type=int, default=14)
+    parser.add_argument('--rsi-lower', type=int, default=30)
+    parser.add_argument('--rsi-upper', type=int, default=70)
+    parser.add_argument('--bollinger-window', type=int, default=20,
+                        help='Window size for Bollinger Bands (default: 20)')
+    parser.add_argument('--bollinger-std', type=float, default=2.0,
+                        help='Standard deviation multiplier for Bollinger Bands (default: 2.0)')
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--allow-short', action='store_true',
+                        help='Trade -1 signals as shorts instead of only closing longs')
+    parser.add_argument('--sizing', type=str, choices=SIZING_METHODS, default='fixed',
+                        help='Position size: a fixed fraction of equity, or volatility-targeted')
+    parser.add_argument('--fraction', type=float, default=1.0, help='Fraction of equity per entry with fixed sizing')
+    parser.add_argument('--target-vol', type=float, default=0.15,
+                        help='Annualised volatility target with volatility sizing (default: 0.15)')
+    parser.add_argument('--cost-per-share', type=float, default=0.0, help='Transaction cost per share traded')
+    parser.add_argument('--slippage', type=float, default=0.0,
+                        help='Fraction of the bar high-low range lost on every fill (needs OHLC, not --lean)')
+    parser.add_argument('--jobs-file', type=str,
+                        help='JSON-lines file of extra jobs, each overriding options, e.g. {"ticker": "MSFT", "strategy": "rsi"}')
+    parser.add_argument('--no-plot', action='store_true', help='Skip plotting (no matplotlib import)')
+    parser.add_argument('--lean', action='store_true',
+                        help='Load only Close prices, as float32, to cut memory on large runs')
+    parser.add_argument('--output-dir', type=str,
+                        help='Write metrics JSON, equity curve CSV and plots (as PNG) here instead of showing them')
+    parser.add_argument('--results-dir', type=str, default=RESULTS_DIR,
+                        help=f'Store of earlier runs; identical runs are loaded from it (default: {RESULTS_DIR})')
+    parser.add_argument('--results-max-mb', type=float, default=1024,
+                        help='Size budget of the result store; least recently used runs are evicted (default: 1024)')
+    parser.add_argument('--no-results', action='store_true', help='Neither read nor write the result store')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record wall/CPU time, peak RSS and rows per stage and write them as JSON')
+    parser.add_argument('--profile-detail', action='store_true',
+                        help='Also capture cProfile and tracemalloc snapshots of the slowest stage (implies --profile)')
+    parser.add_argument('--profile-output', type=str,
+                        help='Path of the profile JSON (default: backtest_profile.json, in --output-dir if given)')
+
+    args = parser.parse_args()
+    if not args.ticker and not args.jobs_file:
+        parser.error('Provide --ticker and/or --jobs-file')
+    if args.lean and args.slippage:
+        parser.error('--slippage needs the High and Low columns, which --lean does not load')
+
+    if args.output_dir and not args.no_plot:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    profiler = None
+    if args.profile or args.profile_detail:
+        profiler = Profiler(detail=args.profile_detail)
+
+    with profiler or nullcontext():
+        run_jobs(args)
 
-    plot_time_series(df, 'Portfolio Value', title, "Date", "Portfolio Value ($)", "Portfolio Value")
-    plt.show()
+    if profiler is not None:
+        print("\n--- Stage Profile ---")
+        print(profiler.summary())
+        profile_path = args.profile_output or os.path.join(args.output_dir or '.', 'backtest_profile.json')
+        profiler.write(profile_path)
+        print(f"Saved profile to {profile_path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,183 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from utils.utils import load_data
+from utils.synthetic import generate_ohlcv, generate_universe, write_csv
+from utils.cache import indicator_cache
+from strategies.trend_following import moving_average_trend_following
+from strategies.buy_and_hold import buy_and_hold
+from strategies.mean_reversion import rsi_strategy, bollinger_band_strategy
+from strategies.pairs_trading import pairs_trading_strategy
+from execution.execution import simulate_trades
+from execution.long_short import simulate_long_short_trades
+from metrics.metrics import calculate_performance_metrics
+
+def measure(func, repeat=3):
+    """
+    Time a callable and record the peak memory it allocates.
+
+    The timing is the best of `repeat` untraced runs; peak memory comes from
+    one extra run under tracemalloc, which would otherwise slow the timed
+    runs down.
+
+    Returns:
+        tuple: (seconds, peak bytes, result of the last call)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+def uncached(func):
+    """
+    Wrap a strategy call so every run starts from an empty indicator cache.
+    """
+    def run():
+        indicator_cache.clear()
+        return func()
+    return run
+
+def benchmark_pipeline(n_bars, seed=0, repeat=3, regimes=None):
+    """
+    Time every stage of the single-ticker pipeline on synthetic data of one length.
+
+    Returns:
+        list: One dict per stage with 'stage', 'n_bars', 'seconds' and 'peak_bytes'
+    """
+    with tempfile.TemporaryDirectory(prefix='bench_') as data_path:
+        return _benchmark_stages(n_bars, seed, repeat, regimes, data_path)
+
+def _benchmark_stages(n_bars, seed, repeat, regimes, data_path):
+    df = generate_ohlcv(n_bars, seed=seed, regimes=regimes)
+    df_pair = generate_ohlcv(n_bars, seed=seed + 1, regimes=regimes)
+    write_csv(df, 'BENCH', data_path)
+
+    stages = [
+        ('load_data_csv', lambda: load_data('BENCH', data_path=data_path, use_store=False)),
+        ('load_data_store', lambda: load_data('BENCH', data_path=data_path)),
+        ('trend_following', uncached(lambda: moving_average_trend_following(df, short_window=10, long_window=30))),
+        ('buy_and_hold', lambda: buy_and_hold(df)),
+        ('rsi', uncached(lambda: rsi_strategy(df))),
+        ('bollinger', uncached(lambda: bollinger_band_strategy(df))),
+        ('pairs', uncached(lambda: pairs_trading_strategy(df, df_pair))),
+    ]
+
+    results = []
+    outputs = {}
+    for stage, func in stages:
+        seconds, peak, outputs[stage] = measure(func, repeat)
+        results.append({'stage': stage, 'n_bars': n_bars, 'seconds': seconds, 'peak_bytes': peak})
+
+    signals = outputs['trend_following']
+    seconds, peak, simulated = measure(lambda: simulate_trades(signals), repeat)
+    results.append({'stage': 'simulate_trades', 'n_bars': n_bars, 'seconds': seconds, 'peak_bytes': peak})
+
+    seconds, peak, _ = measure(lambda: simulate_long_short_trades(
+        signals, allow_short=True, sizing='volatility', cost_per_share=0.005, slippage=0.1), repeat)
+    results.append({'stage': 'simulate_long_short', 'n_bars': n_bars, 'seconds': seconds, 'peak_bytes': peak})
+
+    seconds, peak, _ = measure(lambda: calculate_performance_metrics(simulated), repeat)
+    results.append({'stage': 'calculate_performance_metrics', 'n_bars': n_bars, 'seconds': seconds, 'peak_bytes': peak})
+    return results
+
+def benchmark_panel(n_tickers, n_bars, seed=0, repeat=3, regimes=None):
+    """
+    Time the dates x tickers panel backtest on a synthetic universe.
+    """
+    from panel_backtest import run_panel
+
+    universe = generate_universe(n_tickers, n_bars, seed=seed, regimes=regimes)
+    prices = pd.concat({ticker: df['Close'] for ticker, df in universe.items()}, axis=1)
+    seconds, peak, _ = measure(lambda: run_panel(prices, 'trend_following', {'short_window': 10, 'long_window': 30}), repeat)
+    return [{'stage': f'panel_trend_following_x{n_tickers}', 'n_bars': n_bars, 'seconds': seconds, 'peak_bytes': peak}]
+
+def compare_to_baseline(results, baseline, threshold=0.25, min_seconds=0.001):
+    """
+    Find stages that got slower or more memory hungry than in a baseline run.
+
+    A stage regresses when its time or peak memory exceeds the baseline by
+    more than `threshold` (a fraction). Timing differences below min_seconds
+    are ignored as noise.
+
+    Returns:
+        list: Human-readable descriptions of the regressions
+    """
+    previous = {(r['stage'], r['n_bars']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get((r['stage'], r['n_bars']))
+        if old is None:
+            continue
+        if r['seconds'] > old['seconds'] * (1 + threshold) and r['seconds'] - old['seconds'] > min_seconds:
+            regressions.append(f"{r['stage']} @ {r['n_bars']} bars: {old['seconds']:.4f}s -> {r['seconds']:.4f}s")
+        if old['peak_bytes'] and r['peak_bytes'] > old['peak_bytes'] * (1 + threshold):
+            regressions.append(f"{r['stage']} @ {r['n_bars']} bars: peak {old['peak_bytes']} -> {r['peak_bytes']} bytes")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage on synthetic data")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000], help='Series lengths in bars (1e3 to 1e7)')
+    parser.add_argument('--tickers', type=int, default=1, help='Also benchmark a panel of this many tickers when > 1')
+    parser.add_argument('--regimes', action='store_true', help='Use regime-switching drift and volatility')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (best is kept)')
+    parser.add_argument('--output', type=str, default='benchmark_results.json', help='Where to write the results')
+    parser.add_argument('--baseline', type=str, help='Earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown as a fraction (default: 0.25)')
+
+    args = parser.parse_args()
+    regimes = [(0.3, 0.15), (-0.2, 0.35), (0.0, 0.1)] if args.regimes else None
+
+    results = []
+    for n_bars in args.sizes:
+        print(f"Benchmarking {n_bars} bars...")
+        results += benchmark_pipeline(n_bars, seed=args.seed, repeat=args.repeat, regimes=regimes)
+        if args.tickers > 1:
+            results += benchmark_panel(args.tickers, n_bars, seed=args.seed, repeat=args.repeat, regimes=regimes)
+
+    print("\n--- Benchmark Results ---")
+    print(pd.DataFrame(results).to_string(index=False))
+
+    report = {
+        'meta': {
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'regimes': regimes,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, threshold=args.threshold)
+        if regressions:
+            print("\n--- Regressions ---")
+            for line in regressions:
+                print(line)
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
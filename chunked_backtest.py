@@ -0,0 +1,113 @@
+import argparse
+import os
+from utils.store import build_store, is_store_current, iter_store, read_store
+from strategies.chunked import ChunkedStrategy, WARMUP_PARAMS
+from execution.streaming import PortfolioState, simulate_chunk
+from metrics.metrics import MetricsAccumulator
+
+def _ensure_store(ticker, data_path, chunk_size):
+    csv_path = os.path.join(data_path, f"{ticker}.csv")
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Data file for {ticker} not found at {csv_path}")
+    if not is_store_current(ticker, data_path):
+        build_store(ticker, data_path, chunk_size=chunk_size)
+
+def run_chunked(ticker, strategy, strategy_params=None, start_date=None, end_date=None, pair_ticker=None,
+                data_path='data', chunk_size=100_000, initial_cash=10000, cost_bps=0.001, output=None):
+    """
+    Backtest one strategy on a history too large to hold in memory.
+
+    Bars are read from the columnar store in blocks of chunk_size rows. Each
+    block goes through the strategy (carrying its indicator windows), the
+    simulation (carrying cash and position) and the metrics (accumulated
+    incrementally), and is then dropped, so peak memory depends on the
+    block size rather than on the length of the history. The metrics match
+    an in-memory backtest of the same range.
+
+    Parameters:
+        ticker (str): Ticker symbol
+        strategy (str): Key of strategies.chunked.WARMUP_PARAMS
+        strategy_params (dict): Keyword arguments for the strategy
+        start_date (str): Optional first date to include
+        end_date (str): Optional last date to include
+        pair_ticker (str): Second ticker, for the pairs strategy
+        data_path (str): Folder where CSV files are stored
+        chunk_size (int): Bars per block
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        output (str): Optional CSV path; the equity curve is appended to it block by block
+
+    Returns:
+        dict: Performance metrics, as from calculate_performance_metrics
+    """
+    tickers = [ticker] + ([pair_ticker] if pair_ticker else [])
+    for name in tickers:
+        _ensure_store(name, data_path, chunk_size)
+
+    chunked = ChunkedStrategy(strategy, **(strategy_params or {}))
+    portfolio = PortfolioState(initial_cash=initial_cash, cost_bps=cost_bps)
+    metrics = MetricsAccumulator()
+    if output and os.path.exists(output):
+        os.remove(output)
+
+    for block in iter_store(ticker, start_date, end_date, data_path, chunk_size, columns=['Close']):
+        if pair_ticker:
+            pair_block = read_store(pair_ticker, block.index[0], block.index[-1], data_path, columns=['Close'])
+            df = chunked.update(block, pair_block)
+        else:
+            df = chunked.update(block)
+        df = simulate_chunk(df, portfolio)
+        metrics.update(df['Portfolio Value'].to_numpy(), df['Exposure'].to_numpy())
+        if output:
+            df[['Close', 'Signal', 'Portfolio Value']].to_csv(
+                output, mode='a', header=not os.path.exists(output), index_label='Date')
+
+    return metrics.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a strategy over a long history in fixed-size blocks")
+    parser.add_argument('--ticker', type=str, required=True,
+                        help='Ticker symbol; bars are read from <data-path>/<ticker>.csv')
+    parser.add_argument('--pair-ticker', type=str, help='Second ticker for pairs trading')
+    parser.add_argument('--start', type=str, help='Optional first date to include')
+    parser.add_argument('--end', type=str, help='Optional last date to include')
+    parser.add_argument('--strategy', type=str, choices=sorted(WARMUP_PARAMS), default='trend_following')
+    parser.add_argument('--data-path', type=str, default='data')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Bars per block (default: 100000)')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--short-window', type=int, default=10)
+    parser.add_argument('--long-window', type=int, default=30)
+    parser.add_argument('--rsi-period', type=int, default=14)
+    parser.add_argument('--rsi-lower', type=int, default=30)
+    parser.add_argument('--rsi-upper', type=int, default=70)
+    parser.add_argument('--bollinger-window', type=int, default=20)
+    parser.add_argument('--bollinger-std', type=float, default=2.0)
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the equity curve')
+
+    args = parser.parse_args()
+
+    if args.strategy == 'trend_following':
+        params = {'short_window': args.short_window, 'long_window': args.long_window}
+    elif args.strategy == 'rsi':
+        params = {'period': args.rsi_period, 'lower': args.rsi_lower, 'upper': args.rsi_upper}
+    elif args.strategy == 'bollinger':
+        params = {'window': args.bollinger_window, 'num_std': args.bollinger_std}
+    else:
+        params = {}
+    if args.strategy == 'pairs' and not args.pair_ticker:
+        parser.error('--pair-ticker is required for the pairs strategy')
+
+    metrics = run_chunked(args.ticker, args.strategy, params, args.start, args.end,
+                          pair_ticker=args.pair_ticker if args.strategy == 'pairs' else None,
+                          data_path=args.data_path, chunk_size=args.chunk_size,
+                          initial_cash=args.initial_cash, cost_bps=args.cost_bps, output=args.output)
+
+    print("\n--- Performance Metrics ---")
+    for k, v in metrics.items():
+        print(f"{k}: {v}")
+    if args.output:
+        print(f"Saved equity curve to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,29 @@
 import argparse
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import os
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from utils.utils import get_data, load_data
-from strategies.trend_following import moving_average_trend_following
-from strategies.buy_and_hold import buy_and_hold
-from strategies.mean_reversion import rsi_strategy, bollinger_band_strategy
-from strategies.pairs_trading import pairs_trading_strategy
+from utils.shared import share_frame, attach_frame, release_blocks
+from utils.cache import indicator_cache
+from utils.profiling import PeakMemory, Profiler, stage
+from utils.downsample import downsample_series
+from utils.results import RESULTS_DIR, ResultStore, result_key
+from strategies.registry import get_strategy, strategy_name
 from execution.execution import simulate_trades
 from metrics.metrics import calculate_performance_metrics
 
-def plot_comparison(df_dict):
+def plot_comparison(df_dict, title="Strategy Comparison - Portfolio Value Over Time", show=True):
     """
     Plot portfolio value comparison across multiple strategies.
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
     plt.figure(figsize=(14, 6))
     for label, df in df_dict.items():
-        plt.plot(df.index, df['Portfolio Value'], label=label)
+        values = downsample_series(df['Portfolio Value'])
+        plt.plot(values.index, values, label=label)
 
     valid_ranges = [df.dropna(subset=['Portfolio Value']).index for df in df_dict.values()]
     common_range = valid_ranges[0]
@@ -26,7 +33,7 @@ def plot_comparison(df_dict):
     if not common_range.empty:
         plt.xlim(common_range.min(), common_range.max())
 
-    plt.title("Strategy Comparison - Portfolio Value Over Time")
+    plt.title(title)
     plt.xlabel("Date")
     plt.ylabel("Portfolio Value ($)")
     plt.legend()
@@ -37,11 +44,167 @@ def plot_comparison(df_dict):
     plt.xticks(rotation=45)
 
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+
+def run_strategy(strategy_func, strategy_kwargs, df, df_pair=None, initial_cash=10000, cost_bps=0.001, full=False):
+    """
+    Run one strategy, simulate it and compute its metrics.
+
+    Returns:
+        tuple: (DataFrame with the 'Portfolio Value' column, or every column
+            if full is set, metrics dict)
+    """
+    if df_pair is not None:
+        df = strategy_func(df, df_pair, **strategy_kwargs)
+    else:
+        df = strategy_func(df, **strategy_kwargs)
+    df = simulate_trades(df, initial_cash=initial_cash, cost_bps=cost_bps, copy=False)
+    return df if full else df[['Portfolio Value']], calculate_performance_metrics(df)
+
+def _run_shared_job(job):
+    strategy_func, strategy_kwargs, handle, pair_handle, initial_cash, cost_bps, full = job
+    df = attach_frame(handle)
+    df_pair = attach_frame(pair_handle) if pair_handle is not None else None
+    return run_strategy(strategy_func, strategy_kwargs, df, df_pair, initial_cash, cost_bps, full)
+
+def run_comparison(frames, jobs, initial_cash=10000, cost_bps=0.001, workers=1, results=None):
+    """
+    Run (ticker, pair ticker, strategy function, kwargs) jobs, optionally on a process pool.
+
+    With more than one worker each input frame is placed in shared memory
+    once and attached by the workers, instead of being pickled per job.
+    Results are returned in job order regardless of completion order.
+
+    Parameters:
+        frames (dict): Ticker -> OHLCV DataFrame
+        jobs (list): (ticker, pair_ticker or None, strategy_func, strategy_kwargs) tuples
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        workers (int): Number of worker processes
+        results (ResultStore): Optional store; stored runs are loaded instead of
+            rerun, and new runs are added to it
+
+    Returns:
+        list: (portfolio value DataFrame, metrics dict) per job
+    """
+    if results is None:
+        return _run_jobs(frames, jobs, initial_cash, cost_bps, workers)
+
+    keys = []
+    outputs = []
+    for ticker, pair, func, kwargs in jobs:
+        inputs = [frames[ticker]] + ([frames[pair]] if pair else [])
+        keys.append(result_key(inputs, strategy_name(func), kwargs, initial_cash, cost_bps))
+        stored = results.get(keys[-1])
+        outputs.append(None if stored is None else (stored[0][['Portfolio Value']], stored[1]))
+
+    pending = [i for i, output in enumerate(outputs) if output is None]
+    if len(pending) < len(jobs):
+        print(f"Loaded {len(jobs) - len(pending)} stored run(s)")
+    computed = _run_jobs(frames, [jobs[i] for i in pending], initial_cash, cost_bps, workers, full=True)
+    for i, (df, metrics) in zip(pending, computed):
+        ticker, pair, func, kwargs = jobs[i]
+        results.put(keys[i], df, metrics, ticker=ticker, pair_ticker=pair, strategy=strategy_name(func),
+                    params=kwargs, initial_cash=initial_cash, cost_bps=cost_bps)
+        outputs[i] = (df[['Portfolio Value']], metrics)
+    return outputs
+
+def _run_jobs(frames, jobs, initial_cash, cost_bps, workers, full=False):
+    if workers <= 1 or not jobs:
+        return [run_strategy(func, kwargs, frames[ticker], frames[pair] if pair else None, initial_cash, cost_bps, full)
+                for ticker, pair, func, kwargs in jobs]
+
+    handles = {}
+    blocks = []
+    try:
+        for ticker, df in frames.items():
+            handles[ticker], frame_blocks = share_frame(df)
+            blocks.extend(frame_blocks)
+
+        shared_jobs = [(func, kwargs, handles[ticker], handles[pair] if pair else None, initial_cash, cost_bps, full)
+                       for ticker, pair, func, kwargs in jobs]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_run_shared_job, shared_jobs))
+    finally:
+        release_blocks(blocks)
+
+def run_compare(args):
+    """
+    Load data, run every strategy on every ticker and report and plot the comparison.
+    """
+    tickers = list(dict.fromkeys(args.ticker))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    print(f"Getting data for {', '.join(tickers)}...")
+    get_data(tickers, args.start, args.end)
+    frames = {ticker: load_data(ticker, args.start, args.end, lean=args.lean) for ticker in tickers}
+
+    if args.pair_ticker:
+        print(f"Getting data for {args.pair_ticker}...")
+        get_data([args.pair_ticker], args.start, args.end)
+        if args.pair_ticker not in frames:
+            frames[args.pair_ticker] = load_data(args.pair_ticker, args.start, args.end, lean=args.lean)
+
+    strategy_specs = [
+        ('Moving Average Trend Following', get_strategy('trend_following'),
+         {'short_window': args.short_window, 'long_window': args.long_window}),
+        ('Buy and Hold', get_strategy('buy_and_hold'), {}),
+        ('RSI Strategy', get_strategy('rsi'),
+         {'period': args.rsi_period, 'lower': args.rsi_lower, 'upper': args.rsi_upper}),
+        ('Bollinger Bands', get_strategy('bollinger'),
+         {'window': args.bollinger_window, 'num_std': args.bollinger_std}),
+    ]
+
+    labels = []
+    jobs = []
+    for ticker in tickers:
+        for name, strategy_func, strategy_kwargs in strategy_specs:
+            labels.append((ticker, name))
+            jobs.append((ticker, None, strategy_func, strategy_kwargs))
+        if args.pair_ticker:
+            labels.append((ticker, 'Pairs Trading'))
+            jobs.append((ticker, args.pair_ticker, get_strategy('pairs'), {}))
+
+    print(f"\nRunning {len(jobs)} strategy runs on {args.workers} worker(s)...")
+    results = None if args.no_results else ResultStore(args.results_dir, max_bytes=args.results_max_mb * 1024 ** 2)
+    outputs = run_comparison(frames, jobs, initial_cash=args.initial_cash,
+                             cost_bps=args.cost_bps, workers=args.workers, results=results)
+    if args.workers <= 1:
+        stats = indicator_cache.stats()
+        print(f"Indicator cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+
+    for ticker in tickers:
+        results = {}
+        metrics_summary = {}
+        for (label_ticker, name), (df, metrics) in zip(labels, outputs):
+            if label_ticker == ticker:
+                results[name] = df
+                metrics_summary[name] = metrics
+
+        print(f"\n--- Performance Comparison: {ticker} ---")
+        metrics_df = pd.DataFrame(metrics_summary).T
+        print(metrics_df)
+
+        if args.output_dir:
+            metrics_df.to_csv(os.path.join(args.output_dir, f"{ticker}_comparison_metrics.csv"), index_label='Strategy')
+            equity = pd.DataFrame({name: df['Portfolio Value'] for name, df in results.items()})
+            equity.to_csv(os.path.join(args.output_dir, f"{ticker}_comparison_equity.csv"), index_label='Date')
+
+        if not args.no_plot:
+            import matplotlib.pyplot as plt
+
+            with stage('plot'):
+                plot_comparison(results, title=f"{ticker} - Strategy Comparison - Portfolio Value Over Time", show=False)
+            if args.output_dir:
+                plt.savefig(os.path.join(args.output_dir, f"{ticker}_comparison.png"))
+                plt.close()
+            else:
+                plt.show()
 
 def main():
     parser = argparse.ArgumentParser(description="Compare performance of multiple trading strategies")
-    parser.add_argument('--ticker', type=str, help='Ticker symbol', default='AAPL')
+    parser.add_argument('--ticker', type=str, nargs='+', help='Ticker symbol(s)', default=['AAPL'])
     parser.add_argument('--pair-ticker', type=str, help='Second ticker for pairs trading')
     parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
     parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
@@ -54,52 +217,45 @@ def main():
     parser.add_argument('--bollinger-window', type=int, default=20)
     parser.add_argument('--bollinger-std', type=float, default=2.0)
     parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for running strategies in parallel (default: 1)')
+    parser.add_argument('--no-plot', action='store_true', help='Skip plotting (no matplotlib import)')
+    parser.add_argument('--lean', action='store_true',
+                        help='Load only Close prices, as float32, to cut memory on large runs')
+    parser.add_argument('--output-dir', type=str,
+                        help='Write metrics and equity curves as CSV and plots as PNG here instead of showing them')
+    parser.add_argument('--results-dir', type=str, default=RESULTS_DIR,
+                        help=f'Store of earlier runs; identical runs are loaded from it (default: {RESULTS_DIR})')
+    parser.add_argument('--results-max-mb', type=float, default=1024,
+                        help='Size budget of the result store; least recently used runs are evicted (default: 1024)')
+    parser.add_argument('--no-results', action='store_true', help='Neither read nor write the result store')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-stage wall/CPU time, peak RSS and rows (stages inside workers are not captured)')
+    parser.add_argument('--profile-detail', action='store_true',
+                        help='Also capture cProfile and tracemalloc snapshots of the slowest stage (implies --profile)')
+    parser.add_argument('--profile-output', type=str,
+                        help='Path of the profile JSON (default: compare_profile.json, in --output-dir if given)')
 
     args = parser.parse_args()
 
-    print(f"Getting data for {args.ticker}...")
-    get_data([args.ticker], args.start, args.end)
-
-    df_main = load_data(args.ticker, args.start, args.end)
-
-    if args.pair_ticker:
-        print(f"Getting data for {args.pair_ticker}...")
-        get_data([args.pair_ticker], args.start, args.end)
-        df_pair = load_data(args.pair_ticker, args.start, args.end)
-    else:
-        df_pair = None
-
-    strategy_funcs = {
-        'Moving Average Trend Following': lambda df: moving_average_trend_following(
-            df, short_window=args.short_window, long_window=args.long_window),
-        'Buy and Hold': buy_and_hold,
-        'RSI Strategy': lambda df: rsi_strategy(
-            df, period=args.rsi_period, lower=args.rsi_lower, upper=args.rsi_upper),
-        'Bollinger Bands': lambda df: bollinger_band_strategy(
-            df, window=args.bollinger_window, num_std=args.bollinger_std),
-    }
-
-    if df_pair is not None:
-        strategy_funcs['Pairs Trading'] = lambda df: pairs_trading_strategy(df, df_pair)
-
-    results = {}
-    metrics_summary = {}
-
-    for name, strategy_func in strategy_funcs.items():
-        print(f"\nRunning {name} strategy...")
-        df = df_main.copy()
-        df = strategy_func(df)
-        df = simulate_trades(df, initial_cash=args.initial_cash, cost_bps=args.cost_bps)
+    if args.output_dir and not args.no_plot:
+        import matplotlib
+        matplotlib.use('Agg')
 
-        metrics = calculate_performance_metrics(df)
-        results[name] = df
-        metrics_summary[name] = metrics
+    profiler = None
+    if args.profile or args.profile_detail:
+        profiler = Profiler(detail=args.profile_detail)
 
-    print("\n--- Performance Comparison ---")
-    metrics_df = pd.DataFrame(metrics_summary).T
-    print(metrics_df)
+    with profiler or nullcontext(), PeakMemory() as memory:
+        run_compare(args)
+    scope = ' (main process)' if args.workers > 1 else ''
+    print(f"\nPeak memory{scope}: {memory}")
 
-    plot_comparison(results)
+    if profiler is not None:
+        print("\n--- Stage Profile ---")
+        print(profiler.summary())
+        profile_path = args.profile_output or os.path.join(args.output_dir or '.', 'compare_profile.json')
+        profiler.write(profile_path)
+        print(f"Saved profile to {profile_path}")
 
 if __name__ == "__main__":
     main()
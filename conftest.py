@@ -0,0 +1,2 @@
+# Lets pytest import the project's packages (strategies, execution, ...) from
+# tests/ without installing the repository.
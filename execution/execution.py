@@ -1,36 +1,199 @@
-def simulate_trades(df, initial_cash=10000, cost_bps=0.001):
+import numpy as np
+import pandas as pd
+from utils.profiling import instrument
+
+def _held_state(signal, initial=False):
     """
-    Simulate trades based on signal column in DataFrame.
+    Turn a signal array into the long/flat state held at the end of each bar.
 
-    Parameters:
-        df (pd.DataFrame): DataFrame with 'Close' prices and 'Signal' column
-        initial_cash (float): Starting portfolio cash
+    A 1 opens a position, a -1 closes it and anything else (0, NaN) keeps
+    the previous state, so the state is the forward-filled last non-zero
+    signal, or `initial` before the first one.
+    """
+    n = signal.shape[0]
+    rows = np.arange(n).reshape((n,) + (1,) * (signal.ndim - 1))
+    is_event = (signal == 1) | (signal == -1)
+    last_event = np.maximum.accumulate(np.where(is_event, rows, -1), axis=0)
+    last_signal = np.take_along_axis(signal, np.maximum(last_event, 0), axis=0)
+    return np.where(last_event >= 0, last_signal == 1, initial)
+
+def _simulate_column_events(close, signal, initial_cash, cost_bps, initial_position=0.0):
+    """
+    Exact enter/exit state machine for a single column.
+
+    Only the first bar of each run of identical non-zero signals can change
+    the state, so the Python loop runs once per candidate trade rather than
+    once per bar. Cash and position are then forward filled between trades
+    and valued with array arithmetic.
 
     Returns:
-        pd.DataFrame: DataFrame with portfolio value and trade tracking
+        tuple: (portfolio value, position in shares) per bar
     """
-    df = df.copy()
-    cash = initial_cash
-    position = 0
-    portfolio_values = []
+    n = close.shape[0]
+    active = np.flatnonzero((signal == 1) | (signal == -1))
+    if active.size:
+        keep = np.ones(active.size, dtype=bool)
+        keep[1:] = signal[active[1:]] != signal[active[:-1]]
+        active = active[keep]
 
-    for i, row in df.iterrows():
-        price = row['Close']
-        signal = row['Signal']
+    cash = initial_cash
+    position = initial_position
+    event_bars = []
+    event_cash = []
+    event_position = []
 
-        if signal == 1 and position == 0:
+    for i in active:
+        price = close[i]
+        if signal[i] == 1 and position == 0:
             notional = cash
             cost = notional * cost_bps
             position = (cash - cost) / price
             cash = 0
-        elif signal == -1 and position > 0:
+        elif signal[i] == -1 and position > 0:
             notional = position * price
             cost = notional * cost_bps
             cash = notional - cost
             position = 0
+        else:
+            continue
+        event_bars.append(i)
+        event_cash.append(cash)
+        event_position.append(position)
 
-        portfolio_value = cash + (position * price)
-        portfolio_values.append(portfolio_value)
+    if not event_bars:
+        return initial_cash + initial_position * close, np.full(n, initial_position, dtype=float)
+
+    marker = np.full(n, -1)
+    marker[event_bars] = np.arange(len(event_bars))
+    last = np.maximum.accumulate(marker)
+    started = last >= 0
+    idx = np.maximum(last, 0)
+
+    cash_arr = np.where(started, np.asarray(event_cash, dtype=float)[idx], initial_cash)
+    position_arr = np.where(started, np.asarray(event_position, dtype=float)[idx], initial_position)
+    return cash_arr + position_arr * close, position_arr
+
+def simulate_portfolio(close, signal, initial_cash=10000, cost_bps=0.001, return_exposure=False,
+                       initial_position=0.0):
+    """
+    Array engine behind simulate_trades.
+
+    Runs the long/flat state machine of simulate_trades on bare arrays: a 1
+    signal invests all cash when flat, a -1 signal sells the whole position
+    when long, and cost_bps is charged on the traded notional both ways.
+    Accepts a single series or a 2-D (time x column) array, in which case
+    every column is simulated independently in the same pass.
+
+    Parameters:
+        close (array-like): Prices, shape (n,) or (n, k)
+        signal (array-like): Signals aligned with close, same shape
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        return_exposure (bool): Also return the fraction of portfolio value
+            held in the position at the end of each bar
+        initial_position (float): Shares already held before the first bar,
+            to continue a run (the state machine keeps no cash while long)
+
+    Returns:
+        np.ndarray: Portfolio value at the end of each bar, same shape as close,
+            or (values, exposure) if return_exposure is set
+    """
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal, dtype=float)
+    if close.shape != signal.shape:
+        raise ValueError(f"close and signal shapes differ: {close.shape} vs {signal.shape}")
+    if close.shape[0] == 0:
+        return (np.empty_like(close), np.empty_like(close)) if return_exposure else np.empty_like(close)
+
+    initially_long = initial_position > 0 and initial_cash == 0
+    initially_flat = initial_position == 0 and initial_cash > 0
+    if not ((initially_long or initially_flat) and cost_bps < 1 and np.all(close > 0)):
+        # Non-positive prices (e.g. a pairs spread) can leave the position
+        # stuck or negative, so replay the exact state machine instead.
+        values = np.empty_like(close)
+        position = np.empty_like(close)
+        if close.ndim == 1:
+            values[:], position[:] = _simulate_column_events(
+                close, signal, initial_cash, cost_bps, initial_position)
+        else:
+            for j in range(close.shape[1]):
+                values[:, j], position[:, j] = _simulate_column_events(
+                    close[:, j], signal[:, j], initial_cash, cost_bps, initial_position)
+        if not return_exposure:
+            return values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exposure = np.where(position != 0, position * close / values, 0.0)
+        return values, exposure
+
+    held = _held_state(signal, initially_long)
+    prev_held = np.empty_like(held)
+    prev_held[0] = initially_long
+    prev_held[1:] = held[:-1]
+
+    # Per-bar growth of portfolio value: price moves while held, times the
+    # cost haircut on the bars where a position is opened or closed.
+    factor = np.ones_like(close)
+    factor[1:] = np.where(prev_held[1:], close[1:] / close[:-1], 1.0)
+    factor = np.where(held != prev_held, factor * (1 - cost_bps), factor)
+    start_value = initial_cash + initial_position * close[0]
+    values = start_value * np.cumprod(factor, axis=0)
+    if return_exposure:
+        return values, held.astype(float)
+    return values
+
+@instrument('simulate')
+def simulate_trades(df, initial_cash=10000, cost_bps=0.001, copy=True):
+    """
+    Simulate trades based on signal column in DataFrame.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame with 'Close' prices and 'Signal' column
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        copy (bool): Add the columns to a copy of df; False adds them to df itself
+
+    Returns:
+        pd.DataFrame: DataFrame with portfolio value and trade tracking
+            ('Exposure' is the fraction of portfolio value held in the position)
+    """
+    if copy:
+        df = df.copy()
+    df['Portfolio Value'], df['Exposure'] = simulate_portfolio(
+        df['Close'].to_numpy(), df['Signal'].to_numpy(),
+        initial_cash=initial_cash, cost_bps=cost_bps, return_exposure=True)
+    return df
+
+def simulate_panel(prices, signals, initial_cash=10000, cost_bps=0.001, return_exposure=False):
+    """
+    Simulate every column of a dates x tickers panel in one pass.
+
+    Bars where a ticker has no price (before listing, after delisting or in
+    gaps of the shared calendar) never trade: the last known price is carried
+    through them and their portfolio value is NaN. A ticker whose only gaps
+    are at the start or end matches a simulate_trades run on that ticker alone.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        signals (pd.DataFrame): Signals with the same shape and labels
+        initial_cash (float): Starting portfolio cash per ticker
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        return_exposure (bool): Also return the fraction of portfolio value
+            held in the position per ticker
+
+    Returns:
+        pd.DataFrame: Portfolio value per ticker, or (values, exposure) if
+            return_exposure is set
+    """
+    close = prices.to_numpy(dtype=float)
+    missing = np.isnan(close)
+    filled = prices.ffill().bfill().to_numpy(dtype=float)
+    signal = np.where(missing, 0, signals.to_numpy(dtype=float))
 
-    df['Portfolio Value'] = portfolio_values
-    return df
\ No newline at end of file
+    values, exposure = simulate_portfolio(filled, signal, initial_cash=initial_cash,
+                                          cost_bps=cost_bps, return_exposure=True)
+    values[missing] = np.nan
+    exposure[missing] = np.nan
+    values = pd.DataFrame(values, index=prices.index, columns=prices.columns)
+    if return_exposure:
+        return values, pd.DataFrame(exposure, index=prices.index, columns=prices.columns)
+    return values
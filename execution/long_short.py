@@ -0,0 +1,254 @@
+import numpy as np
+import pandas as pd
+from utils.profiling import instrument
+
+SIZING_METHODS = ('fixed', 'volatility')
+
+def _per_column(value, k):
+    return np.broadcast_to(np.asarray(value, dtype=float), (k,))
+
+def target_side(signal, allow_short=True, exit_on_zero=False):
+    """
+    Side (1 long, -1 short, 0 flat) to hold at the end of each bar.
+
+    A 1 goes long and a -1 goes short, or only closes a long when
+    allow_short is False, which is the long/flat rule of simulate_trades.
+    Other values keep the previous side, except that with exit_on_zero a
+    0 closes the position, so the signal is read as a target. NaN always
+    keeps the previous side.
+
+    Parameters:
+        signal (np.ndarray): Signals, shape (n,) or (n, k)
+        allow_short (bool): Whether -1 opens a short
+        exit_on_zero (bool): Whether 0 closes the position
+
+    Returns:
+        np.ndarray: int8 side, same shape as signal
+    """
+    n = signal.shape[0]
+    rows = np.arange(n).reshape((n,) + (1,) * (signal.ndim - 1))
+    if exit_on_zero:
+        is_event = ~np.isnan(signal)
+    else:
+        is_event = (signal == 1) | (signal == -1)
+    last_event = np.maximum.accumulate(np.where(is_event, rows, -1), axis=0)
+    last_signal = np.take_along_axis(signal, np.maximum(last_event, 0), axis=0)
+    side = np.where(last_event >= 0, np.sign(last_signal), 0).astype(np.int8)
+    if not allow_short:
+        np.maximum(side, 0, out=side)
+    return side
+
+def volatility_fraction(close, target_vol=0.15, vol_window=20, max_leverage=1.0, periods_per_year=252):
+    """
+    Fraction of equity that targets an annualised volatility, per bar and column.
+
+    Uses the rolling standard deviation of close-to-close returns over
+    vol_window bars, annualised with periods_per_year, and caps the result
+    at max_leverage. NaN until vol_window returns are available.
+
+    Parameters:
+        close (np.ndarray): Prices, shape (n, k)
+        target_vol (float or array-like): Annualised volatility target, per column
+        vol_window (int): Bars in the volatility estimate
+        max_leverage (float or array-like): Largest fraction of equity, per column
+        periods_per_year (int): Bars per year
+
+    Returns:
+        np.ndarray: Fraction of equity, shape (n, k)
+    """
+    returns = pd.DataFrame(close).pct_change(fill_method=None)
+    vol = returns.rolling(window=vol_window).std().to_numpy() * np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore'):
+        return np.minimum(np.asarray(target_vol, dtype=float) / vol, max_leverage)
+
+def simulate_long_short(close, signal, high=None, low=None, initial_cash=10000, cost_bps=0.001,
+                        cost_per_share=0.0, slippage=0.0, allow_short=True, exit_on_zero=False,
+                        sizing='fixed', fraction=1.0, target_vol=0.15, vol_window=20, max_leverage=1.0,
+                        periods_per_year=252, return_exposure=False):
+    """
+    Long/short execution kernel with position sizing, costs and slippage.
+
+    The side to hold comes from target_side. On every bar where it changes,
+    the open position is closed and, unless the new side is flat, a new one
+    is opened with a budget of a fraction of the equity: `fraction` with
+    sizing='fixed', or the volatility_fraction of that bar with
+    sizing='volatility'. The position is then held, without rebalancing,
+    until the next change. Entries where the fraction is not yet known
+    (volatility warmup), the equity is gone or the fill price is not
+    positive stay flat.
+
+    Positions are sized as budget / fill price, which assumes close is the
+    price of a tradeable asset. A series such as the pairs spread can cross
+    zero: entries at a non-positive spread are skipped, but entries near
+    zero still hold many units of the spread for a small budget.
+
+    Each fill is at the close, moved against the trade by slippage times
+    the bar's high - low range when high and low are given. Costs are
+    cost_bps of the budget on entry and of the notional on exit, plus
+    cost_per_share per share traded. With allow_short=False, fraction=1 and
+    no slippage or per-share cost, this is the simulate_portfolio state
+    machine (exact up to rounding for positive prices).
+
+    Columns are independent simulations, e.g. one per parameter set, and
+    there is no Python loop over bars or trades: every cash flow of a trade
+    scales with the equity at that trade, so the equity at each trade is a
+    cumulative product of per-trade growth factors. Sizing and cost
+    arguments may be scalars or one value per column.
+
+    Parameters:
+        close (array-like): Prices, shape (n,) or (n, k)
+        signal (array-like): Signals aligned with close, same shape
+        high (array-like): Optional bar highs, same shape, for slippage
+        low (array-like): Optional bar lows, same shape, for slippage
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float or array-like): Transaction cost as a fraction of traded notional
+        cost_per_share (float or array-like): Transaction cost per share traded
+        slippage (float or array-like): Fraction of the bar range lost on every fill
+        allow_short (bool): Whether -1 opens a short or only closes a long
+        exit_on_zero (bool): Whether a 0 signal closes the position
+        sizing (str): 'fixed' or 'volatility'
+        fraction (float or array-like): Fraction of equity per entry for 'fixed'
+        target_vol (float or array-like): Annualised volatility target for 'volatility'
+        vol_window (int): Bars in the volatility estimate
+        max_leverage (float or array-like): Cap on the 'volatility' fraction
+        periods_per_year (int): Bars per year, used to annualise volatility
+        return_exposure (bool): Also return the signed fraction of portfolio
+            value held in the position at the end of each bar
+
+    Returns:
+        np.ndarray: Portfolio value at the end of each bar, same shape as close,
+            or (values, exposure) if return_exposure is set
+    """
+    if sizing not in SIZING_METHODS:
+        raise ValueError(f"Unknown sizing '{sizing}'. Expected one of {SIZING_METHODS}")
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal, dtype=float)
+    if close.shape != signal.shape:
+        raise ValueError(f"close and signal shapes differ: {close.shape} vs {signal.shape}")
+    squeeze = close.ndim == 1
+    if squeeze:
+        close = close[:, None]
+        signal = signal[:, None]
+    n, k = close.shape
+    if n == 0:
+        empty = np.empty((0,) if squeeze else (0, k))
+        return (empty, empty.copy()) if return_exposure else empty
+
+    cost_bps, cost_per_share, slippage = (_per_column(x, k) for x in (cost_bps, cost_per_share, slippage))
+    use_slippage = bool(np.any(slippage != 0))
+    if use_slippage and (high is None or low is None):
+        raise ValueError("Slippage needs the high and low of every bar")
+
+    side = target_side(signal, allow_short, exit_on_zero)
+    changed = np.empty_like(side, dtype=bool)
+    changed[0] = side[0] != 0
+    changed[1:] = side[1:] != side[:-1]
+
+    if sizing == 'fixed':
+        fraction = _per_column(fraction, k)
+    else:
+        fraction = volatility_fraction(close, _per_column(target_vol, k), vol_window,
+                                       _per_column(max_leverage, k), periods_per_year)
+    if use_slippage:
+        bar_range = np.asarray(high, dtype=float).reshape(n, k) - np.asarray(low, dtype=float).reshape(n, k)
+
+    # Trades in column order, then bar order, and their rank within the column.
+    columns, bars = np.nonzero(changed.T)
+    counts = np.bincount(columns, minlength=k)
+    rank = np.arange(columns.size) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    price = close[bars, columns]
+    spread = slippage[columns] * bar_range[bars, columns] if use_slippage else 0.0
+    bps, per_share = cost_bps[columns], cost_per_share[columns]
+    new_side = side[bars, columns]
+    scale = fraction[bars, columns] if sizing == 'volatility' else fraction[columns]
+
+    # Every cash flow of a trade is proportional to the equity E at that
+    # trade: the new position is E * shares_per_equity shares and leaves
+    # E * cash_per_equity in cash. The costs come out of the budget on
+    # entry, as in simulate_portfolio.
+    fill = price + new_side * spread
+    budget_per_equity = np.nan_to_num(np.where((new_side != 0) & (fill > 0), scale, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        size_per_equity = np.where(budget_per_equity > 0,
+                                   budget_per_equity * (1 - bps) / (fill + per_share), 0.0)
+    shares_per_equity = new_side * size_per_equity
+    cash_per_equity = 1 - shares_per_equity * fill - (budget_per_equity - size_per_equity * fill)
+
+    # The next trade of the column closes that position, buying back above
+    # or selling below its close, so the equity grows by a factor known
+    # from the fills alone and is a cumulative product over trades.
+    growth = np.ones_like(price)
+    later = np.flatnonzero(rank > 0)
+    held, close_price = shares_per_equity[later - 1], price[later]
+    fill = close_price - np.sign(held) * (spread[later] if use_slippage else 0.0)
+    growth[later] = (cash_per_equity[later - 1] + held * fill
+                     - np.abs(held) * (fill * bps[later] + per_share[later]))
+
+    n_trades = counts.max(initial=0)
+    equity = np.ones((max(n_trades, 1), k))
+    equity[rank, columns] = growth
+    equity = initial_cash * np.cumprod(equity, axis=0)
+
+    # Once the equity is gone no new position is opened and it stays put.
+    broke = np.zeros(equity.shape, dtype=bool)
+    broke[rank, columns] = equity[rank, columns] <= 0
+    first_broke = np.where(broke.any(axis=0), np.argmax(broke, axis=0), n_trades)
+    equity = np.where(np.arange(equity.shape[0])[:, None] > first_broke,
+                      equity[np.minimum(first_broke, equity.shape[0] - 1), np.arange(k)], equity)
+    solvent = rank < first_broke[columns]
+
+    per_equity_shares = np.zeros(equity.shape)
+    per_equity_cash = np.ones(equity.shape)
+    per_equity_shares[rank, columns] = np.where(solvent, shares_per_equity, 0.0)
+    per_equity_cash[rank, columns] = np.where(solvent, cash_per_equity, 1.0)
+    trade_shares = equity * per_equity_shares
+    trade_cash = equity * per_equity_cash
+
+    # Cash and shares are constant between trades: forward fill them.
+    marker = np.full((n, k), -1)
+    marker[bars, columns] = rank
+    last = np.maximum.accumulate(marker, axis=0)
+    started = last >= 0
+    idx = np.maximum(last, 0)
+    cols = np.arange(k)
+    held_cash = np.where(started, trade_cash[idx, cols], initial_cash)
+    held_shares = np.where(started, trade_shares[idx, cols], 0.0)
+    values = held_cash + held_shares * close
+
+    if squeeze:
+        values = values[:, 0]
+    if not return_exposure:
+        return values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exposure = np.where(held_shares != 0, held_shares * close / (held_cash + held_shares * close), 0.0)
+    return values, exposure[:, 0] if squeeze else exposure
+
+@instrument('simulate')
+def simulate_long_short_trades(df, initial_cash=10000, cost_bps=0.001, copy=True, **kwargs):
+    """
+    Simulate trades of the 'Signal' column with the long/short kernel.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame with 'Close' prices and 'Signal' column,
+            and 'High' and 'Low' when slippage is used
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        copy (bool): Add the columns to a copy of df; False adds them to df itself
+        **kwargs: Sizing, cost and slippage options of simulate_long_short
+
+    Returns:
+        pd.DataFrame: DataFrame with 'Portfolio Value' and 'Exposure' (signed
+            fraction of portfolio value held in the position)
+    """
+    if kwargs.get('slippage') and not {'High', 'Low'} <= set(df.columns):
+        raise ValueError("Slippage needs 'High' and 'Low' columns (not loaded in lean mode)")
+    high = df['High'].to_numpy() if 'High' in df.columns else None
+    low = df['Low'].to_numpy() if 'Low' in df.columns else None
+
+    if copy:
+        df = df.copy()
+    df['Portfolio Value'], df['Exposure'] = simulate_long_short(
+        df['Close'].to_numpy(), df['Signal'].to_numpy(), high=high, low=low,
+        initial_cash=initial_cash, cost_bps=cost_bps, return_exposure=True, **kwargs)
+    return df
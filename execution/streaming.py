@@ -0,0 +1,91 @@
+import pandas as pd
+from execution.execution import simulate_portfolio
+
+class PortfolioState:
+    """
+    Cash and position of the simulate_trades state machine, advanced one bar at a time.
+    """
+
+    def __init__(self, initial_cash=10000, cost_bps=0.001):
+        self.cash = initial_cash
+        self.position = 0
+        self.cost_bps = cost_bps
+
+    def update(self, price, signal):
+        """
+        Apply one bar's signal at its price and return the portfolio value.
+        """
+        if signal == 1 and self.position == 0:
+            notional = self.cash
+            cost = notional * self.cost_bps
+            self.position = (self.cash - cost) / price
+            self.cash = 0
+        elif signal == -1 and self.position > 0:
+            notional = self.position * price
+            cost = notional * self.cost_bps
+            self.cash = notional - cost
+            self.position = 0
+        return self.cash + self.position * price
+
+def replay(df, stream, portfolio=None, price_columns=('Close',), initial_cash=10000, cost_bps=0.001):
+    """
+    Event-driven backtest: feed bars one at a time through a strategy stream and a portfolio.
+
+    The stream and portfolio are updated in place, so a caller can keep
+    them and continue with new bars later without replaying the history.
+
+    Parameters:
+        df (pd.DataFrame): Bars to replay
+        stream: Strategy stream from strategies.streaming
+        portfolio (PortfolioState): Existing state to continue from, or None to start fresh
+        price_columns (tuple): Columns of df passed to stream.update, in order
+        initial_cash (float): Starting cash when no portfolio is given
+        cost_bps (float): Transaction cost when no portfolio is given
+
+    Returns:
+        pd.DataFrame: Stream output columns and 'Portfolio Value' per bar
+    """
+    if portfolio is None:
+        portfolio = PortfolioState(initial_cash=initial_cash, cost_bps=cost_bps)
+
+    rows = []
+    for prices in zip(*(df[column].to_numpy(dtype=float) for column in price_columns)):
+        row = stream.update(*prices)
+        row['Portfolio Value'] = portfolio.update(row.get('Close', prices[0]), row['Signal'])
+        rows.append(row)
+
+    return pd.DataFrame(rows, index=df.index)
+
+def simulate_chunk(df, portfolio):
+    """
+    Vectorized simulate_trades over one block of bars, continuing from a portfolio state.
+
+    The block is simulated with simulate_portfolio starting from the
+    portfolio's cash and position, and the state is advanced to the end of
+    the block, so consecutive blocks reproduce one simulate_trades run over
+    their concatenation.
+
+    Parameters:
+        df (pd.DataFrame): Block with 'Close' and 'Signal' columns
+        portfolio (PortfolioState): State to start from, updated in place
+
+    Returns:
+        pd.DataFrame: The block with 'Portfolio Value' and 'Exposure' columns added
+    """
+    close = df['Close'].to_numpy(dtype=float)
+    values, exposure = simulate_portfolio(
+        close, df['Signal'].to_numpy(), initial_cash=portfolio.cash, cost_bps=portfolio.cost_bps,
+        return_exposure=True, initial_position=portfolio.position)
+
+    if len(close):
+        if exposure[-1] != 0:
+            portfolio.position = exposure[-1] * values[-1] / close[-1]
+            portfolio.cash = 0
+        else:
+            portfolio.position = 0
+            portfolio.cash = values[-1]
+
+    df = df.copy()
+    df['Portfolio Value'] = values
+    df['Exposure'] = exposure
+    return df
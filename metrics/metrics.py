@@ -1,37 +1,401 @@
 import numpy as np
+import pandas as pd
+from utils.profiling import instrument
 
+TRADING_DAYS_PER_YEAR = 252
+
+def _forward_fill(values):
+    """
+    Carry the last non-NaN value of each column down a 2-D array.
+    """
+    rows = np.arange(values.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(values), 0, rows), axis=0)
+    return np.take_along_axis(values, last, axis=0)
+
+def compute_metrics(values, exposure=None, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Array engine behind calculate_performance_metrics.
+
+    Works on bare portfolio values, one equity curve or a 2-D (time x curve)
+    array of many, and computes every metric from a single set of daily
+    returns and a single running maximum. Nothing is rounded.
+
+    Bars without a daily return (the first bar, and any NaN-padded bars of a
+    panel column) are left out of every metric. Sharpe and Sortino are scaled
+    by the square root of the number of returns, as in the original metric;
+    Calmar is the annualised return over the max drawdown.
+
+    Turnover and hit rate need the exposure (fraction of portfolio value in
+    the position, e.g. from simulate_portfolio(return_exposure=True)) and are
+    NaN without it. Turnover is the total absolute change in exposure, so one
+    all-in round trip counts as 2. Hit rate is the share of closed trades
+    whose exit value is above the value on the bar before entry.
+
+    Parameters:
+        values (array-like): Portfolio values, shape (n,) or (n, k)
+        exposure (array-like): Optional exposure, same shape as values
+        risk_free_rate (float): Daily risk-free rate
+        periods_per_year (int): Bars per year, used to annualise Calmar
+
+    Returns:
+        dict: Metric name -> np.ndarray of length k (NaN where undefined)
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_returns = values[1:] / values[:-1] - 1
+
+    kept = ~np.isnan(daily_returns)
+    kept_values = np.where(kept, values[1:], np.nan)
+    trading_days = kept.sum(axis=0)
+
+    columns = np.arange(values.shape[1])
+    first = np.argmax(kept, axis=0)
+    last = kept.shape[0] - 1 - np.argmax(kept[::-1], axis=0)
+
+    returns = np.where(kept, daily_returns, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total_return = kept_values[last, columns] / kept_values[first, columns] - 1
+        avg_daily_return = returns.sum(axis=0) / trading_days
+        # Full-length temporaries are reduced as soon as they are built so
+        # that long curves need only a few arrays of their size at once.
+        std_daily_return = np.sqrt((np.where(kept, returns - avg_daily_return, 0.0) ** 2).sum(axis=0)
+                                   / (trading_days - 1))
+        downside = np.sqrt((np.where(kept, np.minimum(returns - risk_free_rate, 0.0), 0.0) ** 2).sum(axis=0)
+                           / trading_days)
+    del daily_returns, returns
+
+    running_max = np.fmax.accumulate(kept_values, axis=0)
+    with np.errstate(invalid='ignore'):
+        max_drawdown = np.fmin.reduce(kept_values / running_max - 1, axis=0)
+
+    # Drawdown duration: bars since the last bar at a running high, taken
+    # from the same running maximum.
+    with np.errstate(invalid='ignore'):
+        underwater = kept_values < running_max
+    rows = np.arange(kept.shape[0])[:, None]
+    last_high = np.maximum.accumulate(np.where(underwater, -1, rows), axis=0)
+    duration = np.where(underwater, rows - last_high, 0).max(axis=0, initial=0)
+    del kept, kept_values, running_max, underwater, last_high
+
+    turnover = np.full(values.shape[1], np.nan)
+    wins = np.zeros(values.shape[1])
+    closed = np.zeros(values.shape[1])
+    if exposure is not None:
+        exposure = np.asarray(exposure, dtype=float)
+        if exposure.ndim == 1:
+            exposure = exposure[:, None]
+        if exposure.shape != values.shape:
+            raise ValueError(f"values and exposure shapes differ: {values.shape} vs {exposure.shape}")
+        # Bars without an exposure (panel gaps) keep the previous one.
+        exposure = np.nan_to_num(_forward_fill(exposure))
+        side = np.sign(exposure)
+        prev_side = np.zeros_like(side)
+        prev_side[1:] = side[:-1]
+        prev_exposure = np.zeros_like(exposure)
+        prev_exposure[1:] = exposure[:-1]
+        turnover = np.abs(exposure - prev_exposure).sum(axis=0)
+
+        # A trade opens when the side changes to long or short and closes
+        # when it changes away from it; a flip closes one and opens another.
+        changed = side != prev_side
+        entries = changed & (side != 0)
+        exits = changed & (prev_side != 0)
+        prev_values = np.empty_like(values)
+        prev_values[0] = values[0]
+        prev_values[1:] = values[:-1]
+        entry_value = _forward_fill(np.where(entries, prev_values, np.nan))
+        open_value = np.full_like(entry_value, np.nan)
+        open_value[1:] = entry_value[:-1]
+        with np.errstate(invalid='ignore'):
+            wins = (exits & (values > open_value)).sum(axis=0)
+        closed = exits.sum(axis=0)
+
+    return _finalize(trading_days, total_return, avg_daily_return, std_daily_return, downside,
+                     max_drawdown, duration, turnover, wins, closed, risk_free_rate, periods_per_year)
+
+def _finalize(trading_days, total_return, avg_daily_return, std_daily_return, downside,
+              max_drawdown, duration, turnover, wins, closed, risk_free_rate, periods_per_year):
+    """
+    Turn the per-curve statistics of compute_metrics or MetricsAccumulator into metrics.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = (avg_daily_return - risk_free_rate) / std_daily_return * np.sqrt(trading_days)
+        sortino_ratio = (avg_daily_return - risk_free_rate) / downside * np.sqrt(trading_days)
+        annual_return = (1 + total_return) ** (periods_per_year / trading_days) - 1
+        calmar_ratio = annual_return / np.abs(max_drawdown)
+        hit_rate = np.where(closed > 0, wins / closed, np.nan)
+    total_return = np.where(trading_days == 0, np.nan, total_return)
+    sharpe_ratio[std_daily_return == 0] = np.nan
+    sortino_ratio[downside == 0] = np.nan
+    calmar_ratio[~(max_drawdown < 0)] = np.nan
+
+    return {
+        'Total Return (%)': total_return * 100,
+        'Max Drawdown (%)': max_drawdown * 100,
+        'Sharpe Ratio': sharpe_ratio,
+        'Sortino Ratio': sortino_ratio,
+        'Calmar Ratio': calmar_ratio,
+        'Max Drawdown Duration (bars)': np.asarray(duration, dtype=float),
+        'Turnover': turnover,
+        'Hit Rate (%)': hit_rate * 100,
+    }
+
+class MetricsAccumulator:
+    """
+    Incremental compute_metrics over consecutive blocks of the same equity curves.
+
+    Each update folds a block of portfolio values (and optionally exposure)
+    into running statistics: return count, mean and M2 merged with Chan's
+    parallel update, the running maximum and drawdown, the open trade and
+    the last value and exposure, so memory is independent of the number of
+    blocks. The result matches compute_metrics over the concatenated blocks.
+
+    Parameters:
+        risk_free_rate (float): Daily risk-free rate
+        periods_per_year (int): Bars per year, used to annualise Calmar
+    """
+
+    def __init__(self, risk_free_rate=0.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        self.rows = 0
+        self.has_exposure = False
+
+    def _start(self, k):
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.downside_sq = np.zeros(k)
+        self.first_value = np.full(k, np.nan)
+        self.last_value = np.full(k, np.nan)
+        self.prev_value = np.full(k, np.nan)
+        self.running_max = np.full(k, np.nan)
+        self.max_drawdown = np.full(k, np.nan)
+        self.last_high = np.full(k, -1)
+        self.duration = np.zeros(k, dtype=int)
+        self.exposure = np.full(k, np.nan)
+        self.entry_value = np.full(k, np.nan)
+        self.turnover = np.zeros(k)
+        self.wins = np.zeros(k)
+        self.closed = np.zeros(k)
+
+    def update(self, values, exposure=None):
+        """
+        Fold the next block of values, shape (n,) or (n, k), into the statistics.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        if values.shape[0] == 0:
+            return
+        if self.rows == 0:
+            self._start(values.shape[1])
+
+        prev_values = np.concatenate([self.prev_value[None], values[:-1]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_returns = values / prev_values - 1
+        kept = ~np.isnan(daily_returns)
+        kept_values = np.where(kept, values, np.nan)
+        count = kept.sum(axis=0)
+        seen = count > 0
+
+        returns = np.where(kept, daily_returns, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(seen, returns.sum(axis=0) / count, 0.0)
+            m2 = (np.where(kept, returns - mean, 0.0) ** 2).sum(axis=0)
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean = np.where(seen, self.mean + delta * count / total, self.mean)
+            self.m2 = np.where(seen, self.m2 + m2 + delta ** 2 * self.count * count / total, self.m2)
+        self.count = total
+        excess = np.where(kept, returns - self.risk_free_rate, 0.0)
+        self.downside_sq += (np.minimum(excess, 0.0) ** 2).sum(axis=0)
+
+        columns = np.arange(values.shape[1])
+        first = np.argmax(kept, axis=0)
+        last = kept.shape[0] - 1 - np.argmax(kept[::-1], axis=0)
+        self.first_value = np.where(np.isnan(self.first_value) & seen, kept_values[first, columns], self.first_value)
+        self.last_value = np.where(seen, kept_values[last, columns], self.last_value)
+
+        running_max = np.fmax.accumulate(np.concatenate([self.running_max[None], kept_values]), axis=0)[1:]
+        with np.errstate(invalid='ignore'):
+            drawdown = kept_values / running_max - 1
+            underwater = kept_values < running_max
+        self.max_drawdown = np.fmin(self.max_drawdown, np.fmin.reduce(drawdown, axis=0))
+        self.running_max = running_max[-1]
+
+        rows = self.rows + np.arange(values.shape[0])[:, None]
+        last_high = np.maximum.accumulate(
+            np.concatenate([self.last_high[None], np.where(underwater, -1, rows)]), axis=0)[1:]
+        self.duration = np.maximum(self.duration, np.where(underwater, rows - last_high, 0).max(axis=0))
+        self.last_high = last_high[-1]
+
+        if exposure is not None:
+            exposure = np.asarray(exposure, dtype=float).reshape(values.shape)
+            self.has_exposure = True
+            exposure = _forward_fill(np.concatenate([self.exposure[None], exposure]))
+            self.exposure = exposure[-1]
+            exposure = np.nan_to_num(exposure)
+            side = np.sign(exposure)
+            self.turnover += np.abs(np.diff(exposure, axis=0)).sum(axis=0)
+
+            changed = side[1:] != side[:-1]
+            entries = changed & (side[1:] != 0)
+            exits = changed & (side[:-1] != 0)
+            if self.rows == 0:
+                prev_values[0] = values[0]
+            entry_value = _forward_fill(np.concatenate(
+                [self.entry_value[None], np.where(entries, prev_values, np.nan)]))
+            with np.errstate(invalid='ignore'):
+                self.wins += (exits & (values > entry_value[:-1])).sum(axis=0)
+            self.closed += exits.sum(axis=0)
+            self.entry_value = entry_value[-1]
+
+        self.prev_value = values[-1]
+        self.rows += values.shape[0]
+
+    def result(self):
+        """
+        Metrics of everything folded in so far, as returned by compute_metrics.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std_daily_return = np.sqrt(self.m2 / (self.count - 1))
+            downside = np.sqrt(self.downside_sq / self.count)
+            total_return = self.last_value / self.first_value - 1
+        turnover = self.turnover if self.has_exposure else np.full_like(self.turnover, np.nan)
+        return _finalize(self.count, total_return, self.mean, std_daily_return, downside, self.max_drawdown,
+                         self.duration, turnover, self.wins, self.closed, self.risk_free_rate,
+                         self.periods_per_year)
+
+    def summary(self):
+        """
+        The result for a single curve, rounded as by calculate_performance_metrics.
+        """
+        return _summarize(self.result(), self.has_exposure)
+
+def _summarize(metrics, has_exposure):
+    summary = {}
+    for name, value in metrics.items():
+        if not has_exposure and name in ('Turnover', 'Hit Rate (%)'):
+            continue
+        value = float(value[0])
+        summary[name] = round(value, 2) if not np.isnan(value) else 'N/A'
+    return summary
+
+@instrument('metrics')
 def calculate_performance_metrics(df, risk_free_rate=0.0):
     """
     Calculate performance metrics for a trading strategy.
 
     Parameters:
-        df (pd.DataFrame): DataFrame with 'Portfolio Value' column
+        df (pd.DataFrame): DataFrame with 'Portfolio Value' column, and
+            optionally 'Exposure' for turnover and hit rate
         risk_free_rate (float): Daily risk-free rate (e.g., 0.01 / 252 for 1% annual)
 
     Returns:
         dict: Dictionary of performance metrics
     """
-    df = df.copy()
-    df['Daily Return'] = df['Portfolio Value'].pct_change()
-    df.dropna(subset=['Daily Return'], inplace=True)
+    exposure = df['Exposure'].to_numpy() if 'Exposure' in df else None
+    metrics = compute_metrics(df['Portfolio Value'].to_numpy(), exposure, risk_free_rate)
+    return _summarize(metrics, exposure is not None)
+
+def calculate_performance_metrics_batch(values, risk_free_rate=0.0, exposure=None):
+    """
+    Calculate the metrics of calculate_performance_metrics for many equity curves at once.
+
+    Parameters:
+        values (array-like): Portfolio values, shape (n,) or (n, k) with one curve per column
+        risk_free_rate (float): Daily risk-free rate
+        exposure (array-like): Optional exposure, same shape as values
+
+    Returns:
+        dict: Metric name -> np.ndarray of length k (NaN where a metric is undefined)
+    """
+    metrics = compute_metrics(values, exposure, risk_free_rate)
+    if exposure is None:
+        del metrics['Turnover'], metrics['Hit Rate (%)']
+    return {name: np.round(value, 2) for name, value in metrics.items()}
 
-    trading_days = df['Daily Return'].count()
+def _window_max_drawdown(values, span):
+    """
+    Max drawdown of every trailing span of values, measured from peaks inside that span only.
 
-    total_return = (df['Portfolio Value'].iloc[-1] / df['Portfolio Value'].iloc[0]) - 1
-    avg_daily_return = df['Daily Return'].mean()
-    std_daily_return = df['Daily Return'].std()
+    Walks the span positions once with running peaks and drawdowns for all
+    windows at a time, so the cost is span array passes rather than a loop
+    over bars. Rows before the first full span, and windows containing a
+    NaN, are NaN.
+    """
+    n = values.shape[0]
+    out = np.full(values.shape, np.nan)
+    if n < span:
+        return out
+    peak = values[:n - span + 1].copy()
+    worst = np.zeros_like(peak)
+    for offset in range(1, span):
+        current = values[offset:n - span + 1 + offset]
+        peak = np.maximum(peak, current)
+        worst = np.minimum(worst, current / peak - 1)
+    out[span - 1:] = worst
+    return out
 
-    sharpe_ratio = np.nan
-    if std_daily_return != 0:
-        sharpe_ratio = (avg_daily_return - risk_free_rate) / std_daily_return
-        sharpe_ratio *= np.sqrt(trading_days)
+def rolling_performance_metrics(values, window, exposure=None, risk_free_rate=0.0,
+                                periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Trailing-window versions of the metrics, one value per bar and curve.
 
-    running_max = df['Portfolio Value'].cummax()
-    drawdown = df['Portfolio Value'] / running_max - 1
-    max_drawdown = drawdown.min()
+    Each bar is measured over the daily returns of the last `window` bars and
+    is NaN until a full window is available. 'Drawdown (%)' is measured from
+    the highest value inside the window, so a peak that has rolled out of it
+    no longer counts, and 'Max Drawdown (%)' is the worst fall within the
+    window from a peak that is also inside it. Hit rate and drawdown duration have no rolling version.
 
-    return {
-        'Total Return (%)': round(total_return * 100, 2),
-        'Max Drawdown (%)': round(max_drawdown * 100, 2),
-        'Sharpe Ratio': round(sharpe_ratio, 2) if not np.isnan(sharpe_ratio) else 'N/A'
-    }
\ No newline at end of file
+    Parameters:
+        values (array-like): Portfolio values, shape (n,) or (n, k)
+        window (int): Number of daily returns per window
+        exposure (array-like): Optional exposure, same shape as values
+        risk_free_rate (float): Daily risk-free rate
+        periods_per_year (int): Bars per year, used to annualise Calmar
+
+    Returns:
+        dict: Metric name -> np.ndarray with the shape of values
+    """
+    values = np.asarray(values, dtype=float)
+    squeeze = values.ndim == 1
+    frame = pd.DataFrame(values[:, None] if squeeze else values)
+
+    returns = frame.pct_change(fill_method=None)
+    excess = returns - risk_free_rate
+    rolled = returns.rolling(window, min_periods=window)
+    avg_return = rolled.mean()
+    std_return = rolled.std()
+    downside = np.sqrt((excess.clip(upper=0) ** 2).rolling(window, min_periods=window).mean())
+
+    total_return = frame / frame.shift(window) - 1
+    # The window of `window` returns spans window + 1 values.
+    peak = frame.rolling(window + 1, min_periods=window + 1).max()
+    drawdown = frame / peak - 1
+    max_drawdown = pd.DataFrame(_window_max_drawdown(frame.to_numpy(), window + 1), index=frame.index)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = ((avg_return - risk_free_rate) / std_return.where(std_return != 0)) * np.sqrt(window)
+        sortino_ratio = ((avg_return - risk_free_rate) / downside.where(downside != 0)) * np.sqrt(window)
+        annual_return = (1 + total_return) ** (periods_per_year / window) - 1
+        calmar_ratio = annual_return / max_drawdown.abs().where(max_drawdown < 0)
+
+    metrics = {
+        'Total Return (%)': total_return * 100,
+        'Max Drawdown (%)': max_drawdown * 100,
+        'Drawdown (%)': drawdown * 100,
+        'Sharpe Ratio': sharpe_ratio,
+        'Sortino Ratio': sortino_ratio,
+        'Calmar Ratio': calmar_ratio,
+    }
+    if exposure is not None:
+        exposure = pd.DataFrame(np.asarray(exposure, dtype=float).reshape(frame.shape)).ffill().fillna(0)
+        metrics['Turnover'] = exposure.diff().abs().rolling(window, min_periods=window).sum()
+
+    return {name: (metric.to_numpy()[:, 0] if squeeze else metric.to_numpy())
+            for name, metric in metrics.items()}
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+import pandas as pd
+from utils.utils import get_data, load_data
+from utils.store import build_store, is_store_current
+from utils.job_queue import JobQueue, worker_id
+from strategies.registry import get_strategy
+from execution.execution import simulate_trades
+from execution.long_short import simulate_long_short_trades
+from metrics.metrics import calculate_performance_metrics
+from optimization.sweep import SWEEP_STRATEGIES, sweep_strategy
+
+def sweep_chunks(tickers, strategies, grids, start, end, pair_ticker=None, initial_cash=10000, cost_bps=0.001,
+                 execution=None, chunk_size=64):
+    """
+    Expand tickers x strategies x parameter grids into queue chunks.
+
+    Each chunk holds up to chunk_size parameter combinations of one
+    strategy on one ticker, with everything a worker on another machine
+    needs to run it.
+
+    Parameters:
+        tickers (list): Ticker symbols
+        strategies (list): Names of strategies.registry.STRATEGIES
+        grids (dict): Strategy name -> parameter combinations (e.g. from
+            parameter_grid); strategies without a grid run once with their defaults
+        start (str): Start date in YYYY-MM-DD format
+        end (str): End date in YYYY-MM-DD format
+        pair_ticker (str): Second ticker of the 'pairs' strategy
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        execution (dict): Optional options of execution.long_short.simulate_long_short_trades
+        chunk_size (int): Parameter combinations per chunk
+
+    Returns:
+        tuple: (sweep id hashed from the inputs, list of chunk payload dicts)
+    """
+    if 'pairs' in strategies and not pair_ticker:
+        raise ValueError("The pairs strategy needs a pair ticker")
+
+    chunks = []
+    for ticker in tickers:
+        for strategy in strategies:
+            params = pd.DataFrame(grids[strategy]).to_dict('records') if strategy in grids else [{}]
+            for offset in range(0, len(params), chunk_size):
+                chunks.append({'ticker': ticker, 'pair_ticker': pair_ticker if strategy == 'pairs' else None,
+                               'strategy': strategy, 'start': start, 'end': end, 'initial_cash': initial_cash,
+                               'cost_bps': cost_bps, 'execution': execution,
+                               'params': params[offset:offset + chunk_size]})
+
+    sweep = hashlib.blake2b(json.dumps(chunks, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+    return sweep, chunks
+
+def run_chunk(chunk, frames):
+    """
+    Backtest every parameter combination of a chunk.
+
+    Grids of the sweep strategies on the default long/flat simulation run
+    through sweep_strategy's batched signals; anything else runs the
+    registered strategy function, the trade simulation and the metrics
+    once per combination.
+
+    Parameters:
+        chunk (dict): Chunk payload from sweep_chunks
+        frames (dict): Ticker -> OHLCV DataFrame of the chunk's date range
+
+    Returns:
+        pd.DataFrame: One row per combination with its parameters and metrics
+    """
+    strategy = chunk['strategy']
+    inputs = [frames[chunk['ticker']]] + ([frames[chunk['pair_ticker']]] if chunk['pair_ticker'] else [])
+    if strategy in SWEEP_STRATEGIES and chunk['execution'] is None:
+        return sweep_strategy(inputs[0], strategy, pd.DataFrame(chunk['params']),
+                              initial_cash=chunk['initial_cash'], cost_bps=chunk['cost_bps'])
+
+    strategy_func = get_strategy(strategy)
+    rows = []
+    for params in chunk['params']:
+        df = strategy_func(*inputs, **params)
+        if chunk['execution'] is None:
+            df = simulate_trades(df, initial_cash=chunk['initial_cash'], cost_bps=chunk['cost_bps'], copy=False)
+        else:
+            df = simulate_long_short_trades(df, initial_cash=chunk['initial_cash'], cost_bps=chunk['cost_bps'],
+                                            copy=False, **chunk['execution'])
+        metrics = calculate_performance_metrics(df)
+        rows.append({**params, **{name: np.nan if value == 'N/A' else value for name, value in metrics.items()}})
+    return pd.DataFrame(rows)
+
+def _chunk_frames(chunk, frames):
+    """
+    Frames of the chunk's tickers, reusing those already loaded for the same date range.
+    """
+    needed = {}
+    for ticker in filter(None, (chunk['ticker'], chunk['pair_ticker'])):
+        key = (ticker, chunk['start'], chunk['end'])
+        if key not in frames:
+            frames[key] = load_data(ticker, chunk['start'], chunk['end'])
+        needed[key] = frames[key]
+    # Chunks are queued ticker by ticker, so older frames are rarely needed again.
+    frames.clear()
+    frames.update(needed)
+    return {ticker: df for (ticker, _, _), df in needed.items()}
+
+def prepare_data(queue_path):
+    """
+    Download and build the columnar store of every ticker the queue still needs.
+
+    Run once per machine before its workers start, so they only read data
+    instead of racing to download or rebuild the same files.
+    """
+    queue = JobQueue(queue_path)
+    try:
+        ranges = {}
+        for chunk in queue.unfinished_payloads():
+            for ticker in filter(None, (chunk['ticker'], chunk['pair_ticker'])):
+                ranges.setdefault((chunk['start'], chunk['end']), set()).add(ticker)
+    finally:
+        queue.close()
+
+    for (start, end), tickers in ranges.items():
+        tickers = sorted(tickers)
+        print(f"Checking data for {', '.join(tickers)}...")
+        get_data(tickers, start, end)
+        for ticker in tickers:
+            # Tickers without data are left to fail their chunks, which records why.
+            if os.path.exists(os.path.join('data', f"{ticker}.csv")) and not is_store_current(ticker):
+                build_store(ticker)
+
+def run_worker(queue_path, worker=None, lease_seconds=120, wait=False, poll_seconds=5.0, max_chunks=None):
+    """
+    Claim, run and checkpoint chunks until the queue has nothing left to claim.
+
+    The data of the chunks must already be on this machine (see prepare_data).
+
+    The lease of the chunk being run is renewed in the background; if the
+    chunk raises, it is released for another attempt. With wait, the worker
+    keeps polling while other workers still hold chunks, so it can take over
+    those whose leases expire.
+
+    Parameters:
+        queue_path (str): Path of the JobQueue file
+        worker (str): Worker name; defaults to host and process id
+        lease_seconds (float): Lease length of a claimed chunk
+        wait (bool): Poll until every chunk is done or failed instead of stopping when none is claimable
+        poll_seconds (float): Delay between polls with wait
+        max_chunks (int): Optional number of chunks after which to stop
+
+    Returns:
+        int: Number of chunks this worker completed
+    """
+    worker = worker or worker_id()
+    queue = JobQueue(queue_path)
+    frames = {}
+    completed = 0
+    try:
+        while max_chunks is None or completed < max_chunks:
+            claimed = queue.claim(worker, lease_seconds)
+            if claimed is None:
+                if wait and queue.unfinished():
+                    time.sleep(poll_seconds)
+                    continue
+                break
+
+            chunk_id, _, chunk = claimed
+            print(f"[{worker}] chunk {chunk_id}: {chunk['strategy']} on {chunk['ticker']}, "
+                  f"{len(chunk['params'])} combination(s)")
+            with queue.leased(chunk_id, worker, lease_seconds):
+                try:
+                    table = run_chunk(chunk, _chunk_frames(chunk, frames))
+                except Exception as exc:
+                    print(f"[{worker}] chunk {chunk_id} failed: {exc!r}")
+                    queue.fail(chunk_id, worker, repr(exc))
+                    continue
+            if queue.complete(chunk_id, worker, table.to_json(orient='records')):
+                completed += 1
+    finally:
+        queue.close()
+    return completed
+
+def run_local_workers(queue_path, processes, **kwargs):
+    """
+    Prepare the data, then run processes workers on this machine, each as if it were a separate node.
+
+    Returns:
+        int: Number of chunks completed by all of them
+    """
+    prepare_data(queue_path)
+    with multiprocessing.Pool(processes) as pool:
+        results = [pool.apply_async(run_worker, (queue_path,), kwargs) for _ in range(processes)]
+        return sum(result.get() for result in results)
+
+def collect_sweep(queue, sweep):
+    """
+    Results of a sweep's completed chunks as one table.
+
+    Returns:
+        pd.DataFrame: One row per combination with its ticker, strategy, parameters and metrics
+    """
+    tables = []
+    param_names = {}
+    for chunk, result in queue.results(sweep):
+        table = pd.DataFrame(json.loads(result))
+        table.insert(0, 'Strategy', chunk['strategy'])
+        table.insert(0, 'Pair Ticker', chunk['pair_ticker'])
+        table.insert(0, 'Ticker', chunk['ticker'])
+        tables.append(table)
+        param_names.update(dict.fromkeys(name for params in chunk['params'][:1] for name in params))
+    if not tables:
+        return pd.DataFrame()
+
+    # Parameters of all strategies first, then the metrics.
+    results = pd.concat(tables, ignore_index=True)
+    leading = ['Ticker', 'Pair Ticker', 'Strategy', *param_names]
+    return results[leading + [c for c in results.columns if c not in leading]]
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from execution.execution import simulate_panel
+from metrics.metrics import calculate_performance_metrics_batch
+
+# 5% critical value of the Dickey-Fuller t-statistic with a constant. The
+# traded spread has a fixed 1:1 ratio, so plain Dickey-Fuller values apply
+# rather than Engle-Granger ones for an estimated hedge ratio.
+DF_CRITICAL_5PCT = -2.86
+
+def correlation_candidates(prices, min_corr=0.8, max_pairs=None, min_overlap=60):
+    """
+    Unordered ticker pairs whose daily returns are correlated above a threshold.
+
+    The whole correlation matrix is computed at once from the aligned price
+    panel, using every date both tickers have returns for.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        min_corr (float): Minimum return correlation to keep a pair
+        max_pairs (int): Optional cap, keeping the most correlated pairs
+        min_overlap (int): Minimum number of shared return observations
+
+    Returns:
+        pd.DataFrame: 'Ticker A', 'Ticker B' and 'Correlation', most correlated first
+    """
+    returns = prices.pct_change(fill_method=None)
+    corr = returns.corr(min_periods=min_overlap).to_numpy()
+
+    rows, cols = np.triu_indices(corr.shape[0], k=1)
+    values = corr[rows, cols]
+    keep = values >= min_corr
+    rows, cols, values = rows[keep], cols[keep], values[keep]
+
+    order = np.argsort(-values, kind='stable')
+    if max_pairs is not None:
+        order = order[:max_pairs]
+
+    tickers = prices.columns.to_numpy()
+    return pd.DataFrame({'Ticker A': tickers[rows[order]], 'Ticker B': tickers[cols[order]],
+                         'Correlation': values[order]})
+
+def dickey_fuller_stats(spread):
+    """
+    Dickey-Fuller t-statistics of many spreads, one per column.
+
+    Regresses the change of each spread on its previous level with a
+    constant (no lagged differences) over the bars where both are known.
+    More negative values mean stronger mean reversion.
+
+    Parameters:
+        spread (array-like): Spreads, shape (n, k)
+
+    Returns:
+        np.ndarray: t-statistic of the level coefficient per column
+    """
+    spread = np.asarray(spread, dtype=float)
+    x = spread[:-1]
+    y = spread[1:] - spread[:-1]
+    valid = ~np.isnan(y)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+
+    n = valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = x.sum(axis=0) / n
+        mean_y = y.sum(axis=0) / n
+        dx = np.where(valid, x - mean_x, 0.0)
+        dy = np.where(valid, y - mean_y, 0.0)
+        sxx = (dx ** 2).sum(axis=0)
+        gamma = (dx * dy).sum(axis=0) / sxx
+        residual_var = ((dy - gamma * dx) ** 2).sum(axis=0) / (n - 2)
+        return gamma / np.sqrt(residual_var / sxx)
+
+def pairs_signals(spread, lookback=30, entry_z=1.0, exit_z=0.0):
+    """
+    Signals of pairs_trading_strategy for many spreads at once.
+
+    Parameters:
+        spread (pd.DataFrame): Spreads, one column per pair
+        lookback (int): Rolling window of the spread mean and std
+        entry_z (float): Z-score threshold to enter trades
+        exit_z (float): Z-score threshold to exit trades
+
+    Returns:
+        pd.DataFrame: Signal per pair
+    """
+    rolling = spread.rolling(window=lookback)
+    zscore = ((spread - rolling.mean()) / rolling.std()).to_numpy()
+
+    signal = np.zeros(zscore.shape, dtype=int)
+    signal[zscore > entry_z] = -1
+    signal[zscore < -entry_z] = 1
+    signal[np.abs(zscore) < exit_z] = 0
+    return pd.DataFrame(signal, index=spread.index, columns=spread.columns)
+
+def scan_pairs(prices, lookback=30, entry_z=1.0, exit_z=0.0, min_corr=0.8, max_pairs=None,
+               cointegration=False, max_df_stat=DF_CRITICAL_5PCT, initial_cash=10000, cost_bps=0.001,
+               sort_by='Sharpe Ratio', batch_size=500):
+    """
+    Backtest pairs_trading_strategy on every promising pair of a universe.
+
+    Pairs are prefiltered on return correlation and, with cointegration,
+    on the Dickey-Fuller statistic of their spread. The survivors are
+    backtested in both directions (long-only on A - B and on B - A) in
+    batches of spreads, with rolling z-scores, simulation and metrics
+    computed column-wise for a whole batch.
+
+    A pair whose tickers trade on every date of the panel gets the same
+    result as pairs_trading_strategy followed by simulate_trades; dates
+    where either ticker is missing are gaps in the spread that break its
+    rolling windows and are never traded.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        lookback (int): Rolling window of the spread mean and std
+        entry_z (float): Z-score threshold to enter trades
+        exit_z (float): Z-score threshold to exit trades
+        min_corr (float): Minimum return correlation to keep a pair
+        max_pairs (int): Optional cap on prefiltered pairs, most correlated first
+        cointegration (bool): Also require a Dickey-Fuller statistic below max_df_stat
+        max_df_stat (float): Largest accepted Dickey-Fuller statistic
+        initial_cash (float): Starting portfolio cash per pair
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        sort_by (str): Metric the table is ranked by, best first
+        batch_size (int): Spreads simulated together
+
+    Returns:
+        pd.DataFrame: One row per directed pair with its prefilter statistics and metrics
+    """
+    candidates = correlation_candidates(prices, min_corr=min_corr, max_pairs=max_pairs)
+    column = {ticker: i for i, ticker in enumerate(prices.columns)}
+    close = prices.to_numpy(dtype=float)
+
+    if cointegration and len(candidates):
+        stats = []
+        for start in range(0, len(candidates), batch_size):
+            chunk = candidates.iloc[start:start + batch_size]
+            a = chunk['Ticker A'].map(column).to_numpy()
+            b = chunk['Ticker B'].map(column).to_numpy()
+            stats.append(dickey_fuller_stats(close[:, a] - close[:, b]))
+        candidates['DF Stat'] = np.concatenate(stats)
+        candidates = candidates[candidates['DF Stat'] <= max_df_stat].reset_index(drop=True)
+
+    reversed_pairs = candidates.rename(columns={'Ticker A': 'Ticker B', 'Ticker B': 'Ticker A'})
+    pairs = pd.concat([candidates, reversed_pairs], ignore_index=True)[candidates.columns]
+
+    batches = []
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs.iloc[start:start + batch_size]
+        a = chunk['Ticker A'].map(column).to_numpy()
+        b = chunk['Ticker B'].map(column).to_numpy()
+        spread = pd.DataFrame(close[:, a] - close[:, b], index=prices.index)
+
+        signals = pairs_signals(spread, lookback=lookback, entry_z=entry_z, exit_z=exit_z)
+        values, exposure = simulate_panel(spread, signals, initial_cash=initial_cash,
+                                          cost_bps=cost_bps, return_exposure=True)
+        metrics = calculate_performance_metrics_batch(values.to_numpy(), exposure=exposure.to_numpy())
+        batches.append(pd.DataFrame(metrics, index=chunk.index))
+
+    if not batches:
+        return pairs
+    results = pd.concat([pairs, pd.concat(batches)], axis=1)
+    return results.sort_values(sort_by, ascending=False, na_position='last').reset_index(drop=True)
@@ -0,0 +1,169 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from strategies.panel import PANEL_STRATEGIES
+from execution.execution import simulate_portfolio
+from metrics.metrics import compute_metrics
+
+BOOTSTRAP_METHODS = ('stationary', 'block')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def bootstrap_indices(n, n_paths, method='stationary', block_size=20, rng=None):
+    """
+    Resampled positions into a series of length n, one column per path.
+
+    'block' is the moving-block bootstrap: consecutive runs of block_size
+    positions starting at uniform random points. 'stationary' is the
+    Politis-Romano bootstrap: block lengths are geometric with mean
+    block_size and blocks wrap around the end of the series. Both keep the
+    short-range dependence (volatility clustering, trends) of the original
+    within each block.
+
+    Parameters:
+        n (int): Length of the series being resampled
+        n_paths (int): Number of resampled paths
+        method (str): 'stationary' or 'block'
+        block_size (int): Block length, or mean block length for 'stationary'
+        rng (np.random.Generator): Random generator, seeded by the caller
+
+    Returns:
+        np.ndarray: Integer positions, shape (n, n_paths)
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown bootstrap method '{method}'. Expected one of {BOOTSTRAP_METHODS}")
+    rng = rng if rng is not None else np.random.default_rng()
+    block_size = max(1, min(int(block_size), n))
+    steps = np.arange(n)[:, None]
+
+    if method == 'block':
+        starts = rng.integers(0, n - block_size + 1, size=(-(-n // block_size), n_paths))
+        return starts[steps[:, 0] // block_size] + steps % block_size
+
+    # Each step starts a new block with probability 1 / block_size; within a
+    # block the position advances by one from the block's random start.
+    new_block = rng.random((n, n_paths)) < 1.0 / block_size
+    new_block[0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=0)
+    starts = np.where(new_block, rng.integers(0, n, size=(n, n_paths)), 0)
+    start = np.take_along_axis(starts, block_start, axis=0)
+    return (start + steps - block_start) % n
+
+def resample_prices(close, n_paths, method='stationary', block_size=20, rng=None):
+    """
+    Synthetic price paths built from bootstrapped log returns of close.
+
+    Every path starts at close[0] and has the same length as close.
+
+    Returns:
+        np.ndarray: Prices, shape (len(close), n_paths)
+    """
+    close = np.asarray(close, dtype=float)
+    log_returns = np.diff(np.log(close))
+    idx = bootstrap_indices(len(log_returns), n_paths, method, block_size, rng)
+    paths = np.empty((len(close), n_paths))
+    paths[0] = close[0]
+    paths[1:] = close[0] * np.exp(np.cumsum(log_returns[idx], axis=0))
+    return paths
+
+def _simulate_paths(prices, strategy, strategy_params, initial_cash, cost_bps):
+    signals = PANEL_STRATEGIES[strategy](pd.DataFrame(prices), **strategy_params)
+    return simulate_portfolio(prices, signals.to_numpy(), initial_cash=initial_cash,
+                              cost_bps=cost_bps, return_exposure=True)
+
+def _run_batch(task):
+    """
+    Resample one batch of paths and compute their metrics (picklable for worker processes).
+    """
+    (series, target, n_paths, method, block_size, seed,
+     strategy, strategy_params, initial_cash, cost_bps) = task
+    rng = np.random.default_rng(seed)
+
+    if target == 'prices':
+        prices = resample_prices(series, n_paths, method, block_size, rng)
+        return compute_metrics(*_simulate_paths(prices, strategy, strategy_params, initial_cash, cost_bps))
+
+    # target == 'returns': reshuffle the strategy's own daily returns.
+    idx = bootstrap_indices(len(series), n_paths, method, block_size, rng)
+    values = np.empty((len(series) + 1, n_paths))
+    values[0] = initial_cash
+    values[1:] = initial_cash * np.cumprod(1 + series[idx], axis=0)
+    return compute_metrics(values)
+
+def robustness_analysis(df, strategy, strategy_params=None, n_paths=10000, method='stationary', block_size=20,
+                        target='prices', seed=0, initial_cash=10000, cost_bps=0.001, confidence=0.95,
+                        batch_size=500, workers=1):
+    """
+    Bootstrap confidence intervals for the metrics of one strategy on one price series.
+
+    With target='prices', log returns of the close are resampled into
+    n_paths synthetic price paths and the strategy, simulation and metrics
+    are rerun on every path; with target='returns', the strategy's own
+    daily portfolio returns from the historical run are resampled and only
+    the metrics are recomputed, which measures how much the result depends
+    on the order of its returns. Paths are processed as (time x path)
+    arrays in batches of batch_size, optionally on a process pool, and each
+    batch draws from its own child of the seed, so results only depend on
+    seed and batch_size.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV data with a 'Close' column
+        strategy (str): Key of strategies.panel.PANEL_STRATEGIES
+        strategy_params (dict): Keyword arguments for the strategy
+        n_paths (int): Number of resampled paths
+        method (str): 'stationary' or 'block' bootstrap
+        block_size (int): Block length, or mean block length for 'stationary'
+        target (str): 'prices' or 'returns'
+        seed (int): Seed of the random streams
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        confidence (float): Coverage of the reported confidence interval
+        batch_size (int): Paths simulated together
+        workers (int): Number of worker processes
+
+    Returns:
+        tuple: (summary DataFrame with one row per metric, DataFrame of per-path metrics)
+    """
+    if strategy not in PANEL_STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {sorted(PANEL_STRATEGIES)}")
+    if target not in ('prices', 'returns'):
+        raise ValueError(f"Unknown target '{target}'. Expected 'prices' or 'returns'")
+    strategy_params = strategy_params or {}
+
+    close = df['Close'].to_numpy(dtype=float)
+    values, exposure = _simulate_paths(close[:, None], strategy, strategy_params, initial_cash, cost_bps)
+    historical = compute_metrics(values, exposure)
+    series = close if target == 'prices' else values[1:, 0] / values[:-1, 0] - 1
+
+    sizes = [min(batch_size, n_paths - start) for start in range(0, n_paths, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(series, target, size, method, block_size, child, strategy, strategy_params, initial_cash, cost_bps)
+             for size, child in zip(sizes, seeds)]
+
+    if workers <= 1:
+        batches = [_run_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_run_batch, tasks))
+
+    samples = pd.DataFrame({name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]})
+    if target == 'returns':
+        samples = samples.drop(columns=['Turnover', 'Hit Rate (%)'])
+    samples.index.name = 'Path'
+
+    tail = (1 - confidence) / 2 * 100
+    summary = {}
+    for name, values in samples.items():
+        values = values.to_numpy()
+        values = values[~np.isnan(values)]
+        row = {'Historical': historical[name][0]}
+        if values.size:
+            low, high = np.percentile(values, [tail, 100 - tail])
+            row.update({'Mean': values.mean(), 'Std': values.std(ddof=1) if values.size > 1 else np.nan,
+                        'CI Low': low, 'CI High': high})
+            row.update({f"P{p}": v for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+        row['Valid Paths'] = values.size
+        summary[name] = row
+
+    summary = pd.DataFrame(summary).T
+    summary.index.name = 'Metric'
+    return summary, samples
@@ -0,0 +1,190 @@
+import itertools
+import numpy as np
+import pandas as pd
+from execution.execution import simulate_portfolio
+from metrics.metrics import calculate_performance_metrics_batch
+
+def rolling_mean_matrix(values, windows):
+    """
+    Rolling means of one series for many windows, shape (len(values), len(windows)).
+
+    Differencing one shared prefix-sum array would be cheaper, but it leaves
+    rounding residue of a few ulps where a window is flat, so a run of zero
+    gains gets a tiny nonzero mean and RSI and band signals flip against the
+    single-run strategies. Each distinct window therefore goes through
+    pandas' rolling kernel, which the strategies use as well.
+
+    Parameters:
+        values (array-like): Input series
+        windows (array-like): Window lengths
+
+    Returns:
+        np.ndarray: Column j equals pd.Series(values).rolling(windows[j]).mean()
+    """
+    series = pd.Series(np.asarray(values, dtype=float))
+    windows = np.asarray(windows, dtype=int)
+    out = np.empty((len(series), len(windows)))
+    for j, window in enumerate(windows):
+        out[:, j] = series.rolling(window=window).mean().to_numpy()
+    return out
+
+def rolling_std_matrix(values, windows):
+    """
+    Rolling sample standard deviations of one series for many windows.
+
+    Like rolling_mean_matrix, each distinct window goes through pandas'
+    numerically stable rolling kernel.
+
+    Parameters:
+        values (array-like): Input series
+        windows (array-like): Window lengths
+
+    Returns:
+        np.ndarray: Column j equals pd.Series(values).rolling(windows[j]).std()
+    """
+    series = pd.Series(np.asarray(values, dtype=float))
+    windows = np.asarray(windows, dtype=int)
+    out = np.empty((len(series), len(windows)))
+    for j, window in enumerate(windows):
+        out[:, j] = series.rolling(window=window).std().to_numpy()
+    return out
+
+def _shared_columns(func, values, params):
+    """
+    Evaluate a rolling matrix once per distinct parameter and expand it to one column per combination.
+    """
+    unique, inverse = np.unique(np.asarray(params), return_inverse=True)
+    return func(values, unique)[:, inverse]
+
+def trend_following_signals(close, short_window, long_window):
+    """
+    Signals of moving_average_trend_following for a batch of window pairs.
+
+    Parameters:
+        close (array-like): Close prices
+        short_window (array-like): Short window of each combination
+        long_window (array-like): Long window of each combination
+
+    Returns:
+        np.ndarray: Signal matrix, one column per combination
+    """
+    sma_short = _shared_columns(rolling_mean_matrix, close, short_window)
+    sma_long = _shared_columns(rolling_mean_matrix, close, long_window)
+
+    mask = ~np.isnan(sma_short) & ~np.isnan(sma_long)
+    return np.where(mask, np.where(sma_short > sma_long, 1, -1), 0)
+
+def rsi_signals(close, period, lower, upper):
+    """
+    Signals of rsi_strategy for a batch of (period, lower, upper) combinations.
+
+    Parameters:
+        close (array-like): Close prices
+        period (array-like): RSI lookback of each combination
+        lower (array-like): Buy threshold of each combination
+        upper (array-like): Sell threshold of each combination
+
+    Returns:
+        np.ndarray: Signal matrix, one column per combination
+    """
+    close = np.asarray(close, dtype=float)
+    delta = np.empty_like(close)
+    if close.size:
+        delta[0] = np.nan
+    delta[1:] = np.diff(close)
+    gain = np.where(delta > 0, delta, 0)
+    loss = -np.where(delta < 0, delta, 0)
+
+    avg_gain = _shared_columns(rolling_mean_matrix, gain, period)
+    avg_loss = _shared_columns(rolling_mean_matrix, loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    lower = np.asarray(lower)[None, :]
+    upper = np.asarray(upper)[None, :]
+    signal = np.zeros(rsi.shape, dtype=int)
+    signal[rsi < lower] = 1
+    signal[rsi > upper] = -1
+    return signal
+
+def bollinger_signals(close, window, num_std):
+    """
+    Signals of bollinger_band_strategy for a batch of (window, num_std) combinations.
+
+    Parameters:
+        close (array-like): Close prices
+        window (array-like): Band window of each combination
+        num_std (array-like): Std multiplier of each combination
+
+    Returns:
+        np.ndarray: Signal matrix, one column per combination
+    """
+    close = np.asarray(close, dtype=float)
+    rolling_mean = _shared_columns(rolling_mean_matrix, close, window)
+    rolling_std = _shared_columns(rolling_std_matrix, close, window)
+    num_std = np.asarray(num_std, dtype=float)[None, :]
+
+    price = close[:, None]
+    signal = np.zeros(rolling_mean.shape, dtype=int)
+    signal[price < rolling_mean - num_std * rolling_std] = 1
+    signal[price > rolling_mean + num_std * rolling_std] = -1
+    return signal
+
+SWEEP_STRATEGIES = {
+    'trend_following': (trend_following_signals, ('short_window', 'long_window')),
+    'rsi': (rsi_signals, ('period', 'lower', 'upper')),
+    'bollinger': (bollinger_signals, ('window', 'num_std')),
+}
+
+def parameter_grid(**params):
+    """
+    Build the cartesian product of parameter values as a DataFrame, one row per combination.
+
+    Example:
+        parameter_grid(short_window=[5, 10], long_window=[30, 50, 100])
+    """
+    names = list(params)
+    rows = list(itertools.product(*(params[name] for name in names)))
+    return pd.DataFrame(rows, columns=names)
+
+def sweep_strategy(df, strategy, grid, initial_cash=10000, cost_bps=0.001, batch_size=256):
+    """
+    Backtest every parameter combination of a strategy on one price series.
+
+    Rolling statistics are computed once per distinct window, signals,
+    simulation and metrics run as (time x combination) array work, and
+    combinations are processed batch_size at a time to bound memory on
+    long histories.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV data with a 'Close' column
+        strategy (str): One of 'trend_following', 'rsi', 'bollinger'
+        grid (pd.DataFrame or dict): Parameter combinations, e.g. from parameter_grid
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        batch_size (int): Number of combinations simulated together
+
+    Returns:
+        pd.DataFrame: One row per combination with its parameters and metrics
+    """
+    if strategy not in SWEEP_STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {sorted(SWEEP_STRATEGIES)}")
+    signal_func, param_names = SWEEP_STRATEGIES[strategy]
+
+    grid = pd.DataFrame(grid).reset_index(drop=True)
+    missing = [name for name in param_names if name not in grid.columns]
+    if missing:
+        raise ValueError(f"Parameter grid for '{strategy}' is missing columns: {missing}")
+
+    close = df['Close'].to_numpy(dtype=float)
+    batches = []
+    for start in range(0, len(grid), batch_size):
+        chunk = grid.iloc[start:start + batch_size]
+        signals = signal_func(close, *(chunk[name].to_numpy() for name in param_names))
+        values, exposure = simulate_portfolio(
+            np.broadcast_to(close[:, None], signals.shape), signals,
+            initial_cash=initial_cash, cost_bps=cost_bps, return_exposure=True)
+        batches.append(pd.DataFrame(calculate_performance_metrics_batch(values, exposure=exposure),
+                                    index=chunk.index))
+
+    return pd.concat([grid, pd.concat(batches)], axis=1)
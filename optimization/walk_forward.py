@@ -0,0 +1,195 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from execution.execution import _held_state, simulate_portfolio
+from metrics.metrics import compute_metrics, calculate_performance_metrics
+from optimization.sweep import SWEEP_STRATEGIES
+from utils.shared import share_array, attach_array, release_blocks
+
+def walk_forward_folds(n, n_folds=5, train_size=None, anchored=False):
+    """
+    Train/test windows of a walk-forward over n bars.
+
+    The test windows are n_folds consecutive blocks after the first train
+    window; the last one also takes the bars left over by the division.
+    Each train window ends where its test window starts and is train_size
+    bars long, or starts at the first bar when anchored.
+
+    Parameters:
+        n (int): Number of bars
+        n_folds (int): Number of folds
+        train_size (int): Bars per train window; defaults to the test window size
+        anchored (bool): Grow the train windows from the first bar instead of rolling them
+
+    Returns:
+        list: (train_start, train_end, test_start, test_end) bar positions, ends exclusive
+    """
+    if train_size is None:
+        train_size = n // (n_folds + 1)
+    test_size = (n - train_size) // n_folds if n_folds > 0 else 0
+    if train_size < 2 or test_size < 1:
+        raise ValueError(f"{n} bars are too few for {n_folds} folds with {train_size}-bar train windows")
+
+    folds = []
+    for i in range(n_folds):
+        test_start = train_size + i * test_size
+        test_end = n if i == n_folds - 1 else test_start + test_size
+        folds.append((0 if anchored else test_start - train_size, test_start, test_start, test_end))
+    return folds
+
+def _window_inputs(close, signals, cost_bps):
+    """
+    Full-history arrays from which every window's simulation is sliced.
+
+    A long/flat run started at bar s is flat until the first enter/exit
+    signal at or after s and follows the full-history held state from
+    there on, so its per-bar growth factors are those of the full run
+    after that bar. The held state, growth factors and position of the
+    next signal are computed once here and shared by all windows. Price
+    series that simulate_portfolio replays event by event (non-positive
+    prices) are simulated per window instead.
+    """
+    n = close.shape[0]
+    if not (cost_bps < 1 and np.all(close > 0)):
+        return {'close': close[:, None], 'signal': signals}
+
+    held = _held_state(signals)
+    factor = np.ones(signals.shape)
+    factor[1:] = np.where(held[:-1], (close[1:] / close[:-1])[:, None], 1.0)
+    factor = np.where(held != np.vstack([np.zeros((1, held.shape[1]), dtype=bool), held[:-1]]),
+                      factor * (1 - cost_bps), factor)
+
+    rows = np.arange(n)[:, None]
+    is_event = (signals == 1) | (signals == -1)
+    next_event = np.minimum.accumulate(np.where(is_event, rows, n)[::-1], axis=0)[::-1]
+    return {'held': held, 'factor': factor, 'next_event': next_event}
+
+def _window_run(arrays, start, end, initial_cash, cost_bps, columns=slice(None)):
+    """
+    Portfolio values and exposure of a fresh long/flat run over bars start..end.
+
+    Matches simulate_portfolio on the slices of close and signals.
+    """
+    if 'factor' not in arrays:
+        signal = arrays['signal'][start:end, columns]
+        close = np.broadcast_to(arrays['close'][start:end], signal.shape)
+        return simulate_portfolio(close, signal, initial_cash=initial_cash, cost_bps=cost_bps,
+                                  return_exposure=True)
+
+    held = arrays['held'][start:end, columns]
+    first = arrays['next_event'][start, columns] - start
+    rows = np.arange(end - start)[:, None]
+    before = rows < first
+    factor = np.where(rows == first, np.where(held, 1 - cost_bps, 1.0), arrays['factor'][start:end, columns])
+    values = initial_cash * np.cumprod(np.where(before, 1.0, factor), axis=0)
+    return values, np.where(before, 0.0, held)
+
+def _score_batch(close, strategy, params, windows, objective, initial_cash, cost_bps):
+    """
+    Objective of every combination in params on every window, shape (windows, combinations).
+    """
+    signal_func, param_names = SWEEP_STRATEGIES[strategy]
+    signals = signal_func(close, *(params[name] for name in param_names))
+    arrays = _window_inputs(close, signals, cost_bps)
+    scores = np.empty((len(windows), signals.shape[1]))
+    for i, (start, end) in enumerate(windows):
+        values, exposure = _window_run(arrays, start, end, initial_cash, cost_bps)
+        scores[i] = compute_metrics(values, exposure)[objective]
+    return scores
+
+def _score_shared(task):
+    """
+    _score_batch on a close series attached from shared memory (picklable for worker processes).
+    """
+    handle, *rest = task
+    return _score_batch(attach_array(handle), *rest)
+
+def walk_forward(df, strategy, grid, n_folds=5, train_size=None, anchored=False, objective='Sharpe Ratio',
+                 initial_cash=10000, cost_bps=0.001, batch_size=256, workers=1):
+    """
+    Walk-forward optimization of a strategy's parameters.
+
+    On every fold the combination of grid with the best objective on the
+    train window is picked and then run on the following test window. The
+    test windows are stitched into one out-of-sample equity curve, each
+    starting flat with the equity the previous one ended with.
+
+    Signals of every combination are computed once over the whole history
+    (rolling windows only look back, so a window's signals are the same as
+    if its indicators had been warmed up on the bars before it), and the
+    long/flat simulation of any window is sliced from full-history growth
+    factors instead of being rerun, so overlapping train windows share all
+    indicator and simulation work. With workers > 1 the grid is split into
+    batches that are scored on every fold in parallel, reading the prices
+    from shared memory.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV data with a 'Close' column
+        strategy (str): One of optimization.sweep.SWEEP_STRATEGIES
+        grid (pd.DataFrame or dict): Parameter combinations, e.g. from parameter_grid
+        n_folds (int): Number of folds
+        train_size (int): Bars per train window; defaults to the test window size
+        anchored (bool): Grow the train windows from the first bar instead of rolling them
+        objective (str): Metric of compute_metrics maximised on the train windows
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        batch_size (int): Number of combinations simulated together
+        workers (int): Number of worker processes
+
+    Returns:
+        tuple: (DataFrame with one row per fold: windows, chosen parameters,
+            train objective and test metrics; DataFrame of the stitched
+            out-of-sample 'Portfolio Value', 'Exposure' and 'Fold';
+            out-of-sample metrics dict)
+    """
+    if strategy not in SWEEP_STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {sorted(SWEEP_STRATEGIES)}")
+    signal_func, param_names = SWEEP_STRATEGIES[strategy]
+    grid = pd.DataFrame(grid).reset_index(drop=True)
+    missing = [name for name in param_names if name not in grid.columns]
+    if missing:
+        raise ValueError(f"Parameter grid for '{strategy}' is missing columns: {missing}")
+
+    close = df['Close'].to_numpy(dtype=float)
+    folds = walk_forward_folds(len(close), n_folds, train_size, anchored)
+    train_windows = [(train_start, train_end) for train_start, train_end, _, _ in folds]
+
+    # Every batch of combinations is scored on all train windows at once;
+    # with workers, the grid is split into at least one batch per worker.
+    n_batches = max(-(-len(grid) // batch_size), min(workers, len(grid)))
+    batches = [grid.iloc[idx] for idx in np.array_split(np.arange(len(grid)), n_batches)]
+    tasks = [({name: chunk[name].to_numpy() for name in param_names}, train_windows, objective, initial_cash, cost_bps)
+             for chunk in batches]
+    if workers <= 1:
+        scores = [_score_batch(close, strategy, *task) for task in tasks]
+    else:
+        handle, block = share_array(close)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scores = list(pool.map(_score_shared, [(handle, strategy, *task) for task in tasks]))
+        finally:
+            release_blocks([block])
+    scores = np.concatenate(scores, axis=1)
+
+    # Best combination per fold; NaN scores lose, and an all-NaN fold keeps the first.
+    best = np.argmax(np.where(np.isnan(scores), -np.inf, scores), axis=1)
+    chosen = grid.iloc[best].reset_index(drop=True)
+    signals = signal_func(close, *(chosen[name].to_numpy() for name in param_names))
+    arrays = _window_inputs(close, signals, cost_bps)
+
+    equity = []
+    rows = []
+    capital = initial_cash
+    for i, (train_start, train_end, test_start, test_end) in enumerate(folds):
+        values, exposure = _window_run(arrays, test_start, test_end, capital, cost_bps, columns=[i])
+        capital = values[-1, 0]
+        equity.append(pd.DataFrame({'Portfolio Value': values[:, 0], 'Exposure': exposure[:, 0], 'Fold': i},
+                                   index=df.index[test_start:test_end]))
+
+        test_metrics = {name: value[0] for name, value in compute_metrics(values, exposure).items()}
+        rows.append({'Fold': i, 'Train Start': df.index[train_start], 'Train End': df.index[train_end - 1],
+                     'Test Start': df.index[test_start], 'Test End': df.index[test_end - 1],
+                     **chosen.iloc[i].to_dict(), f"Train {objective}": scores[i, best[i]], **test_metrics})
+
+    equity = pd.concat(equity)
+    return pd.DataFrame(rows), equity, calculate_performance_metrics(equity)
@@ -0,0 +1,57 @@
+import argparse
+from utils.utils import get_data, load_panel
+from optimization.pairs_scan import DF_CRITICAL_5PCT, scan_pairs
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan a universe of tickers for tradeable pairs")
+    parser.add_argument('--tickers', type=str, nargs='+', help='Ticker symbols')
+    parser.add_argument('--tickers-file', type=str, help='File with one ticker symbol per line')
+    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--lookback', type=int, default=30, help='Rolling window of the spread z-score')
+    parser.add_argument('--entry-z', type=float, default=1.0)
+    parser.add_argument('--exit-z', type=float, default=0.0)
+    parser.add_argument('--min-corr', type=float, default=0.8, help='Minimum daily return correlation (default: 0.8)')
+    parser.add_argument('--max-pairs', type=int, help='Keep at most this many of the most correlated pairs')
+    parser.add_argument('--cointegration', action='store_true',
+                        help='Also require a stationary spread (Dickey-Fuller test)')
+    parser.add_argument('--max-df-stat', type=float, default=DF_CRITICAL_5PCT,
+                        help=f'Largest accepted Dickey-Fuller statistic (default: {DF_CRITICAL_5PCT}, 5%% level)')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--sort-by', type=str, default='Sharpe Ratio', help='Metric used to rank pairs')
+    parser.add_argument('--top', type=int, default=20, help='Number of best pairs to print')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the full ranked table')
+
+    args = parser.parse_args()
+
+    tickers = list(args.tickers or [])
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers += [line.strip() for line in f if line.strip()]
+    if len(tickers) < 2:
+        parser.error('Provide at least two tickers with --tickers and/or --tickers-file')
+
+    print(f"Checking data for {len(tickers)} tickers...")
+    get_data(tickers, args.start, args.end)
+    print("Loading price panel...")
+    prices = load_panel(tickers, args.start, args.end)
+    n = prices.shape[1]
+    print(f"Loaded {n} tickers x {prices.shape[0]} dates ({n * (n - 1) // 2} pairs)")
+
+    print("Prefiltering and backtesting pairs...")
+    results = scan_pairs(prices, lookback=args.lookback, entry_z=args.entry_z, exit_z=args.exit_z,
+                         min_corr=args.min_corr, max_pairs=args.max_pairs, cointegration=args.cointegration,
+                         max_df_stat=args.max_df_stat, initial_cash=args.initial_cash,
+                         cost_bps=args.cost_bps, sort_by=args.sort_by)
+    print(f"{len(results)} directed pairs passed the prefilter")
+
+    print(f"\n--- Top {args.top} by {args.sort_by} ---")
+    print(results.head(args.top).to_string(index=False))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Saved results to {args.output}")
+
+if __name__ == "__main__":
+    main()
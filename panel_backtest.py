@@ -0,0 +1,87 @@
+import argparse
+import pandas as pd
+from utils.utils import get_data, load_panel
+from utils.profiling import PeakMemory
+from strategies.panel import PANEL_STRATEGIES
+from execution.execution import simulate_panel
+from metrics.metrics import calculate_performance_metrics_batch
+
+def run_panel(prices, strategy, strategy_params=None, initial_cash=10000, cost_bps=0.001):
+    """
+    Backtest one strategy on every ticker of a price panel at once.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        strategy (str): Key of PANEL_STRATEGIES
+        strategy_params (dict): Keyword arguments for the strategy
+        initial_cash (float): Starting portfolio cash per ticker
+        cost_bps (float): Transaction cost as a fraction of traded notional
+
+    Returns:
+        tuple: (metrics DataFrame indexed by ticker, portfolio value DataFrame)
+    """
+    signals = PANEL_STRATEGIES[strategy](prices, **(strategy_params or {}))
+    values, exposure = simulate_panel(prices, signals, initial_cash=initial_cash,
+                                      cost_bps=cost_bps, return_exposure=True)
+    metrics = pd.DataFrame(calculate_performance_metrics_batch(values.to_numpy(), exposure=exposure.to_numpy()),
+                           index=prices.columns)
+    metrics.index.name = 'Ticker'
+    return metrics, values
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest one strategy across a universe of tickers")
+    parser.add_argument('--tickers', type=str, nargs='+', help='Ticker symbols')
+    parser.add_argument('--tickers-file', type=str, help='File with one ticker symbol per line')
+    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--strategy', type=str, choices=sorted(PANEL_STRATEGIES), default='trend_following')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--short-window', type=int, default=10)
+    parser.add_argument('--long-window', type=int, default=30)
+    parser.add_argument('--rsi-period', type=int, default=14)
+    parser.add_argument('--rsi-lower', type=int, default=30)
+    parser.add_argument('--rsi-upper', type=int, default=70)
+    parser.add_argument('--bollinger-window', type=int, default=20)
+    parser.add_argument('--bollinger-std', type=float, default=2.0)
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--lean', action='store_true', help='Load prices as float32 to cut memory on large universes')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the per-ticker report')
+
+    args = parser.parse_args()
+
+    tickers = list(args.tickers or [])
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers += [line.strip() for line in f if line.strip()]
+    if not tickers:
+        parser.error('Provide --tickers and/or --tickers-file')
+
+    if args.strategy == 'trend_following':
+        params = {'short_window': args.short_window, 'long_window': args.long_window}
+    elif args.strategy == 'rsi':
+        params = {'period': args.rsi_period, 'lower': args.rsi_lower, 'upper': args.rsi_upper}
+    elif args.strategy == 'bollinger':
+        params = {'window': args.bollinger_window, 'num_std': args.bollinger_std}
+    else:
+        params = {}
+
+    print(f"Checking data for {len(tickers)} tickers...")
+    get_data(tickers, args.start, args.end)
+    with PeakMemory() as memory:
+        print("Loading price panel...")
+        prices = load_panel(tickers, args.start, args.end, lean=args.lean)
+        print(f"Loaded {prices.shape[1]} tickers x {prices.shape[0]} dates")
+
+        print("Running strategy, simulation and metrics...")
+        metrics, _ = run_panel(prices, args.strategy, params, initial_cash=args.initial_cash, cost_bps=args.cost_bps)
+    print(f"Peak memory: {memory}")
+
+    print("\n--- Performance by Ticker ---")
+    print(metrics.sort_values('Sharpe Ratio', ascending=False).to_string())
+
+    if args.output:
+        metrics.to_csv(args.output)
+        print(f"Saved report to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+from utils.results import RESULTS_DIR, ResultStore
+
+def main():
+    parser = argparse.ArgumentParser(description="List and compare backtest runs kept in the result store")
+    parser.add_argument('--results-dir', type=str, default=RESULTS_DIR)
+    parser.add_argument('--ticker', type=str, help='Only runs on this ticker')
+    parser.add_argument('--strategy', type=str, help='Only runs of this strategy')
+    parser.add_argument('--all-versions', action='store_true', help='Include runs stored by other versions of the code')
+    parser.add_argument('--sort-by', type=str, default='Sharpe Ratio', help='Metric used to rank runs')
+    parser.add_argument('--top', type=int, default=20, help='Number of runs to print')
+    parser.add_argument('--drop-stale', action='store_true', help='Delete runs stored by other versions of the code')
+    parser.add_argument('--max-mb', type=float, help='Evict least recently used runs down to this size')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the full table')
+
+    args = parser.parse_args()
+
+    results = ResultStore(args.results_dir)
+    if args.drop_stale:
+        print(f"Deleted {results.drop_stale()} stale run(s)")
+    if args.max_mb is not None:
+        print(f"Evicted {results.evict(args.max_mb * 1024 ** 2)} run(s)")
+
+    stats = results.stats()
+    print(f"{stats['runs']} stored run(s), {stats['bytes'] / 1024 ** 2:.1f} MB")
+
+    runs = results.query(ticker=args.ticker, strategy=args.strategy, current_only=not args.all_versions)
+    if runs.empty:
+        return
+    if args.sort_by in runs.columns:
+        ranked = runs.assign(_rank=runs[args.sort_by].where(runs[args.sort_by] != 'N/A').astype(float))
+        runs = ranked.sort_values('_rank', ascending=False, na_position='last').drop(columns='_rank')
+
+    print(f"\n--- Top {args.top} by {args.sort_by} ---")
+    print(runs.drop(columns=['Key', 'Bytes']).head(args.top).to_string(index=False))
+
+    if args.output:
+        runs.to_csv(args.output, index=False)
+        print(f"Saved runs to {args.output}")
+
+if __name__ == "__main__":
+    main()
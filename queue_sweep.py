@@ -0,0 +1,139 @@
+import argparse
+from utils.job_queue import QUEUE_PATH, JobQueue
+from strategies.registry import STRATEGIES
+from execution.long_short import SIZING_METHODS
+from optimization.sweep import parameter_grid
+from optimization.distributed import sweep_chunks, run_local_workers, collect_sweep
+
+def submit(args, queue):
+    grids = {
+        'trend_following': parameter_grid(short_window=args.short_window, long_window=args.long_window),
+        'rsi': parameter_grid(period=args.rsi_period, lower=args.rsi_lower, upper=args.rsi_upper),
+        'bollinger': parameter_grid(window=args.bollinger_window, num_std=args.bollinger_std),
+    }
+    execution = None
+    if args.allow_short or args.sizing != 'fixed' or args.fraction != 1 or args.cost_per_share or args.slippage:
+        execution = {'allow_short': args.allow_short, 'sizing': args.sizing, 'fraction': args.fraction,
+                     'target_vol': args.target_vol, 'cost_per_share': args.cost_per_share, 'slippage': args.slippage}
+
+    sweep, chunks = sweep_chunks(args.ticker, args.strategy, grids, args.start, args.end,
+                                 pair_ticker=args.pair_ticker, initial_cash=args.initial_cash,
+                                 cost_bps=args.cost_bps, execution=execution, chunk_size=args.chunk_size)
+    spec = {key: value for key, value in vars(args).items() if key not in ('command', 'queue')}
+    added = queue.submit(sweep, chunks, spec)
+    combinations = sum(len(chunk['params']) for chunk in chunks)
+    print(f"Sweep {sweep}: {combinations} combination(s) in {len(chunks)} chunk(s), {added} newly queued")
+
+def status(queue):
+    sweeps = queue.status()
+    if not sweeps:
+        print("Queue is empty")
+    for sweep, counts in sweeps.items():
+        print(f"{sweep}: " + ", ".join(f"{counts.get(s, 0)} {s}" for s in ('pending', 'running', 'done', 'failed')))
+    for chunk_id, worker, error in queue.errors():
+        print(f"Chunk {chunk_id} failed on {worker}: {error}")
+
+def collect(args, queue):
+    sweeps = list(queue.status())
+    sweep = args.sweep or (sweeps[-1] if sweeps else None)
+    results = collect_sweep(queue, sweep) if sweep else None
+    if results is None or results.empty:
+        print("No completed chunks")
+        return
+    unfinished = queue.unfinished(sweep)
+    print(f"Sweep {sweep}: {len(results)} result(s)" + (f", {unfinished} chunk(s) unfinished" if unfinished else ""))
+
+    print(f"\n--- Top {args.top} by {args.sort_by} ---")
+    print(results.sort_values(args.sort_by, ascending=False).head(args.top).to_string(index=False))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Saved results to {args.output}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Queue a large sweep as chunks, run it with any number of workers and resume it after interruptions")
+    parser.add_argument('--queue', type=str, default=QUEUE_PATH,
+                        help=f'SQLite queue file shared by all workers (default: {QUEUE_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit_parser = commands.add_parser('submit', help='Expand tickers x strategies x parameters into queued chunks')
+    submit_parser.add_argument('--ticker', type=str, nargs='+', required=True, help='Ticker symbol(s)')
+    submit_parser.add_argument('--pair-ticker', type=str, help='Second ticker for pairs trading')
+    submit_parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    submit_parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    submit_parser.add_argument('--strategy', type=str, nargs='+', choices=list(STRATEGIES),
+                               default=['trend_following'])
+    submit_parser.add_argument('--initial-cash', type=float, default=10000)
+    submit_parser.add_argument('--short-window', type=int, nargs='+', default=[10])
+    submit_parser.add_argument('--long-window', type=int, nargs='+', default=[30])
+    submit_parser.add_argument('--rsi-period', type=int, nargs='+', default=[14])
+    submit_parser.add_argument('--rsi-lower', type=int, nargs='+', default=[30])
+    submit_parser.add_argument('--rsi-upper', type=int, nargs='+', default=[70])
+    submit_parser.add_argument('--bollinger-window', type=int, nargs='+', default=[20])
+    submit_parser.add_argument('--bollinger-std', type=float, nargs='+', default=[2.0])
+    submit_parser.add_argument('--cost-bps', type=float, default=0.001,
+                               help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    submit_parser.add_argument('--allow-short', action='store_true',
+                               help='Trade -1 signals as shorts instead of only closing longs')
+    submit_parser.add_argument('--sizing', type=str, choices=SIZING_METHODS, default='fixed')
+    submit_parser.add_argument('--fraction', type=float, default=1.0,
+                               help='Fraction of equity per entry with fixed sizing')
+    submit_parser.add_argument('--target-vol', type=float, default=0.15,
+                               help='Annualised volatility target with volatility sizing (default: 0.15)')
+    submit_parser.add_argument('--cost-per-share', type=float, default=0.0, help='Transaction cost per share traded')
+    submit_parser.add_argument('--slippage', type=float, default=0.0,
+                               help='Fraction of the bar high-low range lost on every fill')
+    submit_parser.add_argument('--chunk-size', type=int, default=64,
+                               help='Parameter combinations per chunk (default: 64)')
+
+    work_parser = commands.add_parser('work', help='Claim and run chunks until none are left')
+    work_parser.add_argument('--processes', type=int, default=1,
+                             help='Worker processes on this machine (default: 1)')
+    work_parser.add_argument('--lease', type=float, default=120,
+                             help='Seconds a claimed chunk stays leased without renewal (default: 120)')
+    work_parser.add_argument('--wait', action='store_true',
+                             help='Keep polling while other workers hold chunks, to take over expired leases')
+    work_parser.add_argument('--max-chunks', type=int, help='Stop each worker after this many chunks')
+
+    commands.add_parser('status', help='Chunk counts per sweep and errors of failed chunks')
+
+    requeue_parser = commands.add_parser('requeue', help='Retry failed chunks')
+    requeue_parser.add_argument('--sweep', type=str, help='Only chunks of this sweep')
+    requeue_parser.add_argument('--running', action='store_true',
+                                help='Also release running chunks, once all their workers are known to be stopped')
+
+    collect_parser = commands.add_parser('collect', help='Gather the checkpointed results of a sweep')
+    collect_parser.add_argument('--sweep', type=str, help='Sweep id (default: the latest submitted)')
+    collect_parser.add_argument('--sort-by', type=str, default='Sharpe Ratio', help='Metric used to rank combinations')
+    collect_parser.add_argument('--top', type=int, default=10, help='Number of best combinations to print')
+    collect_parser.add_argument('--output', type=str, help='Optional CSV path for the full results table')
+
+    args = parser.parse_args()
+    if args.command == 'submit' and 'pairs' in args.strategy and not args.pair_ticker:
+        parser.error('The pairs strategy needs --pair-ticker')
+
+    if args.command == 'work':
+        completed = run_local_workers(args.queue, args.processes, lease_seconds=args.lease, wait=args.wait,
+                                      max_chunks=args.max_chunks)
+        print(f"Completed {completed} chunk(s)")
+        queue = JobQueue(args.queue)
+        status(queue)
+        queue.close()
+        return
+
+    queue = JobQueue(args.queue)
+    try:
+        if args.command == 'submit':
+            submit(args, queue)
+        elif args.command == 'status':
+            status(queue)
+        elif args.command == 'requeue':
+            print(f"Requeued {queue.requeue(sweep=args.sweep, running=args.running)} chunk(s)")
+        elif args.command == 'collect':
+            collect(args, queue)
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+from utils.utils import load_data, get_data
+from strategies.panel import PANEL_STRATEGIES
+from optimization.robustness import BOOTSTRAP_METHODS, robustness_analysis
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for a strategy's metrics")
+    parser.add_argument('--ticker', type=str, required=True, help='Ticker symbol')
+    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--strategy', type=str, choices=sorted(PANEL_STRATEGIES), default='trend_following')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--short-window', type=int, default=10)
+    parser.add_argument('--long-window', type=int, default=30)
+    parser.add_argument('--rsi-period', type=int, default=14)
+    parser.add_argument('--rsi-lower', type=int, default=30)
+    parser.add_argument('--rsi-upper', type=int, default=70)
+    parser.add_argument('--bollinger-window', type=int, default=20)
+    parser.add_argument('--bollinger-std', type=float, default=2.0)
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--paths', type=int, default=10000, help='Number of resampled paths (default: 10000)')
+    parser.add_argument('--method', type=str, choices=BOOTSTRAP_METHODS, default='stationary')
+    parser.add_argument('--block-size', type=int, default=20, help='(Mean) bootstrap block length in bars')
+    parser.add_argument('--target', type=str, choices=['prices', 'returns'], default='prices',
+                        help="Resample the price path and rerun the strategy, or resample the strategy's returns")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: all cores)')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the per-path metrics')
+
+    args = parser.parse_args()
+
+    if args.strategy == 'trend_following':
+        params = {'short_window': args.short_window, 'long_window': args.long_window}
+    elif args.strategy == 'rsi':
+        params = {'period': args.rsi_period, 'lower': args.rsi_lower, 'upper': args.rsi_upper}
+    elif args.strategy == 'bollinger':
+        params = {'window': args.bollinger_window, 'num_std': args.bollinger_std}
+    else:
+        params = {}
+
+    print(f"Checking data for {args.ticker}...")
+    get_data([args.ticker], args.start, args.end)
+    print(f"Loading data for {args.ticker}...")
+    df = load_data(args.ticker, args.start, args.end)
+
+    print(f"Resampling {args.paths} {args.method} bootstrap paths of the {args.target}...")
+    summary, samples = robustness_analysis(
+        df, args.strategy, params, n_paths=args.paths, method=args.method, block_size=args.block_size,
+        target=args.target, seed=args.seed, initial_cash=args.initial_cash, cost_bps=args.cost_bps,
+        confidence=args.confidence, workers=args.workers)
+
+    print(f"\n--- Bootstrap Distribution ({args.confidence:.0%} CI) ---")
+    print(summary.round(2).to_string())
+
+    if args.output:
+        samples.to_csv(args.output)
+        print(f"Saved per-path metrics to {args.output}")
+
+if __name__ == "__main__":
+    main()
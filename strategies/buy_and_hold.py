@@ -1,4 +1,9 @@
-def buy_and_hold(df):
-    df = df.copy()
-    df['Signal'] = 1
-    return df
\ No newline at end of file
+import numpy as np
+from utils.profiling import instrument
+
+@instrument('strategy')
+def buy_and_hold(df, copy=True):
+    if copy:
+        df = df.copy()
+    df['Signal'] = np.int8(1)
+    return df
@@ -0,0 +1,66 @@
+import inspect
+import pandas as pd
+from utils.cache import indicator_cache
+from strategies.registry import get_strategy
+
+# Strategy name -> parameters that set how many past bars its indicators
+# look back over. The longest of them is carried from one block to the next.
+WARMUP_PARAMS = {
+    'trend_following': ('short_window', 'long_window'),
+    'buy_and_hold': (),
+    'rsi': ('period',),
+    'bollinger': ('window',),
+    'pairs': ('lookback',),
+}
+
+class ChunkedStrategy:
+    """
+    Run a registered strategy over consecutive blocks of bars.
+
+    The rolling indicators of a strategy only depend on the last few bars,
+    so each block is run together with the tail of the previous blocks that
+    its windows reach back into (the longest window, plus the bar the RSI
+    diff needs). Only rows of the new block are returned, and they match a
+    single run over the whole history.
+
+    Parameters:
+        name (str): Key of strategies.registry.STRATEGIES
+        **params: Keyword arguments for the strategy
+    """
+
+    def __init__(self, name, **params):
+        if name not in WARMUP_PARAMS:
+            raise ValueError(f"Strategy '{name}' has no chunked version. Expected one of {sorted(WARMUP_PARAMS)}")
+        self.func = get_strategy(name)
+        self.params = params
+
+        defaults = {key: p.default for key, p in inspect.signature(self.func).parameters.items()}
+        self.warmup = max((int(params.get(key, defaults[key])) for key in WARMUP_PARAMS[name]), default=0)
+        self.tails = None
+        self.accepts_copy = 'copy' in defaults
+
+    def update(self, *blocks):
+        """
+        Run the strategy on the next block(s) of bars, one per input DataFrame.
+
+        Returns:
+            pd.DataFrame: Strategy output for the rows of the new block
+        """
+        params = self.params
+        if self.tails is not None:
+            blocks = [pd.concat([tail, block]) for tail, block in zip(self.tails, blocks)]
+            # The concatenated frames are our own, so the strategy can add
+            # its columns to them instead of copying.
+            if self.accepts_copy:
+                params = {**params, 'copy': False}
+        carried = 0 if self.tails is None else len(self.tails[0])
+        inputs = [block.columns for block in blocks]
+
+        # Blocks are never seen twice, so caching their indicators would
+        # only hold memory. Pairs output only keeps dates both inputs have,
+        # so the tail is taken from the output's dates.
+        with indicator_cache.disabled():
+            df = self.func(*blocks, **params)
+        tail_index = df.index[-self.warmup:] if self.warmup else df.index[:0]
+        self.tails = [block.loc[tail_index, columns] for block, columns in zip(blocks, inputs)]
+        return df.iloc[carried:]
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
+from utils.cache import rolling_mean, rolling_std
+from utils.profiling import instrument
 
-def rsi_strategy(df, period=14, lower=30, upper=70):
+@instrument('strategy')
+def rsi_strategy(df, period=14, lower=30, upper=70, copy=True):
     """
     Implements a simple RSI-based trading strategy.
 
@@ -12,29 +16,32 @@ def rsi_strategy(df, period=14, lower=30, upper=70):
         period (int): Lookback period for RSI calculation.
         lower (int): RSI level below which to trigger a buy.
         upper (int): RSI level above which to trigger a sell.
+        copy (bool): Add the columns to a copy of df; False adds them to df itself.
 
     Returns:
         pd.DataFrame: DataFrame with RSI and 'Signal' columns.
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
     delta = df['Close'].diff()
     gain = delta.where(delta > 0, 0)
     loss = -delta.where(delta < 0, 0)
 
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
 
     rs = avg_gain / avg_loss
     df['RSI'] = 100 - (100 / (1 + rs))
 
-    df['Signal'] = 0
+    df['Signal'] = np.int8(0)
     df.loc[df['RSI'] < lower, 'Signal'] = 1
     df.loc[df['RSI'] > upper, 'Signal'] = -1
 
     return df
 
-def bollinger_band_strategy(df, window=20, num_std=2):
+@instrument('strategy')
+def bollinger_band_strategy(df, window=20, num_std=2, copy=True):
     """
     Implements a Bollinger Band trading strategy.
 
@@ -45,20 +52,22 @@ def bollinger_band_strategy(df, window=20, num_std=2):
         df (pd.DataFrame): OHLCV data with 'Close'
         window (int): SMA window
         num_std (float): Number of std deviations
+        copy (bool): Add the columns to a copy of df; False adds them to df itself
 
     Returns:
         pd.DataFrame: With bands and Signal column
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
-    rolling_mean = df['Close'].rolling(window=window).mean()
-    rolling_std = df['Close'].rolling(window=window).std()
+    band_mean = rolling_mean(df['Close'], window)
+    band_std = rolling_std(df['Close'], window)
 
-    df['Middle_Band'] = rolling_mean
-    df['Upper_Band'] = rolling_mean + num_std * rolling_std
-    df['Lower_Band'] = rolling_mean - num_std * rolling_std
+    df['Middle_Band'] = band_mean
+    df['Upper_Band'] = band_mean + num_std * band_std
+    df['Lower_Band'] = band_mean - num_std * band_std
 
-    df['Signal'] = 0
+    df['Signal'] = np.int8(0)
     df.loc[df['Close'] < df['Lower_Band'], 'Signal'] = 1
     df.loc[df['Close'] > df['Upper_Band'], 'Signal'] = -1
 
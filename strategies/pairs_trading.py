@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
+from utils.cache import rolling_mean, rolling_std
+from utils.profiling import instrument
 
+@instrument('strategy')
 def pairs_trading_strategy(df_a, df_b, lookback=30, entry_z=1.0, exit_z=0.0):
     """
     Implements a basic pairs trading strategy using the spread between two assets.
@@ -22,11 +26,11 @@ def pairs_trading_strategy(df_a, df_b, lookback=30, entry_z=1.0, exit_z=0.0):
     df['Spread'] = df['Price_A'] - df['Price_B']
     df['Close'] = df['Spread']
 
-    df['Mean'] = df['Spread'].rolling(window=lookback).mean()
-    df['Std'] = df['Spread'].rolling(window=lookback).std()
+    df['Mean'] = rolling_mean(df['Spread'], lookback)
+    df['Std'] = rolling_std(df['Spread'], lookback)
     df['ZScore'] = (df['Spread'] - df['Mean']) / df['Std']
 
-    df['Signal'] = 0
+    df['Signal'] = np.int8(0)
     df.loc[df['ZScore'] > entry_z, 'Signal'] = -1
     df.loc[df['ZScore'] < -entry_z, 'Signal'] = 1
     df.loc[df['ZScore'].abs() < exit_z, 'Signal'] = 0
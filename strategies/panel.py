@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+def _as_signal(prices, signal):
+    return pd.DataFrame(signal, index=prices.index, columns=prices.columns)
+
+def moving_average_trend_following_panel(prices, short_window=50, long_window=200):
+    """
+    Column-wise moving_average_trend_following over a dates x tickers panel of closes.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        short_window (int): Window for short moving average
+        long_window (int): Window for long moving average
+
+    Returns:
+        pd.DataFrame: Signal per ticker
+    """
+    sma_short = prices.rolling(window=short_window).mean().to_numpy()
+    sma_long = prices.rolling(window=long_window).mean().to_numpy()
+
+    mask = ~np.isnan(sma_short) & ~np.isnan(sma_long)
+    return _as_signal(prices, np.where(mask, np.where(sma_short > sma_long, 1, -1), 0))
+
+def rsi_strategy_panel(prices, period=14, lower=30, upper=70):
+    """
+    Column-wise rsi_strategy over a dates x tickers panel of closes.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        period (int): Lookback period for RSI calculation
+        lower (int): RSI level below which to trigger a buy
+        upper (int): RSI level above which to trigger a sell
+
+    Returns:
+        pd.DataFrame: Signal per ticker
+    """
+    close = prices.to_numpy(dtype=float)
+    delta = np.full_like(close, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    gain = np.where(delta > 0, delta, 0)
+    loss = -np.where(delta < 0, delta, 0)
+
+    # A single-ticker run counts its first bar as a zero change; bars before
+    # a ticker's first price must not, or windows would fill up early.
+    listed = np.maximum.accumulate(~np.isnan(close), axis=0)
+    gain = pd.DataFrame(np.where(listed, gain, np.nan))
+    loss = pd.DataFrame(np.where(listed, loss, np.nan))
+
+    avg_gain = gain.rolling(window=period).mean().to_numpy()
+    avg_loss = loss.rolling(window=period).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    signal = np.zeros(close.shape, dtype=int)
+    signal[rsi < lower] = 1
+    signal[rsi > upper] = -1
+    return _as_signal(prices, signal)
+
+def bollinger_band_strategy_panel(prices, window=20, num_std=2):
+    """
+    Column-wise bollinger_band_strategy over a dates x tickers panel of closes.
+
+    Parameters:
+        prices (pd.DataFrame): Close prices, one column per ticker
+        window (int): SMA window
+        num_std (float): Number of std deviations
+
+    Returns:
+        pd.DataFrame: Signal per ticker
+    """
+    rolling_mean = prices.rolling(window=window).mean().to_numpy()
+    rolling_std = prices.rolling(window=window).std().to_numpy()
+    close = prices.to_numpy(dtype=float)
+
+    signal = np.zeros(close.shape, dtype=int)
+    signal[close < rolling_mean - num_std * rolling_std] = 1
+    signal[close > rolling_mean + num_std * rolling_std] = -1
+    return _as_signal(prices, signal)
+
+def buy_and_hold_panel(prices):
+    """
+    Column-wise buy_and_hold over a dates x tickers panel of closes.
+    """
+    return _as_signal(prices, np.ones(prices.shape, dtype=int))
+
+PANEL_STRATEGIES = {
+    'trend_following': moving_average_trend_following_panel,
+    'buy_and_hold': buy_and_hold_panel,
+    'rsi': rsi_strategy_panel,
+    'bollinger': bollinger_band_strategy_panel,
+}
@@ -0,0 +1,29 @@
+import importlib
+
+# Strategy name -> (module, function). Modules are imported on first use so
+# a run only pays for the strategies it actually needs.
+STRATEGIES = {
+    'trend_following': ('strategies.trend_following', 'moving_average_trend_following'),
+    'buy_and_hold': ('strategies.buy_and_hold', 'buy_and_hold'),
+    'rsi': ('strategies.mean_reversion', 'rsi_strategy'),
+    'bollinger': ('strategies.mean_reversion', 'bollinger_band_strategy'),
+    'pairs': ('strategies.pairs_trading', 'pairs_trading_strategy'),
+}
+
+def get_strategy(name):
+    """
+    Import and return the strategy function registered under name.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Expected one of {sorted(STRATEGIES)}")
+    module_name, func_name = STRATEGIES[name]
+    return getattr(importlib.import_module(module_name), func_name)
+
+def strategy_name(func):
+    """
+    Name under which a strategy function is registered, or its own name if it is not.
+    """
+    for name, (module_name, func_name) in STRATEGIES.items():
+        if func.__module__ == module_name and func.__name__ == func_name:
+            return name
+    return func.__name__
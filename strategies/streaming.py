@@ -0,0 +1,228 @@
+import math
+from collections import deque
+
+class RollingMean:
+    """
+    Trailing mean over a fixed window, updated in O(1) per value.
+
+    Matches pd.Series.rolling(window).mean(): the mean is NaN until the
+    window is full and while it contains a NaN. The running sum is
+    recomputed from the window once every `window` updates, which keeps
+    rounding drift bounded at amortized O(1) cost.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nan_count = 0
+        self._since_resync = 0
+        self.value = math.nan
+
+    def update(self, value):
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+            self._since_resync = 0
+
+        if len(self.values) < self.window or self.nan_count:
+            self.value = math.nan
+        else:
+            self.value = self.total / self.window
+        return self.value
+
+class RollingMeanStd:
+    """
+    Trailing mean and sample standard deviation over a fixed window.
+
+    Uses Welford's update for values entering and leaving the window, so
+    each update is O(1); mean and M2 are recomputed from the window every
+    `window` updates. Matches pandas' rolling(window).mean()/.std().
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.count = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+        self.nan_count = 0
+        self._since_resync = 0
+        self.mean = math.nan
+        self.std = math.nan
+
+    def _add(self, value):
+        self.count += 1
+        delta = value - self.mean_
+        self.mean_ += delta / self.count
+        self.m2 += delta * (value - self.mean_)
+
+    def _remove(self, value):
+        self.count -= 1
+        if self.count == 0:
+            self.mean_ = 0.0
+            self.m2 = 0.0
+            return
+        delta = value - self.mean_
+        self.mean_ -= delta / self.count
+        self.m2 -= delta * (value - self.mean_)
+
+    def _resync(self):
+        valid = [v for v in self.values if not math.isnan(v)]
+        self.count = len(valid)
+        self.mean_ = math.fsum(valid) / self.count if valid else 0.0
+        self.m2 = math.fsum((v - self.mean_) ** 2 for v in valid)
+
+    def update(self, value):
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self._add(value)
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self._remove(old)
+
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+            self._since_resync = 0
+
+        if len(self.values) < self.window or self.nan_count:
+            self.mean = math.nan
+            self.std = math.nan
+        else:
+            self.mean = self.mean_
+            self.std = math.sqrt(max(self.m2, 0.0) / (self.window - 1)) if self.window > 1 else math.nan
+        return self.mean, self.std
+
+class TrendFollowingStream:
+    """
+    Bar-by-bar moving_average_trend_following.
+    """
+
+    def __init__(self, short_window=50, long_window=200):
+        self.sma_short = RollingMean(short_window)
+        self.sma_long = RollingMean(long_window)
+
+    def update(self, close):
+        """
+        Consume one close and return the batch columns for this bar.
+        """
+        short = self.sma_short.update(close)
+        long = self.sma_long.update(close)
+        signal = 0
+        if not (math.isnan(short) or math.isnan(long)):
+            signal = 1 if short > long else -1
+        return {'SMA_Short': short, 'SMA_Long': long, 'Signal': signal}
+
+class RSIStream:
+    """
+    Bar-by-bar rsi_strategy (RSI from rolling means of gains and losses).
+    """
+
+    def __init__(self, period=14, lower=30, upper=70):
+        self.avg_gain = RollingMean(period)
+        self.avg_loss = RollingMean(period)
+        self.lower = lower
+        self.upper = upper
+        self.prev_close = None
+
+    def update(self, close):
+        """
+        Consume one close and return the batch columns for this bar.
+        """
+        # The first bar has no change; the batch version counts it as zero.
+        delta = math.nan if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        avg_gain = self.avg_gain.update(gain)
+        avg_loss = self.avg_loss.update(loss)
+        if math.isnan(avg_gain) or math.isnan(avg_loss) or (avg_gain == 0 and avg_loss == 0):
+            rsi = math.nan
+        elif avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        signal = 0
+        if rsi < self.lower:
+            signal = 1
+        elif rsi > self.upper:
+            signal = -1
+        return {'RSI': rsi, 'Signal': signal}
+
+class BollingerStream:
+    """
+    Bar-by-bar bollinger_band_strategy.
+    """
+
+    def __init__(self, window=20, num_std=2):
+        self.stats = RollingMeanStd(window)
+        self.num_std = num_std
+
+    def update(self, close):
+        """
+        Consume one close and return the batch columns for this bar.
+        """
+        mean, std = self.stats.update(close)
+        upper = mean + self.num_std * std
+        lower = mean - self.num_std * std
+
+        signal = 0
+        if close < lower:
+            signal = 1
+        elif close > upper:
+            signal = -1
+        return {'Middle_Band': mean, 'Upper_Band': upper, 'Lower_Band': lower, 'Signal': signal}
+
+class PairsTradingStream:
+    """
+    Bar-by-bar pairs_trading_strategy on the spread of two prices.
+
+    The traded 'Close' is the spread, as in the batch version.
+    """
+
+    def __init__(self, lookback=30, entry_z=1.0, exit_z=0.0):
+        self.stats = RollingMeanStd(lookback)
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+
+    def update(self, price_a, price_b):
+        """
+        Consume one pair of prices and return the batch columns for this bar.
+        """
+        spread = price_a - price_b
+        mean, std = self.stats.update(spread)
+        zscore = (spread - mean) / std if std else math.nan
+        if std == 0 and spread != mean:
+            zscore = math.copysign(math.inf, spread - mean)
+
+        signal = 0
+        if zscore > self.entry_z:
+            signal = -1
+        if zscore < -self.entry_z:
+            signal = 1
+        if abs(zscore) < self.exit_z:
+            signal = 0
+        return {'Price_A': price_a, 'Price_B': price_b, 'Spread': spread, 'Close': spread,
+                'Mean': mean, 'Std': std, 'ZScore': zscore, 'Signal': signal}
@@ -1,7 +1,10 @@
 import pandas as pd
 import numpy as np
+from utils.cache import rolling_mean
+from utils.profiling import instrument
 
-def moving_average_trend_following(df, short_window=50, long_window=200):
+@instrument('strategy')
+def moving_average_trend_following(df, short_window=50, long_window=200, copy=True):
     """
     Calculate moving average crossover signals.
 
@@ -9,19 +12,19 @@ def moving_average_trend_following(df, short_window=50, long_window=200):
         df (pd.DataFrame): Stock OHLCV data
         short_window (int): Window for short moving average
         long_window (int): Window for long moving average
+        copy (bool): Add the columns to a copy of df; False adds them to df itself
 
     Returns:
         pd.DataFrame: Original DataFrame with added MA columns and 'Signal' column
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
-    df['SMA_Short'] = df['Close'].rolling(window=short_window).mean()
-    df['SMA_Long'] = df['Close'].rolling(window=long_window).mean()
-
-    df['Signal'] = 0
+    df['SMA_Short'] = rolling_mean(df['Close'], short_window)
+    df['SMA_Long'] = rolling_mean(df['Close'], long_window)
 
     mask = df['SMA_Short'].notna() & df['SMA_Long'].notna()
 
-    df.loc[mask, 'Signal'] = np.where(df.loc[mask, 'SMA_Short'] > df.loc[mask, 'SMA_Long'], 1, -1)
+    df['Signal'] = np.where(mask, np.where(df['SMA_Short'] > df['SMA_Long'], 1, -1), 0).astype(np.int8)
 
     return df
\ No newline at end of file
@@ -0,0 +1,49 @@
+import argparse
+from utils.utils import load_data, get_data
+from optimization.sweep import parameter_grid, sweep_strategy
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep for a single-asset strategy")
+    parser.add_argument('--ticker', type=str, required=True, help='Ticker symbol')
+    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--strategy', type=str, choices=['trend_following', 'rsi', 'bollinger'], default='trend_following')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--short-window', type=int, nargs='+', default=[10])
+    parser.add_argument('--long-window', type=int, nargs='+', default=[30])
+    parser.add_argument('--rsi-period', type=int, nargs='+', default=[14])
+    parser.add_argument('--rsi-lower', type=int, nargs='+', default=[30])
+    parser.add_argument('--rsi-upper', type=int, nargs='+', default=[70])
+    parser.add_argument('--bollinger-window', type=int, nargs='+', default=[20])
+    parser.add_argument('--bollinger-std', type=float, nargs='+', default=[2.0])
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--sort-by', type=str, default='Sharpe Ratio', help='Metric used to rank combinations')
+    parser.add_argument('--top', type=int, default=10, help='Number of best combinations to print')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the full results table')
+
+    args = parser.parse_args()
+
+    if args.strategy == 'trend_following':
+        grid = parameter_grid(short_window=args.short_window, long_window=args.long_window)
+    elif args.strategy == 'rsi':
+        grid = parameter_grid(period=args.rsi_period, lower=args.rsi_lower, upper=args.rsi_upper)
+    elif args.strategy == 'bollinger':
+        grid = parameter_grid(window=args.bollinger_window, num_std=args.bollinger_std)
+
+    print(f"Checking data for {args.ticker}...")
+    get_data([args.ticker], args.start, args.end)
+    print(f"Loading data for {args.ticker}...")
+    df = load_data(args.ticker, args.start, args.end)
+
+    print(f"Sweeping {len(grid)} parameter combinations...")
+    results = sweep_strategy(df, args.strategy, grid, initial_cash=args.initial_cash, cost_bps=args.cost_bps)
+
+    print(f"\n--- Top {args.top} by {args.sort_by} ---")
+    print(results.sort_values(args.sort_by, ascending=False).head(args.top).to_string(index=False))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Saved results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import pandas as pd
+from utils.downsample import thin_markers
+
+def test_thin_markers_keeps_first_marker_per_pixel_column():
+    index = pd.bdate_range('2000-01-03', periods=10_000, name='Date')
+    # A dense cluster of entries at the start and one entry at the very end.
+    buys = pd.DataFrame({'Close': 1.0}, index=index[list(range(3000)) + [9999]])
+    sells = pd.DataFrame({'Close': 1.0}, index=index[1:3001:2])
+
+    kept_buys = thin_markers(buys, index, pixels=100)
+    kept_sells = thin_markers(sells, index, pixels=100)
+
+    # 3000 of 10000 bars span 30 pixel columns, plus the last column.
+    assert list(kept_buys.index) == [index[i * 100] for i in range(30)] + [index[9999]]
+    assert list(kept_sells.index) == [index[1]] + [index[i * 100 + 1] for i in range(1, 30)]
+
+def test_thin_markers_leaves_few_markers_alone():
+    index = pd.bdate_range('2000-01-03', periods=1000)
+    markers = pd.DataFrame({'Close': 1.0}, index=index[:50])
+    assert thin_markers(markers, index, pixels=100).equals(markers)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from execution.execution import simulate_portfolio, simulate_trades
+
+def reference_simulate_trades(df, initial_cash=10000, cost_bps=0.001):
+    """
+    The original row-by-row simulation that simulate_trades replaced.
+    """
+    df = df.copy()
+    cash = initial_cash
+    position = 0
+    portfolio_values = []
+
+    for i, row in df.iterrows():
+        price = row['Close']
+        signal = row['Signal']
+
+        if signal == 1 and position == 0:
+            notional = cash
+            cost = notional * cost_bps
+            position = (cash - cost) / price
+            cash = 0
+        elif signal == -1 and position > 0:
+            notional = position * price
+            cost = notional * cost_bps
+            cash = notional - cost
+            position = 0
+
+        portfolio_value = cash + (position * price)
+        portfolio_values.append(portfolio_value)
+
+    df['Portfolio Value'] = portfolio_values
+    return df
+
+def _frame(close, signal):
+    index = pd.bdate_range('2020-01-01', periods=len(close), name='Date')
+    return pd.DataFrame({'Close': close, 'Signal': signal}, index=index)
+
+def _random_frame(seed, n=500, nan_share=0.1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    # Runs of repeated signals, so consecutive same-direction signals are common.
+    signal = np.repeat(rng.choice([-1.0, 0.0, 1.0], size=n // 5 + 1), 5)[:n]
+    signal[rng.random(n) < nan_share] = np.nan
+    return _frame(close, signal)
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('cost_bps', [0.0, 0.001, 0.01])
+def test_simulate_trades_matches_loop(seed, cost_bps):
+    df = _random_frame(seed)
+    expected = reference_simulate_trades(df, cost_bps=cost_bps)['Portfolio Value']
+    result = simulate_trades(df, cost_bps=cost_bps)['Portfolio Value']
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+def test_simulate_trades_matches_loop_on_repeated_signals():
+    df = _frame([10.0, 11, 12, 11, 13, 14, 12, 15], [1, 1, 1, -1, -1, 1, np.nan, -1])
+    expected = reference_simulate_trades(df, cost_bps=0.002)['Portfolio Value']
+    np.testing.assert_allclose(simulate_trades(df, cost_bps=0.002)['Portfolio Value'], expected, rtol=1e-12)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_simulate_trades_matches_loop_on_non_positive_prices(seed):
+    df = _random_frame(seed, n=200)
+    rng = np.random.default_rng(seed + 100)
+    df.loc[df.index[rng.choice(len(df), 20, replace=False)], 'Close'] *= -1
+    df.loc[df.index[rng.choice(len(df), 5, replace=False)], 'Close'] = 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = reference_simulate_trades(df)['Portfolio Value']
+        result = simulate_trades(df)['Portfolio Value']
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+def test_simulate_portfolio_columns_match_loop():
+    frames = [_random_frame(seed) for seed in range(4)]
+    close = np.column_stack([df['Close'] for df in frames])
+    signal = np.column_stack([df['Signal'] for df in frames])
+    values = simulate_portfolio(close, signal, cost_bps=0.001)
+    for j, df in enumerate(frames):
+        expected = reference_simulate_trades(df, cost_bps=0.001)['Portfolio Value']
+        np.testing.assert_allclose(values[:, j], expected.to_numpy(), rtol=1e-12)
@@ -0,0 +1,87 @@
+import json
+import sqlite3
+import time
+import pytest
+from optimization.distributed import sweep_chunks, run_local_workers, run_worker, collect_sweep
+from optimization.sweep import parameter_grid
+from utils.job_queue import JobQueue
+from utils.synthetic import generate_universe, write_csv
+
+START, END = '2000-01-01', '2010-01-01'
+
+@pytest.fixture
+def queue_path(tmp_path, monkeypatch):
+    # Workers read data/ relative to the working directory, like the CLI.
+    monkeypatch.chdir(tmp_path)
+    tickers = generate_universe(2, n_bars=600)
+    for ticker, df in tickers.items():
+        write_csv(df, ticker)
+    with open('data/manifest.json', 'w') as f:
+        json.dump({ticker: [[START, END]] for ticker in tickers}, f)
+    return str(tmp_path / 'queue.sqlite')
+
+def _submit(path, tickers=('SYN0', 'SYN1')):
+    grids = {'trend_following': parameter_grid(short_window=[5, 10, 20], long_window=[30, 60])}
+    sweep, chunks = sweep_chunks(list(tickers), ['trend_following', 'buy_and_hold'], grids, START, END,
+                                 chunk_size=2)
+    queue = JobQueue(path)
+    queue.submit(sweep, chunks)
+    return queue, sweep, chunks
+
+def _chunks(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT id, status, attempts, worker FROM chunks ORDER BY id").fetchall()
+
+def test_workers_complete_every_chunk_exactly_once(queue_path):
+    queue, sweep, chunks = _submit(queue_path)
+    assert queue.submit(sweep, chunks) == 0
+
+    completed = run_local_workers(queue_path, 3, lease_seconds=30)
+
+    rows = _chunks(queue_path)
+    assert completed == len(chunks) == len(rows)
+    assert all(status == 'done' and attempts == 1 for _, status, attempts, _ in rows)
+    results = collect_sweep(queue, sweep)
+    assert len(results) == sum(len(chunk['params']) for chunk in chunks)
+    assert not results[['Ticker', 'Strategy', 'short_window', 'long_window']].duplicated().any()
+
+def test_expired_lease_is_reclaimed(queue_path):
+    queue, sweep, chunks = _submit(queue_path)
+    abandoned, _, _ = queue.claim('dead-node', lease_seconds=0.5)
+
+    # One chunk per worker: the abandoned chunk is still leased, so it is skipped.
+    assert run_local_workers(queue_path, 2, lease_seconds=30, max_chunks=1) == 2
+    assert dict((id_, status) for id_, status, _, _ in _chunks(queue_path))[abandoned] == 'running'
+
+    time.sleep(0.6)
+    run_local_workers(queue_path, 2, lease_seconds=30)
+    rows = {id_: (status, attempts, worker) for id_, status, attempts, worker in _chunks(queue_path)}
+    assert rows[abandoned][0] == 'done'
+    assert rows[abandoned][1] == 2
+    assert rows[abandoned][2] != 'dead-node'
+    assert all(status == 'done' for status, _, _ in rows.values())
+    assert queue.unfinished() == 0
+
+def test_chunk_fails_after_max_attempts(queue_path):
+    queue = JobQueue(queue_path, max_attempts=2)
+    queue.submit('sweep', [{'n': 1}])
+    for attempt in range(2):
+        chunk_id, _, _ = queue.claim('worker')
+        queue.fail(chunk_id, 'worker', 'boom')
+        assert _chunks(queue_path)[0][1] == ('pending' if attempt == 0 else 'failed')
+    assert queue.claim('worker') is None
+    assert queue.errors() == [(chunk_id, 'worker', 'boom')]
+
+    assert queue.requeue() == 1
+    assert queue.claim('worker') is not None
+
+def test_worker_marks_broken_chunk_failed(queue_path):
+    queue, sweep, chunks = _submit(queue_path, tickers=('SYN0', 'MISSING'))
+    run_worker(queue_path, worker='worker')
+    statuses = {}
+    for _, status, attempts, _ in _chunks(queue_path):
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 'failed':
+            assert attempts == queue.max_attempts
+    assert statuses == {'done': len(chunks) // 2, 'failed': len(chunks) // 2}
+    assert all('MISSING' in error for _, _, error in queue.errors())
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from execution.execution import simulate_portfolio
+from execution.long_short import simulate_long_short, volatility_fraction
+
+def reference_long_short(close, signal, high=None, low=None, initial_cash=10000, cost_bps=0.001,
+                         cost_per_share=0.0, slippage=0.0, allow_short=True, exit_on_zero=False, fraction=1.0):
+    """
+    Bar-by-bar version of simulate_long_short for one column.
+
+    fraction may be a scalar or one value per bar (volatility sizing).
+    """
+    n = len(close)
+    fraction = np.broadcast_to(np.asarray(fraction, dtype=float), (n,))
+    cash, shares, side, broke = initial_cash, 0.0, 0, False
+    values = np.empty(n)
+    for i in range(n):
+        new_side = side
+        if signal[i] == 1:
+            new_side = 1
+        elif signal[i] == -1:
+            new_side = -1 if allow_short else 0
+        elif exit_on_zero and signal[i] == 0:
+            new_side = 0
+
+        if new_side != side and not broke:
+            spread = slippage * (high[i] - low[i]) if slippage else 0.0
+            if shares:
+                fill = close[i] - np.sign(shares) * spread
+                cash += shares * fill - abs(shares) * (fill * cost_bps + cost_per_share)
+                shares = 0.0
+            broke = cash <= 0
+            fill = close[i] + new_side * spread
+            if new_side and not broke and fill > 0 and not np.isnan(fraction[i]):
+                budget = cash * fraction[i]
+                size = budget * (1 - cost_bps) / (fill + cost_per_share)
+                shares = new_side * size
+                cash -= shares * fill + budget - size * fill
+        side = new_side
+        values[i] = cash + shares * close[i]
+    return values
+
+def _random_bars(seed, n=300, nan_share=0.1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    signal = np.repeat(rng.choice([-1.0, 0.0, 1.0], size=n // 5 + 1), 5)[:n]
+    signal[rng.random(n) < nan_share] = np.nan
+    return close, high, low, signal
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('allow_short', [False, True])
+@pytest.mark.parametrize('exit_on_zero', [False, True])
+@pytest.mark.parametrize('fraction, cost_per_share, slippage', [(1.0, 0.0, 0.0), (0.5, 0.01, 0.0),
+                                                               (1.0, 0.0, 0.2), (2.0, 0.05, 0.1)])
+def test_simulate_long_short_matches_loop(seed, allow_short, exit_on_zero, fraction, cost_per_share, slippage):
+    close, high, low, signal = _random_bars(seed)
+    options = dict(cost_bps=0.002, cost_per_share=cost_per_share, slippage=slippage, allow_short=allow_short,
+                   exit_on_zero=exit_on_zero, fraction=fraction)
+    expected = reference_long_short(close, signal, high, low, **options)
+    np.testing.assert_allclose(simulate_long_short(close, signal, high, low, **options), expected, rtol=1e-10)
+
+def test_volatility_sizing_matches_loop():
+    close, high, low, signal = _random_bars(0)
+    fraction = volatility_fraction(close[:, None], target_vol=0.1, max_leverage=2.0)[:, 0]
+    expected = reference_long_short(close, signal, cost_per_share=0.01, fraction=fraction)
+    result = simulate_long_short(close, signal, cost_per_share=0.01, sizing='volatility', target_vol=0.1,
+                                 max_leverage=2.0)
+    np.testing.assert_allclose(result, expected, rtol=1e-10)
+
+def test_bankrupt_column_stays_flat():
+    close = np.array([10.0, 10, 30, 30, 10, 5, 20])
+    signal = np.array([0.0, -1, 0, 1, -1, 1, -1])
+    values = simulate_long_short(close, signal, fraction=1.5)
+    np.testing.assert_allclose(values, reference_long_short(close, signal, fraction=1.5), rtol=1e-12)
+    assert values[3] < 0
+    assert np.all(values[3:] == values[3])
+
+@pytest.mark.parametrize('close', [[2.0, 0.0, 1.0, 2.0], [2.0, -1.0, 1.0, 2.0], [1.0, 0.5, -0.5, 1.0]])
+def test_entries_at_non_positive_prices_stay_flat(close):
+    close = np.array(close)
+    signal = np.array([0.0, -1, 1, 1])
+    values = simulate_long_short(close, signal, cost_per_share=0.01)
+    assert np.all(np.isfinite(values))
+    np.testing.assert_allclose(values, reference_long_short(close, signal, cost_per_share=0.01), rtol=1e-12)
+
+def test_columns_match_single_runs():
+    bars = [_random_bars(seed) for seed in range(4)]
+    close, high, low, signal = (np.column_stack(arrays) for arrays in zip(*bars))
+    fraction = np.array([1.0, 0.5, 1.5, 0.25])
+    slippage = np.array([0.0, 0.1, 0.2, 0.0])
+    values = simulate_long_short(close, signal, high, low, fraction=fraction, slippage=slippage)
+    for j in range(close.shape[1]):
+        expected = reference_long_short(close[:, j], signal[:, j], high[:, j], low[:, j],
+                                        fraction=fraction[j], slippage=slippage[j])
+        np.testing.assert_allclose(values[:, j], expected, rtol=1e-10)
+
+def test_long_only_matches_simulate_portfolio():
+    bars = [_random_bars(seed) for seed in range(4)]
+    close = np.column_stack([b[0] for b in bars])
+    signal = np.column_stack([b[3] for b in bars])
+    np.testing.assert_allclose(simulate_long_short(close, signal, allow_short=False, cost_bps=0.001),
+                               simulate_portfolio(close, signal, cost_bps=0.001), rtol=1e-10)
@@ -0,0 +1,20 @@
+import numpy as np
+from metrics.metrics import rolling_performance_metrics
+
+def _reference_max_drawdown(values, window):
+    out = np.full(values.shape, np.nan)
+    for t in range(window, len(values)):
+        span = values[t - window:t + 1]
+        out[t] = (span / np.maximum.accumulate(span, axis=0) - 1).min(axis=0) * 100
+    return out
+
+def test_rolling_max_drawdown_ignores_peaks_before_window():
+    metrics = rolling_performance_metrics(np.array([200.0, 100, 100, 100, 100, 100]), 2)
+    np.testing.assert_allclose(metrics['Max Drawdown (%)'], [np.nan, np.nan, -50, 0, 0, 0])
+    assert np.isnan(metrics['Calmar Ratio'][3:]).all()
+
+def test_rolling_max_drawdown_matches_per_window_reference():
+    rng = np.random.default_rng(0)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.02, (300, 3)), axis=0)
+    metrics = rolling_performance_metrics(values, 20)
+    np.testing.assert_allclose(metrics['Max Drawdown (%)'], _reference_max_drawdown(values, 20))
@@ -0,0 +1,17 @@
+import utils.profiling as profiling
+from utils.profiling import PeakMemory, Profiler
+
+def test_peak_memory_does_not_reset_profiler_peaks(monkeypatch):
+    resets = []
+    monkeypatch.setattr(profiling, 'reset_peak_rss', lambda: resets.append(True) or True)
+
+    with Profiler():
+        with PeakMemory() as memory:
+            pass
+    assert resets == []
+    assert not memory.exact
+
+    with PeakMemory() as memory:
+        pass
+    assert resets == [True]
+    assert memory.exact
@@ -0,0 +1,87 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+import pytest
+import utils.results
+from utils.results import INDEX_FILE, ResultStore, result_key
+from backtest import run_backtest
+
+def _frame(seed, n=200):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2020-01-01', periods=n, name='Date')
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                         'Volume': 1000}, index=index)
+
+def _job(**options):
+    return {'ticker': 'AAA', 'pair_ticker': None, 'strategy': 'trend_following', 'initial_cash': 10000,
+            'cost_bps': 0.001, 'short_window': 5, 'long_window': 20, **options}
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path))
+    yield store
+    store.close()
+
+def test_changed_inputs_miss(store, monkeypatch):
+    df = _frame(0)
+    key = result_key([df], 'trend_following', {'short_window': 5}, 10000, 0.001)
+    store.put(key, df, {'Sharpe Ratio': 1.0})
+    assert store.get(key) is not None
+
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc('Close')] += 0.01
+    misses = [
+        result_key([changed], 'trend_following', {'short_window': 5}, 10000, 0.001),
+        result_key([df.iloc[1:]], 'trend_following', {'short_window': 5}, 10000, 0.001),
+        result_key([df], 'trend_following', {'short_window': 6}, 10000, 0.001),
+        result_key([df], 'trend_following', {'short_window': 5}, 10000, 0.002),
+        result_key([df], 'trend_following', {'short_window': 5}, 10000, 0.001, {'allow_short': True}),
+    ]
+    monkeypatch.setattr(utils.results, 'code_version', lambda: 'edited')
+    misses.append(result_key([df], 'trend_following', {'short_window': 5}, 10000, 0.001))
+
+    assert len({key, *misses}) == len(misses) + 1
+    assert all(store.get(miss) is None for miss in misses)
+
+def test_eviction_keeps_to_max_bytes(store):
+    keys = [f"run{i}" for i in range(5)]
+    store.put(keys[0], _frame(0), {})
+    size = store.stats()['bytes']
+    store.max_bytes = int(size * 3.5)
+    for i, key in enumerate(keys[1:], 1):
+        store.put(key, _frame(i), {})
+        # Keep the first run in use, so the least recently used are the others.
+        assert store.get(keys[0]) is not None
+        assert store.stats()['bytes'] <= store.max_bytes
+
+    assert store.stats()['runs'] == 3
+    assert [store.get(key) is not None for key in keys] == [True, False, False, True, True]
+
+def test_run_backtest_records_execution(store):
+    frames = {'AAA': _frame(0)}
+    default, _ = run_backtest(_job(), frames, store)
+    long_short, _ = run_backtest(_job(allow_short=True, slippage=0.1), frames, store)
+    assert not np.allclose(default['Portfolio Value'], long_short['Portfolio Value'])
+
+    executions = store.query()['Execution'].tolist()
+    assert pd.isna(executions[0])
+    assert '"allow_short": true' in executions[1] and '"slippage": 0.1' in executions[1]
+
+    stored, _ = run_backtest(_job(allow_short=True, slippage=0.1), frames, store)
+    pd.testing.assert_series_equal(stored['Portfolio Value'], long_short['Portfolio Value'], check_freq=False,
+                                   check_index_type=False)
+    assert store.stats()['runs'] == 2
+
+def test_index_without_execution_column_is_migrated(tmp_path):
+    db = sqlite3.connect(str(tmp_path / INDEX_FILE))
+    db.execute("CREATE TABLE runs (key TEXT PRIMARY KEY, ticker TEXT, pair_ticker TEXT, strategy TEXT, "
+               "params TEXT, initial_cash REAL, cost_bps REAL, start TEXT, end TEXT, code_version TEXT, "
+               "metrics TEXT, columns TEXT, tz TEXT, bytes INTEGER, created REAL, last_used REAL)")
+    db.commit()
+    db.close()
+
+    store = ResultStore(str(tmp_path))
+    store.put('run', _frame(0), {'Sharpe Ratio': 1.0}, execution={'allow_short': True})
+    assert store.query()['Execution'].tolist() == ['{"allow_short": true}']
+    store.close()
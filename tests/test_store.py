@@ -0,0 +1,68 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from utils.store import build_store, iter_store, read_store, store_path
+
+def _write_csv(tmp_path, close, n=500):
+    index = pd.bdate_range('2000-01-03', periods=n, name='Date')
+    df = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 100}, index=index)
+    df.to_csv(tmp_path / 'AAA.csv')
+    return df
+
+@pytest.mark.parametrize('chunk_size', [None, 64])
+def test_rebuild_replaces_the_previous_build(tmp_path, chunk_size):
+    _write_csv(tmp_path, 1.0)
+    build_store('AAA', str(tmp_path), chunk_size=chunk_size)
+    expected = _write_csv(tmp_path, 2.0, n=600)
+    build_store('AAA', str(tmp_path), chunk_size=chunk_size)
+
+    pd.testing.assert_frame_equal(read_store('AAA', data_path=str(tmp_path)), expected,
+                                  check_freq=False, check_index_type=False)
+    builds = [name for name in os.listdir(store_path('AAA', str(tmp_path))) if name != 'meta.json']
+    assert len(builds) == 1
+
+def test_rebuild_keeps_open_readers_consistent(tmp_path):
+    _write_csv(tmp_path, 1.0)
+    build_store('AAA', str(tmp_path))
+    blocks = iter_store('AAA', data_path=str(tmp_path), chunk_size=100)
+    first = next(blocks)
+
+    _write_csv(tmp_path, 2.0, n=300)
+    build_store('AAA', str(tmp_path))
+
+    rest = pd.concat(blocks)
+    assert len(first) + len(rest) == 500
+    assert (first['Close'] == 1.0).all() and (rest['Close'] == 1.0).all()
+    assert (read_store('AAA', data_path=str(tmp_path))['Close'] == 2.0).all()
+
+def test_reads_during_rebuilds_see_whole_builds(tmp_path):
+    _write_csv(tmp_path, 1.0)
+    build_store('AAA', str(tmp_path))
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                df = read_store('AAA', data_path=str(tmp_path))
+                # Version v has 400 + 100 * v rows, all with Close == v.
+                assert len(df) == 400 + 100 * df['Close'].iloc[0]
+                assert df['Close'].nunique() == 1
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for version in range(2, 12):
+        _write_csv(tmp_path, float(version), n=400 + 100 * version)
+        build_store('AAA', str(tmp_path), chunk_size=None if version % 2 else 128)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert np.all(read_store('AAA', data_path=str(tmp_path))['Close'] == 11.0)
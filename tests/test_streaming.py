@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategies.trend_following import moving_average_trend_following
+from strategies.mean_reversion import rsi_strategy, bollinger_band_strategy
+from strategies.pairs_trading import pairs_trading_strategy
+from strategies.streaming import TrendFollowingStream, RSIStream, BollingerStream, PairsTradingStream
+from execution.execution import simulate_trades
+from execution.streaming import replay
+from utils.synthetic import generate_ohlcv
+
+def _assert_matches_batch(streamed, batch, columns):
+    for column in columns + ['Portfolio Value']:
+        np.testing.assert_allclose(streamed[column].to_numpy(dtype=float), batch[column].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-9, err_msg=column)
+    np.testing.assert_array_equal(streamed['Signal'].to_numpy(dtype=float), batch['Signal'].to_numpy(dtype=float))
+
+@pytest.fixture
+def bars():
+    return generate_ohlcv(1500, seed=7)
+
+@pytest.mark.parametrize('short_window, long_window', [(5, 20), (10, 50)])
+def test_trend_following_stream_matches_batch(bars, short_window, long_window):
+    batch = simulate_trades(moving_average_trend_following(bars, short_window, long_window))
+    streamed = replay(bars, TrendFollowingStream(short_window, long_window))
+    _assert_matches_batch(streamed, batch, ['SMA_Short', 'SMA_Long'])
+
+@pytest.mark.parametrize('period, lower, upper', [(14, 30, 70), (7, 20, 80)])
+def test_rsi_stream_matches_batch(bars, period, lower, upper):
+    batch = simulate_trades(rsi_strategy(bars, period, lower, upper))
+    streamed = replay(bars, RSIStream(period, lower, upper))
+    _assert_matches_batch(streamed, batch, ['RSI'])
+
+@pytest.mark.parametrize('window, num_std', [(20, 2), (50, 1.5)])
+def test_bollinger_stream_matches_batch(bars, window, num_std):
+    batch = simulate_trades(bollinger_band_strategy(bars, window, num_std))
+    streamed = replay(bars, BollingerStream(window, num_std))
+    _assert_matches_batch(streamed, batch, ['Middle_Band', 'Upper_Band', 'Lower_Band'])
+
+@pytest.mark.parametrize('lookback, entry_z, exit_z', [(30, 1.0, 0.0), (20, 1.5, 0.5)])
+def test_pairs_trading_stream_matches_batch(lookback, entry_z, exit_z):
+    df_a = generate_ohlcv(1500, seed=1)
+    df_b = generate_ohlcv(1500, seed=2)
+    batch = simulate_trades(pairs_trading_strategy(df_a, df_b, lookback, entry_z, exit_z))
+    prices = pd.DataFrame({'A': df_a['Close'], 'B': df_b['Close']})
+    streamed = replay(prices, PairsTradingStream(lookback, entry_z, exit_z), price_columns=('A', 'B'))
+    _assert_matches_batch(streamed, batch, ['Spread', 'Mean', 'Std', 'ZScore'])
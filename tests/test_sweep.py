@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from optimization.sweep import parameter_grid, sweep_strategy
+from strategies.trend_following import moving_average_trend_following
+from strategies.mean_reversion import rsi_strategy, bollinger_band_strategy
+from execution.execution import simulate_trades
+from metrics.metrics import calculate_performance_metrics
+
+@pytest.fixture
+def prices():
+    # Random walk with flat stretches, where windows of zero gains or zero
+    # spread must give exactly zero averages.
+    rng = np.random.default_rng(11)
+    steps = rng.normal(0, 1, 1500)
+    steps[rng.random(1500) < 0.4] = 0.0
+    steps[300:360] = 0.0
+    steps[900:930] = 0.0
+    close = 100 + np.cumsum(steps)
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range('2010-01-01', periods=len(close), name='Date'))
+
+def _assert_matches_strategy(results, grid, df, strategy):
+    for params, (_, row) in zip(grid.to_dict('records'), results.iterrows()):
+        expected = calculate_performance_metrics(simulate_trades(strategy(df, **params)))
+        for name, value in expected.items():
+            if value == 'N/A':
+                assert np.isnan(row[name]), (params, name)
+            else:
+                assert row[name] == pytest.approx(value, abs=0.011), (params, name)
+
+def test_rsi_sweep_matches_strategy(prices):
+    grid = parameter_grid(period=[2, 5, 14, 30], lower=[20, 30], upper=[70, 80])
+    results = sweep_strategy(prices, 'rsi', grid)
+    _assert_matches_strategy(results, grid, prices, rsi_strategy)
+
+def test_bollinger_sweep_matches_strategy(prices):
+    grid = parameter_grid(window=[2, 5, 20], num_std=[1.0, 2.0, 2.5])
+    results = sweep_strategy(prices, 'bollinger', grid)
+    _assert_matches_strategy(results, grid, prices, bollinger_band_strategy)
+
+def test_trend_following_sweep_matches_strategy(prices):
+    grid = parameter_grid(short_window=[3, 10], long_window=[20, 50])
+    results = sweep_strategy(prices, 'trend_following', grid)
+    _assert_matches_strategy(results, grid, prices, moving_average_trend_following)
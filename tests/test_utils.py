@@ -0,0 +1,48 @@
+import pandas as pd
+from utils.utils import get_data, load_manifest
+
+def _bars(start, end):
+    index = pd.bdate_range(start, end, inclusive='left', name='Date')
+    return pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Adj Close': 1.0, 'Volume': 1},
+                        index=index)
+
+def test_empty_or_failed_download_is_retried(tmp_path):
+    calls = []
+
+    def empty(ticker, start, end):
+        calls.append((ticker, start, end))
+        return pd.DataFrame()
+
+    def failing(ticker, start, end):
+        calls.append((ticker, start, end))
+        raise ConnectionError('rate limited')
+
+    get_data(['AAA'], '2020-01-01', '2020-02-01', save_path=str(tmp_path), downloader=empty)
+    get_data(['AAA'], '2020-01-01', '2020-02-01', save_path=str(tmp_path), downloader=failing)
+    assert load_manifest(str(tmp_path)).get('AAA', []) == []
+    assert len(calls) == 2
+
+    get_data(['AAA'], '2020-01-01', '2020-02-01', save_path=str(tmp_path), downloader=lambda t, s, e: _bars(s, e))
+    assert load_manifest(str(tmp_path))['AAA'] == [['2020-01-01', '2020-02-01']]
+
+def test_empty_download_inside_known_bars_is_retried(tmp_path):
+    get_data(['AAA'], '2020-01-06', '2020-01-13', save_path=str(tmp_path), downloader=lambda t, s, e: _bars(s, e))
+    get_data(['AAA'], '2020-02-03', '2020-02-10', save_path=str(tmp_path), downloader=lambda t, s, e: _bars(s, e))
+
+    get_data(['AAA'], '2020-01-06', '2020-02-10', save_path=str(tmp_path), downloader=lambda t, s, e: pd.DataFrame())
+    assert load_manifest(str(tmp_path))['AAA'] == [['2020-01-06', '2020-01-13'], ['2020-02-03', '2020-02-10']]
+
+def test_empty_download_without_bars_is_covered(tmp_path):
+    calls = []
+
+    def empty(ticker, start, end):
+        calls.append((start, end))
+        return pd.DataFrame()
+
+    get_data(['AAA'], '2020-01-06', '2020-01-13', save_path=str(tmp_path), downloader=lambda t, s, e: _bars(s, e))
+    for _ in range(2):
+        # The weekend before the first bar, then a week after the last one.
+        get_data(['AAA'], '2020-01-04', '2020-01-13', save_path=str(tmp_path), downloader=empty)
+        get_data(['AAA'], '2020-01-06', '2020-01-20', save_path=str(tmp_path), downloader=empty)
+    assert calls == [('2020-01-04', '2020-01-06'), ('2020-01-13', '2020-01-20')]
+    assert load_manifest(str(tmp_path))['AAA'] == [['2020-01-04', '2020-01-20']]
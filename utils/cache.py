@@ -0,0 +1,163 @@
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+class IndicatorCache:
+    """
+    Memoizes indicator series keyed by input data, indicator name and parameters.
+
+    Entries live in an in-memory LRU bounded by total bytes; with a
+    disk_path, computed values are also written there as .npy files and
+    read back on a memory miss, so separate runs can share them. Inputs are
+    identified by checksums of their values and dates, so equal data hits
+    the cache even when it arrives in a fresh copy of the DataFrame.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, disk_path=None):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.enabled = True
+        if disk_path is not None:
+            os.makedirs(disk_path, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(series):
+        """
+        Checksums of a series' values and index, plus its length and date range.
+
+        CRC32 and Adler-32 run at memory speed, so fingerprinting stays well
+        below the cost of the rolling computations being cached.
+        """
+        values = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+        index = series.index
+        if isinstance(index, pd.DatetimeIndex):
+            index_bytes = np.ascontiguousarray(index.asi8)
+        else:
+            index_bytes = pd.util.hash_pandas_object(index, index=False).to_numpy()
+        start = str(index[0]) if len(index) else None
+        end = str(index[-1]) if len(index) else None
+        return (len(values), zlib.crc32(values), zlib.adler32(values), zlib.crc32(index_bytes), start, end)
+
+    def _key_file(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_path, f"{name}.npy")
+
+    def _store(self, key, values):
+        if values.nbytes > self.max_bytes:
+            return
+        self._entries[key] = values
+        self._bytes += values.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get(self, series, indicator, params, compute):
+        """
+        Return indicator(series, **params), computing it only on a cache miss.
+
+        Parameters:
+            series (pd.Series): Input series
+            indicator (str): Indicator name, part of the cache key
+            params (dict): Indicator parameters, part of the cache key
+            compute (callable): Function of series returning the indicator series
+
+        Returns:
+            pd.Series: Indicator values aligned with series
+        """
+        if not self.enabled:
+            return compute(series)
+        key = (self.fingerprint(series), indicator, tuple(sorted(params.items())))
+
+        values = self._entries.get(key)
+        if values is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pd.Series(values.copy(), index=series.index, name=series.name)
+
+        if self.disk_path is not None:
+            file_path = self._key_file(key)
+            if os.path.exists(file_path):
+                values = np.load(file_path)
+                self._store(key, values)
+                self.disk_hits += 1
+                return pd.Series(values.copy(), index=series.index, name=series.name)
+
+        self.misses += 1
+        result = compute(series)
+        values = result.to_numpy(dtype=np.float64, copy=True)
+        self._store(key, values)
+        if self.disk_path is not None:
+            tmp_path = file_path + '.tmp.npy'
+            np.save(tmp_path, values)
+            os.replace(tmp_path, file_path)
+        return result
+
+    @contextmanager
+    def disabled(self):
+        """
+        Compute every indicator directly inside the block, without storing it.
+
+        For inputs that are never seen twice, such as the blocks of a chunked
+        run, where caching would only cost fingerprinting and memory.
+        """
+        enabled, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = enabled
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """
+        Hit/miss counters and current memory use of the cache.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+indicator_cache = IndicatorCache()
+
+def configure_cache(max_bytes=256 * 1024 ** 2, disk_path=None):
+    """
+    Resize the shared indicator cache or enable its disk tier.
+
+    The shared instance is reset in place, so modules that imported
+    indicator_cache keep seeing the configured cache.
+    """
+    indicator_cache.__init__(max_bytes=max_bytes, disk_path=disk_path)
+    return indicator_cache
+
+def rolling_mean(series, window):
+    """
+    Cached series.rolling(window).mean().
+    """
+    return indicator_cache.get(series, 'rolling_mean', {'window': window},
+                               lambda s: s.rolling(window=window).mean())
+
+def rolling_std(series, window):
+    """
+    Cached series.rolling(window).std().
+    """
+    return indicator_cache.get(series, 'rolling_std', {'window': window},
+                               lambda s: s.rolling(window=window).std())
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Plot width in pixels of the 14-inch figures at matplotlib's default 100 dpi.
+DEFAULT_PIXELS = 1400
+
+def minmax_indices(values, n_buckets):
+    """
+    Positions that keep the visual shape of a series drawn n_buckets pixels wide.
+
+    The series is cut into n_buckets equal buckets and each keeps its first,
+    minimum, maximum and last point, so peaks, troughs and level changes
+    survive while the point count is bounded by 4 * n_buckets. NaN values
+    are never picked as extremes but bucket endpoints keep any gaps visible.
+
+    Parameters:
+        values (array-like): Series values
+        n_buckets (int): Number of buckets, typically the pixel width
+
+    Returns:
+        np.ndarray: Sorted positions into values
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.shape[0]
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = values
+    buckets = padded.reshape(n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    lows = np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1) + offsets
+    lasts = np.minimum(offsets + size - 1, n - 1)
+
+    picked = np.concatenate([offsets, lows, highs, lasts])
+    return np.unique(picked[picked < n])
+
+def downsample_series(series, pixels=DEFAULT_PIXELS):
+    """
+    Min/max downsample a pandas Series for drawing at the given pixel width.
+    """
+    if len(series) <= 4 * pixels:
+        return series
+    return series.iloc[minmax_indices(series.to_numpy(dtype=float), pixels)]
+
+def thin_markers(markers, index, pixels=DEFAULT_PIXELS):
+    """
+    Keep the first marker row in each pixel column of the plotted x axis, so scatter cost is bounded too.
+
+    Markers are bucketed by their position in index, the full x axis of the
+    plot, cut into pixels equal columns. Thinning buy and sell markers
+    separately against the same index keeps the first buy and the first
+    sell of every column, so clustered trades still show both an entry and
+    an exit wherever either happened.
+
+    Parameters:
+        markers (pd.DataFrame): Marker rows, indexed by values of index
+        index (pd.Index): Index of the plotted series
+        pixels (int): Number of pixel columns
+
+    Returns:
+        pd.DataFrame: The kept marker rows
+    """
+    if len(markers) <= pixels:
+        return markers
+    positions = index.get_indexer(markers.index)
+    buckets = positions * pixels // max(len(index), 1)
+    _, first = np.unique(buckets, return_index=True)
+    return markers.iloc[np.sort(first)]
@@ -0,0 +1,256 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+QUEUE_PATH = os.path.join('data', 'queue.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sweeps (
+    sweep TEXT PRIMARY KEY,
+    spec TEXT,
+    created REAL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    sweep TEXT,
+    seq INTEGER,
+    payload TEXT,
+    status TEXT DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    finished REAL,
+    UNIQUE (sweep, seq)
+);
+CREATE INDEX IF NOT EXISTS chunks_status ON chunks (status, id);
+"""
+
+def worker_id():
+    """
+    Default worker name: host and process id, unique across the machines sharing a queue.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    """
+    Persistent queue of work chunks, shared by worker processes through one SQLite file.
+
+    Each chunk is a JSON payload that moves from 'pending' to 'running' when
+    a worker claims it and to 'done' once the worker checkpoints its result.
+    A claim is a lease: a worker that dies or loses the queue stops renewing
+    it, and the chunk is claimed again once the lease has expired. A chunk
+    whose work raises goes back to 'pending' until it has been tried
+    max_attempts times, then stays 'failed'. Results are stored next to the
+    chunks, so a stopped sweep resumes with only the unfinished chunks.
+
+    Workers on several machines can share a queue file on a network
+    filesystem, as long as it supports the file locks SQLite relies on.
+
+    Parameters:
+        path (str): Path of the SQLite file
+        max_attempts (int): Claims per chunk before it is marked failed
+    """
+
+    def __init__(self, path=QUEUE_PATH, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Autocommit mode, so claims can take the write lock up front with
+        # BEGIN IMMEDIATE; the timeout lets concurrent workers wait for it.
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def submit(self, sweep, payloads, spec=None):
+        """
+        Add the chunks of a sweep, skipping those already queued.
+
+        Chunks are identified by sweep and position, so submitting the same
+        sweep again adds nothing and keeps its progress.
+
+        Returns:
+            int: Number of chunks added
+        """
+        with self._transaction():
+            self._db.execute("INSERT OR IGNORE INTO sweeps VALUES (?, ?, ?)",
+                             (sweep, json.dumps(spec, sort_keys=True, default=str), time.time()))
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO chunks (sweep, seq, payload) VALUES (?, ?, ?)",
+                ((sweep, seq, json.dumps(payload, default=str)) for seq, payload in enumerate(payloads)))
+            return self._db.total_changes - before
+
+    def claim(self, worker, lease_seconds=120):
+        """
+        Lease the oldest pending chunk, or one whose lease has expired.
+
+        Returns:
+            tuple: (chunk id, sweep, payload dict), or None if nothing is claimable
+        """
+        now = time.time()
+        with self._transaction():
+            self._db.execute(
+                "UPDATE chunks SET status = 'failed', error = 'lease expired', lease_until = NULL "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?", (now, self.max_attempts))
+            row = self._db.execute(
+                "SELECT id, sweep, payload FROM chunks "
+                "WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) ORDER BY id LIMIT 1",
+                (now,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE chunks SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?", (worker, now + lease_seconds, row[0]))
+        return row[0], row[1], json.loads(row[2])
+
+    def renew(self, chunk_id, worker, lease_seconds=120):
+        """
+        Extend a lease the worker still holds.
+
+        Returns:
+            bool: Whether the worker still held the lease
+        """
+        cursor = self._db.execute(
+            "UPDATE chunks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + lease_seconds, chunk_id, worker))
+        return cursor.rowcount > 0
+
+    @contextmanager
+    def leased(self, chunk_id, worker, lease_seconds=120):
+        """
+        Keep renewing a lease from a background thread while the chunk is worked on.
+        """
+        stop = threading.Event()
+
+        def heartbeat():
+            # SQLite connections belong to the thread that opened them.
+            queue = JobQueue(self.path, self.max_attempts)
+            try:
+                while not stop.wait(lease_seconds / 3):
+                    queue.renew(chunk_id, worker, lease_seconds)
+            finally:
+                queue.close()
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, chunk_id, worker, result):
+        """
+        Checkpoint a chunk's result.
+
+        A worker whose lease expired may still finish; its result is kept
+        unless another worker has completed the chunk first.
+
+        Returns:
+            bool: Whether the result was stored
+        """
+        cursor = self._db.execute(
+            "UPDATE chunks SET status = 'done', worker = ?, result = ?, error = NULL, lease_until = NULL, "
+            "finished = ? WHERE id = ? AND status != 'done'", (worker, result, time.time(), chunk_id))
+        return cursor.rowcount > 0
+
+    def fail(self, chunk_id, worker, error):
+        """
+        Release a chunk whose work raised, marking it failed after max_attempts.
+        """
+        self._db.execute(
+            "UPDATE chunks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+            (self.max_attempts, error, chunk_id, worker))
+
+    def requeue(self, sweep=None, running=False):
+        """
+        Put failed chunks, and optionally running ones, back to pending with fresh attempts.
+
+        Requeueing running chunks frees the leases of workers known to be
+        stopped without waiting for them to expire.
+
+        Returns:
+            int: Number of chunks requeued
+        """
+        statuses = ('failed', 'running') if running else ('failed',)
+        sql = (f"UPDATE chunks SET status = 'pending', attempts = 0, lease_until = NULL "
+               f"WHERE status IN ({', '.join('?' * len(statuses))})")
+        args = list(statuses)
+        if sweep is not None:
+            sql += " AND sweep = ?"
+            args.append(sweep)
+        return self._db.execute(sql, args).rowcount
+
+    def unfinished(self, sweep=None):
+        """
+        Number of chunks that are pending or running.
+        """
+        sql = "SELECT COUNT(*) FROM chunks WHERE status IN ('pending', 'running')"
+        args = []
+        if sweep is not None:
+            sql += " AND sweep = ?"
+            args.append(sweep)
+        return self._db.execute(sql, args).fetchone()[0]
+
+    def status(self):
+        """
+        Chunk counts per sweep and status, oldest sweep first.
+
+        Returns:
+            dict: Sweep -> {'created': timestamp, status: count, ...}
+        """
+        sweeps = {sweep: {'created': created}
+                  for sweep, created in self._db.execute("SELECT sweep, created FROM sweeps ORDER BY created")}
+        for sweep, status, count in self._db.execute(
+                "SELECT sweep, status, COUNT(*) FROM chunks GROUP BY sweep, status"):
+            sweeps.setdefault(sweep, {})[status] = count
+        return sweeps
+
+    def unfinished_payloads(self):
+        """
+        Payloads of every pending or running chunk, in chunk order.
+        """
+        rows = self._db.execute("SELECT payload FROM chunks WHERE status IN ('pending', 'running') ORDER BY id")
+        return [json.loads(payload) for (payload,) in rows]
+
+    def results(self, sweep):
+        """
+        Payloads and stored results of a sweep's completed chunks, in chunk order.
+
+        Returns:
+            list: (payload dict, result) tuples
+        """
+        rows = self._db.execute("SELECT payload, result FROM chunks WHERE sweep = ? AND status = 'done' "
+                                "ORDER BY seq", (sweep,)).fetchall()
+        return [(json.loads(payload), result) for payload, result in rows]
+
+    def errors(self, sweep=None):
+        """
+        Chunk id, worker and last error of every failed chunk.
+        """
+        sql = "SELECT id, worker, error FROM chunks WHERE status = 'failed'"
+        args = []
+        if sweep is not None:
+            sql += " AND sweep = ?"
+            args.append(sweep)
+        return self._db.execute(sql + " ORDER BY id", args).fetchall()
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,218 @@
+import cProfile
+import functools
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Profiler that instrumented functions currently report to, if any.
+_active = None
+
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+
+def peak_rss_bytes():
+    """
+    High-water mark of the process' resident set size, or None where unavailable.
+
+    On Linux this is VmHWM, which reset_peak_rss can lower again.
+    """
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def reset_peak_rss():
+    """
+    Reset the RSS high-water mark to the current RSS, so that peak_rss_bytes
+    measures the peak of what runs next (Linux only).
+
+    Returns:
+        bool: Whether the reset was possible
+    """
+    try:
+        with open(PROC_CLEAR_REFS, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+class PeakMemory:
+    """
+    Measures the peak RSS reached while a block of code runs.
+
+    On Linux the high-water mark is reset on entry, so peak_bytes covers
+    only the block; elsewhere it is the process peak up to the block's end,
+    and `exact` is False.
+
+    The reset is skipped while a Profiler is active: its stages report the
+    same process-wide high-water mark, which must keep meaning the peak
+    since the run started. peak_bytes is then the process peak as well.
+    """
+
+    def __enter__(self):
+        self.exact = _active is None and reset_peak_rss()
+        self.peak_bytes = None
+        return self
+
+    def __exit__(self, *exc):
+        self.peak_bytes = peak_rss_bytes()
+        return False
+
+    def __str__(self):
+        if self.peak_bytes is None:
+            return 'n/a'
+        return f"{self.peak_bytes / 1024 ** 2:.1f} MB" + ('' if self.exact else ' (process peak)')
+
+class Profiler:
+    """
+    Records wall time, CPU time, peak RSS and row counts per pipeline stage.
+
+    Use it as a context manager to make it the active profiler: every call
+    to a function decorated with @instrument then records a stage, whether
+    it comes from backtest.py, compare_strategies.py or library code.
+    Stages can also be recorded explicitly with profiler.stage(name).
+
+    With detail=True each top-level stage also runs under cProfile and
+    tracemalloc, and the report keeps those snapshots for the slowest stage.
+    Detailed capture slows the stages down, so its timings are inflated.
+    """
+
+    def __init__(self, detail=False, top=25):
+        self.detail = detail
+        self.top = top
+        self.records = []
+        self._depth = 0
+        self._slowest = None
+        self._previous = None
+
+    def __enter__(self):
+        global _active
+        self._previous = _active
+        _active = self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+        return False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Record one stage; the yielded dict can be updated, e.g. with 'rows'.
+        """
+        record = {'stage': name, 'depth': self._depth, 'rows': rows}
+        capture = self.detail and self._depth == 0
+        profile = None
+        tracing = False
+        if capture:
+            profile = cProfile.Profile()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                tracing = True
+            profile.enable()
+
+        self._depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            record['peak_rss_bytes'] = peak_rss_bytes()
+            self._depth -= 1
+
+            if capture:
+                profile.disable()
+                snapshot = tracemalloc.take_snapshot() if tracing else None
+                record['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                if tracing:
+                    tracemalloc.stop()
+                if self._slowest is None or record['wall_seconds'] > self._slowest[0]['wall_seconds']:
+                    self._slowest = (record, profile, snapshot)
+
+            self.records.append(record)
+
+    def report(self):
+        """
+        All stage records, plus cProfile/tracemalloc summaries of the slowest stage in detail mode.
+        """
+        report = {'stages': self.records}
+        if self._slowest is not None:
+            record, profile, snapshot = self._slowest
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self.top)
+            report['slowest_stage'] = {
+                'stage': record['stage'],
+                'cprofile': stream.getvalue(),
+                'tracemalloc': [str(stat) for stat in snapshot.statistics('lineno')[:self.top]] if snapshot else [],
+            }
+        return report
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def summary(self):
+        """
+        One line per stage for console output.
+        """
+        lines = []
+        for r in self.records:
+            rss = f"{r['peak_rss_bytes'] / 1024 ** 2:.1f} MB" if r['peak_rss_bytes'] is not None else 'n/a'
+            lines.append(f"{'  ' * r['depth']}{r['stage']}: {r['wall_seconds']:.4f}s wall, "
+                         f"{r['cpu_seconds']:.4f}s cpu, peak RSS {rss}, rows {r['rows']}")
+        return '\n'.join(lines)
+
+def _count_rows(result, args):
+    for obj in (result, args[0] if args else None):
+        if hasattr(obj, 'shape'):
+            return int(obj.shape[0])
+    return None
+
+def instrument(stage_name):
+    """
+    Decorator recording calls as a stage of the active Profiler; a plain call when none is active.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(stage_name) as record:
+                record['function'] = func.__qualname__
+                result = func(*args, **kwargs)
+                record['rows'] = _count_rows(result, args)
+            return result
+        return wrapper
+    return decorator
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Record a block of code as a stage of the active Profiler, if there is one.
+    """
+    if _active is None:
+        yield {'stage': name, 'rows': rows}
+        return
+    with _active.stage(name, rows) as record:
+        yield record
@@ -0,0 +1,283 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+
+RESULTS_DIR = os.path.join('data', 'results')
+INDEX_FILE = 'index.sqlite'
+
+# Source that decides what a stored run contains. Editing any of it changes
+# code_version() and so every result key.
+CODE_PATHS = ('strategies', 'execution', 'metrics', os.path.join('utils', 'cache.py'))
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    key TEXT PRIMARY KEY,
+    ticker TEXT,
+    pair_ticker TEXT,
+    strategy TEXT,
+    params TEXT,
+    initial_cash REAL,
+    cost_bps REAL,
+    start TEXT,
+    end TEXT,
+    code_version TEXT,
+    metrics TEXT,
+    columns TEXT,
+    tz TEXT,
+    bytes INTEGER,
+    created REAL,
+    last_used REAL,
+    execution TEXT
+)
+"""
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """
+    Digest of the source files listed in CODE_PATHS.
+    """
+    files = []
+    for entry in CODE_PATHS:
+        path = os.path.join(_ROOT, entry)
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.py'))
+        elif os.path.exists(path):
+            files.append(path)
+
+    digest = hashlib.blake2b(digest_size=16)
+    for file_path in files:
+        digest.update(os.path.relpath(file_path, _ROOT).encode())
+        with open(file_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def frame_digest(df):
+    """
+    Digest of a DataFrame's dates, column names, dtypes and values.
+
+    Any change to the data slice, including its date range, or loading it
+    with other dtypes (e.g. lean mode), gives a different digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(str(index.tz).encode())
+        digest.update(np.ascontiguousarray(index.asi8).tobytes())
+    else:
+        digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    for column in df.columns:
+        values = np.ascontiguousarray(df[column].to_numpy())
+        digest.update(f"{column}:{values.dtype}".encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+def result_key(frames, strategy, params, initial_cash, cost_bps, execution=None):
+    """
+    Content address of a backtest run.
+
+    Parameters:
+        frames (list): Input DataFrames of the strategy, in call order
+        strategy (str): Strategy name
+        params (dict): Strategy parameters
+        initial_cash (float): Starting portfolio cash
+        cost_bps (float): Transaction cost as a fraction of traded notional
+        execution (dict): Optional options of a non-default execution model
+
+    Returns:
+        str: Hex digest of the inputs and the code version
+    """
+    spec = {
+        'data': [frame_digest(df) for df in frames],
+        'strategy': strategy,
+        'params': params,
+        'initial_cash': float(initial_cash),
+        'cost_bps': float(cost_bps),
+        'execution': execution,
+        'code': code_version(),
+    }
+    return hashlib.blake2b(json.dumps(spec, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+class ResultStore:
+    """
+    Persistent store of backtest runs, addressed by result_key.
+
+    Each run's frame (signals, indicators, portfolio value) is written as
+    one .npz blob of column arrays; a SQLite index records what was run,
+    its metrics and its size. Runs are looked up by key, so changed data,
+    parameters or code simply miss and the outdated entries age out.
+    When the blobs exceed max_bytes, the least recently used runs are
+    evicted.
+
+    Parameters:
+        path (str): Directory of the index and blobs
+        max_bytes (int): Size budget of the blobs
+    """
+
+    def __init__(self, path=RESULTS_DIR, max_bytes=1024 ** 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, INDEX_FILE))
+        with self._db:
+            self._db.execute(_SCHEMA)
+            # Indexes created before runs recorded their execution model.
+            if 'execution' not in {row[1] for row in self._db.execute("PRAGMA table_info(runs)")}:
+                self._db.execute("ALTER TABLE runs ADD COLUMN execution TEXT")
+
+    def _blob_path(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def get(self, key):
+        """
+        Load a stored run.
+
+        Returns:
+            tuple: (DataFrame of the run, metrics dict), or None if the key is not stored
+        """
+        row = self._db.execute("SELECT columns, tz, metrics FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        columns, tz, metrics = json.loads(row[0]), row[1], json.loads(row[2])
+        try:
+            with np.load(self._blob_path(key)) as blob:
+                index = pd.DatetimeIndex(blob['index'], name='Date')
+                data = {name: blob[f"col{i}"] for i, name in enumerate(columns)}
+        except FileNotFoundError:
+            self.delete(key)
+            return None
+
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        with self._db:
+            self._db.execute("UPDATE runs SET last_used = ? WHERE key = ?", (time.time(), key))
+        return pd.DataFrame(data, index=index), metrics
+
+    def put(self, key, df, metrics, ticker=None, pair_ticker=None, strategy=None, params=None,
+            initial_cash=None, cost_bps=None, execution=None):
+        """
+        Store a run's numeric columns and metrics under key, then evict down to max_bytes.
+
+        The remaining arguments describe the run for query(); execution is
+        the options of a non-default execution model, as passed to result_key.
+        """
+        index = df.index
+        tz = str(index.tz) if getattr(index, 'tz', None) is not None else None
+        if tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+        arrays = {'index': index.values.astype('datetime64[ns]')}
+        arrays.update({f"col{i}": df[c].to_numpy() for i, c in enumerate(columns)})
+
+        # Write under a temporary name and rename, so readers never see a
+        # partial blob.
+        blob_path = self._blob_path(key)
+        tmp_path = blob_path + '.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, blob_path)
+
+        now = time.time()
+        start = str(df.index[0]) if len(df) else None
+        end = str(df.index[-1]) if len(df) else None
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs (key, ticker, pair_ticker, strategy, params, initial_cash, cost_bps, "
+                "execution, start, end, code_version, metrics, columns, tz, bytes, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, ticker, pair_ticker, strategy, json.dumps(params or {}, sort_keys=True, default=str),
+                 initial_cash, cost_bps,
+                 None if execution is None else json.dumps(execution, sort_keys=True, default=str),
+                 start, end, code_version(), json.dumps(metrics, default=float),
+                 json.dumps(columns), tz, os.path.getsize(blob_path), now, now))
+        self.evict()
+
+    def delete(self, key):
+        with self._db:
+            self._db.execute("DELETE FROM runs WHERE key = ?", (key,))
+        if os.path.exists(self._blob_path(key)):
+            os.remove(self._blob_path(key))
+
+    def evict(self, max_bytes=None):
+        """
+        Delete least recently used runs until the blobs fit in max_bytes.
+
+        Returns:
+            int: Number of runs deleted
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM runs").fetchone()[0]
+        evicted = 0
+        if total <= max_bytes:
+            return evicted
+        for key, size in self._db.execute("SELECT key, bytes FROM runs ORDER BY last_used").fetchall():
+            self.delete(key)
+            total -= size
+            evicted += 1
+            if total <= max_bytes:
+                break
+        return evicted
+
+    def drop_stale(self):
+        """
+        Delete runs stored by other versions of the code, which can never be hit again.
+
+        Returns:
+            int: Number of runs deleted
+        """
+        keys = self._db.execute("SELECT key FROM runs WHERE code_version != ?", (code_version(),)).fetchall()
+        for (key,) in keys:
+            self.delete(key)
+        return len(keys)
+
+    def query(self, ticker=None, strategy=None, current_only=True):
+        """
+        Stored runs and their metrics as a table, for comparing past results.
+
+        Parameters:
+            ticker (str): Optional ticker to filter on
+            strategy (str): Optional strategy to filter on
+            current_only (bool): Skip runs stored by other versions of the code
+
+        Returns:
+            pd.DataFrame: One row per run, with its inputs and one column per metric;
+                'Execution' is empty for the default long/flat simulation
+        """
+        sql = ("SELECT key, ticker, pair_ticker, strategy, params, initial_cash, cost_bps, execution, start, end, "
+               "metrics, bytes, created FROM runs WHERE 1 = 1")
+        args = []
+        if ticker is not None:
+            sql += " AND ticker = ?"
+            args.append(ticker)
+        if strategy is not None:
+            sql += " AND strategy = ?"
+            args.append(strategy)
+        if current_only:
+            sql += " AND code_version = ?"
+            args.append(code_version())
+
+        rows = self._db.execute(sql + " ORDER BY created", args).fetchall()
+        records = []
+        for *fields, metrics, size, created in rows:
+            record = dict(zip(('Key', 'Ticker', 'Pair Ticker', 'Strategy', 'Params', 'Initial Cash',
+                               'Cost Bps', 'Execution', 'Start', 'End'), fields))
+            record.update(json.loads(metrics))
+            record['Bytes'] = size
+            record['Created'] = pd.Timestamp(created, unit='s')
+            records.append(record)
+        return pd.DataFrame(records)
+
+    def stats(self):
+        """
+        Number of stored runs and their total blob size.
+        """
+        runs, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM runs").fetchone()
+        return {'runs': runs, 'bytes': size, 'max_bytes': self.max_bytes}
+
+    def close(self):
+        self._db.close()
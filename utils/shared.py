@@ -0,0 +1,120 @@
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+
+# Frames attached in this process, keyed by block name, so repeated jobs in
+# one worker reuse the mapping instead of attaching again.
+_attached = {}
+
+def _open_block(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching also registers the block with the
+        # resource tracker, which would unlink it when a worker exits, so
+        # registration is suppressed while attaching.
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+def _copy_to_block(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block
+
+def share_frame(df):
+    """
+    Place the values and date index of a numeric DataFrame in shared memory.
+
+    All columns are stored as one float64 block, so workers attaching the
+    frame see a single contiguous array without pickling or copying it.
+
+    Parameters:
+        df (pd.DataFrame): Numeric data indexed by date
+
+    Returns:
+        tuple: (picklable handle for attach_frame, list of SharedMemory blocks
+            that the caller must pass to release_blocks when done)
+    """
+    values = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+    index = df.index
+    tz = str(index.tz) if getattr(index, 'tz', None) is not None else None
+    if tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    index = np.ascontiguousarray(index.values.astype('datetime64[ns]').view(np.int64))
+
+    values_block = _copy_to_block(values)
+    index_block = _copy_to_block(index)
+    handle = {
+        'values': values_block.name,
+        'index': index_block.name,
+        'shape': values.shape,
+        'columns': list(df.columns),
+        'index_name': df.index.name,
+        'tz': tz,
+    }
+    return handle, [values_block, index_block]
+
+def attach_frame(handle):
+    """
+    Rebuild a DataFrame shared with share_frame on top of the shared buffers.
+
+    The returned frame is read-only; strategies copy it before adding columns.
+    """
+    key = handle['values']
+    if key in _attached:
+        return _attached[key][1]
+
+    values_block = _open_block(handle['values'])
+    index_block = _open_block(handle['index'])
+    n, k = handle['shape']
+
+    values = np.ndarray((n, k), dtype=np.float64, buffer=values_block.buf)
+    values.flags.writeable = False
+    index = np.ndarray((n,), dtype=np.int64, buffer=index_block.buf).view('datetime64[ns]')
+
+    date_index = pd.DatetimeIndex(index, name=handle['index_name'])
+    if handle['tz'] is not None:
+        date_index = date_index.tz_localize('UTC').tz_convert(handle['tz'])
+
+    df = pd.DataFrame(values, index=date_index, columns=handle['columns'], copy=False)
+    _attached[key] = ([values_block, index_block], df)
+    return df
+
+def share_array(array):
+    """
+    Place an array in shared memory, keeping its dtype and shape.
+
+    Returns:
+        tuple: (picklable handle for attach_array, SharedMemory block that the
+            caller must pass to release_blocks when done)
+    """
+    array = np.ascontiguousarray(array)
+    block = _copy_to_block(array)
+    return {'name': block.name, 'shape': array.shape, 'dtype': array.dtype.str}, block
+
+def attach_array(handle):
+    """
+    Read-only view of an array shared with share_array.
+    """
+    key = handle['name']
+    if key in _attached:
+        return _attached[key][1]
+
+    block = _open_block(key)
+    array = np.ndarray(handle['shape'], dtype=np.dtype(handle['dtype']), buffer=block.buf)
+    array.flags.writeable = False
+    _attached[key] = ([block], array)
+    return array
+
+def release_blocks(blocks):
+    """
+    Close and unlink shared memory blocks created by share_frame or share_array.
+    """
+    for block in blocks:
+        block.close()
+        block.unlink()
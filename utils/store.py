@@ -0,0 +1,314 @@
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+STORE_DIR = 'store'
+META_FILE = 'meta.json'
+INDEX_FILE = 'index.npy'
+BUILD_PREFIX = 'build-'
+
+def store_path(ticker, data_path='data'):
+    """
+    Directory holding the columnar cache of a ticker.
+    """
+    return os.path.join(data_path, STORE_DIR, ticker)
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+def _read_meta(path):
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+def is_store_current(ticker, data_path='data'):
+    """
+    Check whether the columnar cache of a ticker exists and matches its CSV.
+    """
+    csv_path = os.path.join(data_path, f"{ticker}.csv")
+    meta = _read_meta(store_path(ticker, data_path))
+    return meta is not None and os.path.exists(csv_path) and meta['source'] == _source_stamp(csv_path)
+
+def _commit_build(path, build, meta):
+    """
+    Publish a finished build by pointing the metadata file at its directory.
+
+    Replacing meta.json is atomic, so readers see either the previous build
+    or this one. The previous build is then deleted; readers that already
+    memory-mapped its files keep them until they are done.
+    """
+    previous = _read_meta(path)
+    meta['dir'] = os.path.basename(build)
+    tmp_path = os.path.join(build, META_FILE)
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    if previous is None:
+        return
+    if previous.get('dir'):
+        shutil.rmtree(os.path.join(path, previous['dir']), ignore_errors=True)
+    else:
+        # Stores written before builds had their own directory.
+        for file_name in [INDEX_FILE] + [column['file'] for column in previous['columns']]:
+            if os.path.exists(os.path.join(path, file_name)):
+                os.remove(os.path.join(path, file_name))
+
+def write_store(df, ticker, data_path='data', source=None):
+    """
+    Write a cleaned OHLCV DataFrame as one .npy file per column plus a sorted date index.
+
+    Every build goes to a new directory next to the current one and is only
+    published once complete (see _commit_build), so rebuilding never
+    touches files that readers may have memory-mapped.
+
+    Parameters:
+        df (pd.DataFrame): Numeric OHLCV data indexed by date
+        ticker (str): Ticker symbol
+        data_path (str): Folder where CSV files are stored
+        source (dict): Stamp of the CSV the data came from
+    """
+    path = store_path(ticker, data_path)
+    os.makedirs(path, exist_ok=True)
+    build = tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=path)
+    try:
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind='stable')
+
+        index = df.index
+        tz = str(index.tz) if getattr(index, 'tz', None) is not None else None
+        if tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        np.save(os.path.join(build, INDEX_FILE), index.values.astype('datetime64[ns]'))
+
+        columns = []
+        for i, column in enumerate(df.columns):
+            file_name = f"col{i}.npy"
+            np.save(os.path.join(build, file_name), df[column].to_numpy())
+            columns.append({'name': column, 'file': file_name})
+
+        _commit_build(path, build, {'source': source, 'tz': tz, 'index_name': df.index.name, 'columns': columns})
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+
+def build_store(ticker, data_path='data', chunk_size=None):
+    """
+    Parse a ticker's CSV once and cache it in columnar form.
+
+    Cleaning matches the CSV path of load_data: every column is coerced to
+    numeric and rows with any missing value are dropped.
+
+    With chunk_size, the CSV is parsed that many rows at a time and each
+    block is appended to the column files, so histories larger than memory
+    can be converted. This needs the CSV to be sorted by date, as written by
+    get_data; an unsorted file is converted in one piece instead.
+    """
+    csv_path = os.path.join(data_path, f"{ticker}.csv")
+    source = _source_stamp(csv_path)
+
+    if chunk_size is not None and _write_store_chunked(csv_path, ticker, data_path, chunk_size, source):
+        return
+
+    df = pd.read_csv(csv_path, parse_dates=['Date'], index_col='Date')
+    df = df.apply(pd.to_numeric, errors='coerce')
+    df.dropna(inplace=True)
+
+    write_store(df, ticker, data_path, source=source)
+
+def _write_store_chunked(csv_path, ticker, data_path, chunk_size, source):
+    """
+    Streaming version of write_store for build_store.
+
+    Blocks are appended to raw float64 files, which are then copied block by
+    block into the final .npy files. A column that parsed as integers in
+    every block is stored as int64, like the one-piece build would.
+
+    Returns:
+        bool: False if the CSV turned out not to be sorted by date
+    """
+    path = store_path(ticker, data_path)
+    os.makedirs(path, exist_ok=True)
+    build = tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=path)
+    try:
+        return _write_build_chunked(csv_path, build, path, chunk_size, source)
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+
+def _write_build_chunked(csv_path, build, path, chunk_size, source):
+    index_raw = os.path.join(build, 'index.raw')
+    raw_files = []
+    columns = None
+    integer = None
+    tz = None
+    index_name = None
+    last = None
+    rows = 0
+    in_order = True
+    try:
+        with open(index_raw, 'wb') as index_out:
+            for df in pd.read_csv(csv_path, parse_dates=['Date'], index_col='Date', chunksize=chunk_size):
+                df = df.apply(pd.to_numeric, errors='coerce')
+                df.dropna(inplace=True)
+                if columns is None:
+                    columns = list(df.columns)
+                    integer = [True] * len(columns)
+                    index_name = df.index.name
+                    raw_files = [open(os.path.join(build, f"col{i}.raw"), 'wb') for i in range(len(columns))]
+                if df.empty:
+                    continue
+
+                index = df.index
+                if getattr(index, 'tz', None) is not None:
+                    tz = str(index.tz)
+                    index = index.tz_convert('UTC').tz_localize(None)
+                index = index.values.astype('datetime64[ns]')
+                if not (np.all(index[1:] >= index[:-1]) and (last is None or index[0] >= last)):
+                    in_order = False
+                    break
+                last = index[-1]
+
+                index_out.write(index.tobytes())
+                for i, column in enumerate(columns):
+                    values = df[column].to_numpy()
+                    integer[i] = integer[i] and np.issubdtype(values.dtype, np.integer)
+                    raw_files[i].write(values.astype(np.float64).tobytes())
+                rows += len(df)
+    finally:
+        for f in raw_files:
+            f.close()
+
+    if columns is None or not in_order:
+        shutil.rmtree(build, ignore_errors=True)
+        return False
+
+    _copy_raw(index_raw, os.path.join(build, INDEX_FILE), 'datetime64[ns]', 'datetime64[ns]', rows, chunk_size)
+    meta_columns = []
+    for i, column in enumerate(columns):
+        file_name = f"col{i}.npy"
+        _copy_raw(os.path.join(build, f"col{i}.raw"), os.path.join(build, file_name), np.float64,
+                  np.int64 if integer[i] else np.float64, rows, chunk_size)
+        meta_columns.append({'name': column, 'file': file_name})
+
+    _commit_build(path, build, {'source': source, 'tz': tz, 'index_name': index_name, 'columns': meta_columns})
+    return True
+
+def _copy_raw(raw_path, npy_path, raw_dtype, dtype, rows, chunk_size):
+    out = np.lib.format.open_memmap(npy_path, mode='w+', dtype=dtype, shape=(rows,))
+    if rows:
+        raw = np.memmap(raw_path, dtype=raw_dtype, mode='r', shape=(rows,))
+        for start in range(0, rows, chunk_size):
+            out[start:start + chunk_size] = raw[start:start + chunk_size]
+        del raw
+    out.flush()
+    del out
+    os.remove(raw_path)
+
+def _to_index_value(date, tz):
+    ts = pd.Timestamp(date)
+    if tz is not None:
+        ts = ts.tz_localize(tz) if ts.tzinfo is None else ts
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    elif ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return np.datetime64(ts.to_datetime64(), 'ns')
+
+def _select_columns(meta, columns, ticker):
+    if columns is None:
+        return meta['columns']
+    by_name = {column['name']: column for column in meta['columns']}
+    missing = [name for name in columns if name not in by_name]
+    if missing:
+        raise KeyError(f"Columns {missing} not in the store of {ticker}")
+    return [by_name[name] for name in columns]
+
+def _open_store(ticker, data_path, columns, attempts=3):
+    """
+    Memory-map the date index and requested columns of a ticker's current build.
+
+    A rebuild can publish a new build and delete the one whose metadata was
+    just read before its files are opened; the metadata is then read again.
+
+    Returns:
+        tuple: (metadata, index, list of (column name, values))
+    """
+    path = store_path(ticker, data_path)
+    for attempt in range(attempts):
+        meta = _read_meta(path)
+        if meta is None:
+            raise FileNotFoundError(f"No columnar store for {ticker} at {path}")
+        build = os.path.join(path, meta.get('dir', ''))
+        try:
+            index = np.load(os.path.join(build, INDEX_FILE), mmap_mode='r')
+            values = [(column['name'], np.load(os.path.join(build, column['file']), mmap_mode='r'))
+                      for column in _select_columns(meta, columns, ticker)]
+        except FileNotFoundError:
+            if attempt == attempts - 1:
+                raise
+            continue
+        return meta, index, values
+
+def read_store(ticker, start_date=None, end_date=None, data_path='data', columns=None):
+    """
+    Read a date range of a ticker from its columnar cache.
+
+    The date index and the columns are memory mapped; the requested range is
+    located with a binary search on the index and only that slice of each
+    requested column is copied into the returned DataFrame.
+
+    Parameters:
+        ticker (str): Ticker symbol
+        start_date (str): Optional first date to include
+        end_date (str): Optional last date to include
+        data_path (str): Folder where CSV files are stored
+        columns (list): Optional subset of columns to read
+
+    Returns:
+        pd.DataFrame: Data with Date as index
+    """
+    meta, index, columns = _open_store(ticker, data_path, columns)
+    lo = 0 if start_date is None else int(np.searchsorted(index, _to_index_value(start_date, meta['tz']), side='left'))
+    hi = len(index) if end_date is None else int(np.searchsorted(index, _to_index_value(end_date, meta['tz']), side='right'))
+    hi = max(lo, hi)
+
+    date_index = pd.DatetimeIndex(np.array(index[lo:hi]), name=meta['index_name'])
+    if meta['tz'] is not None:
+        date_index = date_index.tz_localize('UTC').tz_convert(meta['tz'])
+
+    return pd.DataFrame({name: np.array(values[lo:hi]) for name, values in columns}, index=date_index)
+
+def iter_store(ticker, start_date=None, end_date=None, data_path='data', chunk_size=100_000, columns=None):
+    """
+    Read a date range of a ticker from its columnar cache in blocks of rows.
+
+    Like read_store, but yields consecutive DataFrames of at most chunk_size
+    rows, so only one block is in memory at a time.
+
+    Parameters:
+        ticker (str): Ticker symbol
+        start_date (str): Optional first date to include
+        end_date (str): Optional last date to include
+        data_path (str): Folder where CSV files are stored
+        chunk_size (int): Maximum rows per block
+        columns (list): Optional subset of columns to read
+
+    Yields:
+        pd.DataFrame: Consecutive blocks with Date as index
+    """
+    meta, index, columns = _open_store(ticker, data_path, columns)
+    lo = 0 if start_date is None else int(np.searchsorted(index, _to_index_value(start_date, meta['tz']), side='left'))
+    hi = len(index) if end_date is None else int(np.searchsorted(index, _to_index_value(end_date, meta['tz']), side='right'))
+
+    for start in range(lo, hi, chunk_size):
+        stop = min(start + chunk_size, hi)
+        date_index = pd.DatetimeIndex(np.array(index[start:stop]), name=meta['index_name'])
+        if meta['tz'] is not None:
+            date_index = date_index.tz_localize('UTC').tz_convert(meta['tz'])
+        yield pd.DataFrame({name: np.array(values[start:stop]) for name, values in columns}, index=date_index)
@@ -0,0 +1,99 @@
+import os
+import numpy as np
+import pandas as pd
+
+def _bars_per_year(freq):
+    try:
+        bar = pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+    except ValueError:
+        return 252
+    if bar >= pd.Timedelta(days=1):
+        return 252 / (bar / pd.Timedelta(days=1))
+    return 252 * (pd.Timedelta(hours=6.5) / bar)
+
+def generate_ohlcv(n_bars=2520, seed=0, start='2000-01-03', freq=None, initial_price=100.0,
+                   mu=0.05, sigma=0.2, regimes=None, switch_prob=0.01, periods_per_year=None):
+    """
+    Generate a seeded synthetic OHLCV series following geometric Brownian motion.
+
+    With regimes, the drift and volatility follow a Markov chain that leaves
+    its current regime with probability switch_prob on every bar, which gives
+    trending and choppy stretches for strategies to react to.
+
+    Parameters:
+        n_bars (int): Number of bars
+        seed (int): Random seed
+        start (str): First timestamp
+        freq (str): Bar frequency; defaults to business days, or minutes when
+            business days would run past pandas' date range
+        initial_price (float): Price before the first bar
+        mu (float): Annualized drift when regimes is None
+        sigma (float): Annualized volatility when regimes is None
+        regimes (list): Optional (mu, sigma) pairs to switch between
+        switch_prob (float): Per-bar probability of leaving the current regime
+        periods_per_year (float): Bars per year used to scale mu and sigma;
+            defaults to 252 trading days of 6.5 hours at the bar frequency
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close, Adj Close and Volume indexed by Date
+    """
+    rng = np.random.default_rng(seed)
+    if freq is None:
+        freq = 'B' if n_bars <= 50000 else 'min'
+    if periods_per_year is None:
+        periods_per_year = _bars_per_year(freq)
+
+    if regimes:
+        regimes = np.asarray(regimes, dtype=float)
+        switches = rng.random(n_bars) < switch_prob
+        # Each switch moves to one of the other regimes at random.
+        steps = np.where(switches, rng.integers(1, len(regimes), n_bars), 0) if len(regimes) > 1 else np.zeros(n_bars, dtype=int)
+        state = np.cumsum(steps) % len(regimes)
+        bar_mu, bar_sigma = regimes[state, 0], regimes[state, 1]
+    else:
+        bar_mu = np.full(n_bars, mu)
+        bar_sigma = np.full(n_bars, sigma)
+
+    dt = 1.0 / periods_per_year
+    log_returns = (bar_mu - 0.5 * bar_sigma ** 2) * dt + bar_sigma * np.sqrt(dt) * rng.standard_normal(n_bars)
+    close = initial_price * np.exp(np.cumsum(log_returns))
+
+    prev_close = np.concatenate([[initial_price], close[:-1]])
+    bar_vol = bar_sigma * np.sqrt(dt)
+    open_ = prev_close * np.exp(0.25 * bar_vol * rng.standard_normal(n_bars))
+    high = np.maximum(open_, close) * np.exp(0.5 * bar_vol * np.abs(rng.standard_normal(n_bars)))
+    low = np.minimum(open_, close) * np.exp(-0.5 * bar_vol * np.abs(rng.standard_normal(n_bars)))
+    volume = rng.lognormal(mean=13, sigma=0.5, size=n_bars).astype(np.int64)
+
+    index = pd.date_range(start=start, periods=n_bars, freq=freq, name='Date')
+    return pd.DataFrame({
+        'Adj Close': close,
+        'Close': close,
+        'High': high,
+        'Low': low,
+        'Open': open_,
+        'Volume': volume,
+    }, index=index)
+
+def generate_universe(n_tickers, n_bars=2520, seed=0, **kwargs):
+    """
+    Generate independent synthetic OHLCV series for several tickers.
+
+    Each ticker gets its own seed derived from seed, so adding tickers does
+    not change the existing ones.
+
+    Returns:
+        dict: Ticker name ('SYN0', 'SYN1', ...) -> DataFrame from generate_ohlcv
+    """
+    seeds = np.random.SeedSequence(seed).spawn(n_tickers)
+    return {f"SYN{i}": generate_ohlcv(n_bars, seed=int(s.generate_state(1)[0]), **kwargs)
+            for i, s in enumerate(seeds)}
+
+def write_csv(df, ticker, data_path='data'):
+    """
+    Save a DataFrame where load_data expects a ticker's CSV.
+    """
+    os.makedirs(data_path, exist_ok=True)
+    file_path = os.path.join(data_path, f"{ticker}.csv")
+    df.to_csv(file_path, index_label='Date')
+    return file_path
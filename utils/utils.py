@@ -1,48 +1,246 @@
+import json
 import os
-import yfinance as yf
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
+from utils.store import build_store, is_store_current, read_store
+from utils.profiling import instrument
 
-def get_data(tickers, start_date, end_date, save_path='data'):
+MANIFEST_FILE = 'manifest.json'
+# yf.download collects its results in module-global state that every call
+# resets, so concurrent calls from get_data's threads are serialized.
+_YFINANCE_LOCK = threading.Lock()
+# Columns a lean load keeps when none are requested: all the strategies trade on Close.
+LEAN_COLUMNS = ['Close']
+
+def yfinance_downloader(ticker, start_date, end_date):
+    """
+    Default downloader for get_data: daily OHLCV bars from Yahoo Finance.
+
+    Any callable with the same signature returning a DataFrame indexed by
+    date can be passed to get_data instead, e.g. a local fake source.
+    """
+    import yfinance as yf
+
+    with _YFINANCE_LOCK:
+        df = yf.download(ticker, start=start_date, end=end_date, auto_adjust=False)
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+def load_manifest(save_path='data'):
+    """
+    Load the date ranges covered by each cached ticker, as {ticker: [[start, end], ...]}.
+
+    Ranges are half-open like yfinance's start/end arguments.
+    """
+    manifest_path = os.path.join(save_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def _save_manifest(manifest, save_path):
+    manifest_path = os.path.join(save_path, MANIFEST_FILE)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted((pd.Timestamp(s), pd.Timestamp(e)) for s, e in ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [[s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')] for s, e in merged]
+
+def missing_ranges(covered, start_date, end_date):
+    """
+    Parts of [start_date, end_date) not covered by any of the given ranges.
+
+    Parameters:
+        covered (list): Covered [start, end) date ranges
+        start_date (str): Start of the requested range
+        end_date (str): End of the requested range (exclusive)
+
+    Returns:
+        list: Missing (start, end) pairs of 'YYYY-MM-DD' strings
+    """
+    cursor = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    gaps = []
+    for range_start, range_end in _merge_ranges(covered):
+        range_start, range_end = pd.Timestamp(range_start), pd.Timestamp(range_end)
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            gaps.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return [(s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')) for s, e in gaps]
+
+def _read_csv(file_path):
+    return pd.read_csv(file_path, parse_dates=['Date'], index_col='Date')
+
+def _csv_coverage(file_path):
+    """
+    Coverage of a CSV cached before the manifest existed, taken from its first and last dates.
+    """
+    index = _read_csv(file_path).index
+    if index.empty:
+        return []
+    return [[index.min().strftime('%Y-%m-%d'), (index.max() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')]]
+
+def _has_no_bars(gap_start, gap_end, known):
+    """
+    Whether an empty download of [gap_start, gap_end) is plausibly complete.
+
+    That is the case when the range holds no business days, or lies
+    entirely before the first or after the last bar known for the ticker
+    (pre-listing or delisted dates).
+    """
+    if len(pd.bdate_range(gap_start, gap_end, inclusive='left')) == 0:
+        return True
+    if known is None:
+        return False
+    first, last = known
+    return pd.Timestamp(gap_end) <= first or pd.Timestamp(gap_start) > last
+
+def _update_ticker(ticker, gaps, save_path, downloader):
+    """
+    Download the missing ranges of one ticker and merge them into its CSV.
+
+    A range counts as fetched when the downloader returned rows for it, or
+    returned nothing for a range that cannot have bars (see _has_no_bars),
+    such as a weekend or dates before the first known bar. A range whose
+    download raised, or came back empty where bars were expected (yfinance
+    returns an empty frame on errors and rate limits), stays open and is
+    tried again on the next call.
+
+    Returns:
+        list: Ranges that were fetched successfully
+    """
+    file_path = os.path.join(save_path, f"{ticker}.csv")
+    existing = _read_csv(file_path) if os.path.exists(file_path) else None
+    frames = []
+    fetched = []
+    empty = []
+    for gap_start, gap_end in gaps:
+        print(f"Downloading {ticker} {gap_start} to {gap_end}...")
+        try:
+            df = downloader(ticker, gap_start, gap_end)
+        except Exception as e:
+            print(f"Failed to download {ticker} {gap_start} to {gap_end}: {e}")
+            continue
+        if df is not None and not df.empty:
+            frames.append(df)
+            fetched.append([gap_start, gap_end])
+        else:
+            empty.append([gap_start, gap_end])
+
+    indexes = [df.index for df in frames] + ([existing.index] if existing is not None and not existing.empty else [])
+    known = (min(i.min() for i in indexes), max(i.max() for i in indexes)) if indexes else None
+    fetched += [gap for gap in empty if _has_no_bars(*gap, known)]
+
+    if not frames:
+        if existing is None:
+            print(f"No data found for {ticker}")
+        return fetched
+
+    if existing is not None:
+        frames.insert(0, existing)
+    df = pd.concat(frames)
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+
+    tmp_path = file_path + '.tmp'
+    df.to_csv(tmp_path, index_label='Date')
+    os.replace(tmp_path, file_path)
+    print(f"Saved {ticker} to {file_path}")
+    return fetched
+
+@instrument('data_check')
+def get_data(tickers, start_date, end_date, save_path='data', downloader=None, max_workers=8):
     """
     Download daily OHLCV data for a list of tickers and save to CSV files.
 
+    A manifest in save_path records which date ranges each ticker's CSV
+    covers. Only the parts of the requested range that are not covered yet
+    are downloaded and merged into the existing file, and tickers are
+    fetched concurrently on a bounded thread pool.
+
     Parameters:
         tickers (list): List of ticker symbols
         start_date (str): Start date in 'YYYY-MM-DD' format
-        end_date (str): End date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format (exclusive, as in yfinance)
         save_path (str): Directory where CSV files will be saved
+        downloader (callable): Function (ticker, start_date, end_date) -> DataFrame,
+            defaults to yfinance_downloader
+        max_workers (int): Maximum number of concurrent downloads
     """
+    if downloader is None:
+        downloader = yfinance_downloader
+
     if not os.path.exists(save_path):
         os.makedirs(save_path)
 
-    for ticker in tickers:
+    manifest = load_manifest(save_path)
+    # Dates after today cannot have data yet, so they are never marked as covered.
+    today = pd.Timestamp.today().normalize().strftime('%Y-%m-%d')
+
+    pending = {}
+    for ticker in dict.fromkeys(tickers):
         file_path = os.path.join(save_path, f"{ticker}.csv")
+        if ticker not in manifest and os.path.exists(file_path):
+            manifest[ticker] = _csv_coverage(file_path)
 
-        if os.path.exists(file_path):
-            print(f"{ticker} data already exists. Skipping download.")
+        gaps = missing_ranges(manifest.get(ticker, []), start_date, end_date)
+        if not gaps:
+            print(f"{ticker} data already covers {start_date} to {end_date}. Skipping download.")
             continue
+        pending[ticker] = gaps
 
-        print(f"Downloading {ticker}...")
-        df = yf.download(ticker, start=start_date, end=end_date, auto_adjust=False)
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+            futures = {pool.submit(_update_ticker, ticker, gaps, save_path, downloader): ticker
+                       for ticker, gaps in pending.items()}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    print(f"Failed to download {ticker}: {e}")
+                    continue
+                fetched = [[s, min(e, today)] for s, e in fetched if s < today]
+                manifest[ticker] = _merge_ranges(manifest.get(ticker, []) + fetched)
 
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+    _save_manifest(manifest, save_path)
 
-        if not df.empty:
-            df.to_csv(file_path, index_label='Date')
-            print(f"Saved {ticker} to {file_path}")
-        else:
-            print(f"No data found for {ticker}")
-
-def load_data(ticker, start_date=None, end_date=None, data_path='data'):
+@instrument('load')
+def load_data(ticker, start_date=None, end_date=None, data_path='data', use_store=True, columns=None, lean=False):
     """
     Load OHLCV data for a ticker from CSV and return a formatted DataFrame.
 
+    By default the CSV is parsed once into a memory-mapped columnar store
+    (see utils.store), which is rebuilt whenever the CSV changes; later
+    calls only read the requested date range and columns from it.
+
     Parameters:
         ticker (str): Ticker symbol
         start_date (str): Optional start date to filter data
         end_date (str): Optional end date to filter data
         data_path (str): Folder where CSV files are stored
+        use_store (bool): Read through the columnar store instead of parsing the CSV
+        columns (list): Optional subset of columns to return
+        lean (bool): Return only `columns` (default LEAN_COLUMNS) as float32,
+            for large runs where half the memory matters more than the last
+            digits of precision
 
     Returns:
         pd.DataFrame: Cleaned DataFrame with Date as index
@@ -52,15 +250,58 @@ def load_data(ticker, start_date=None, end_date=None, data_path='data'):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Data file for {ticker} not found at {file_path}")
 
-    df = pd.read_csv(file_path, parse_dates=['Date'], index_col='Date')
+    if lean and columns is None:
+        columns = LEAN_COLUMNS
+
+    if use_store:
+        if not is_store_current(ticker, data_path):
+            build_store(ticker, data_path)
+        df = read_store(ticker, start_date, end_date, data_path, columns=columns)
+    else:
+        df = pd.read_csv(file_path, parse_dates=['Date'], index_col='Date')
+
+        df = df.apply(pd.to_numeric, errors='coerce')
+        df.dropna(inplace=True)
+
+        # Optional: filter by date range
+        if start_date:
+            df = df[df.index >= start_date]
+        if end_date:
+            df = df[df.index <= end_date]
+        if columns is not None:
+            df = df[columns]
+
+    if lean:
+        df = df.astype({column: 'float32' for column in df.columns if df[column].dtype == 'float64'})
+    return df
+
+def load_panel(tickers, start_date=None, end_date=None, data_path='data', column='Close', lean=False):
+    """
+    Load one column for many tickers as an aligned dates x tickers DataFrame.
+
+    Dates are the union of every ticker's dates; a ticker is NaN on dates
+    it has no bar for. Tickers without a data file are skipped.
 
-    df = df.apply(pd.to_numeric, errors='coerce')
-    df.dropna(inplace=True)
+    Parameters:
+        tickers (list): List of ticker symbols
+        start_date (str): Optional start date to filter data
+        end_date (str): Optional end date to filter data
+        data_path (str): Folder where CSV files are stored
+        column (str): OHLCV column to load
+        lean (bool): Load prices as float32
 
-    # Optional: filter by date range
-    if start_date:
-        df = df[df.index >= start_date]
-    if end_date:
-        df = df[df.index <= end_date]
+    Returns:
+        pd.DataFrame: One column per loaded ticker, Date as index
+    """
+    series = {}
+    for ticker in dict.fromkeys(tickers):
+        try:
+            series[ticker] = load_data(ticker, start_date, end_date, data_path, columns=[column], lean=lean)[column]
+        except FileNotFoundError:
+            print(f"No data for {ticker}. Skipping.")
 
-    return df
\ No newline at end of file
+    if not series:
+        return pd.DataFrame()
+    panel = pd.concat(series, axis=1, sort=True)
+    panel.index.name = 'Date'
+    return panel
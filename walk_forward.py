@@ -0,0 +1,62 @@
+import argparse
+import os
+from utils.utils import load_data, get_data
+from optimization.sweep import parameter_grid
+from optimization.walk_forward import walk_forward
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward parameter optimization for a single-asset strategy")
+    parser.add_argument('--ticker', type=str, required=True, help='Ticker symbol')
+    parser.add_argument('--start', type=str, required=True, help='Start date in YYYY-MM-DD format')
+    parser.add_argument('--end', type=str, required=True, help='End date in YYYY-MM-DD format')
+    parser.add_argument('--strategy', type=str, choices=['trend_following', 'rsi', 'bollinger'], default='trend_following')
+    parser.add_argument('--initial-cash', type=float, default=10000)
+    parser.add_argument('--short-window', type=int, nargs='+', default=[10])
+    parser.add_argument('--long-window', type=int, nargs='+', default=[30])
+    parser.add_argument('--rsi-period', type=int, nargs='+', default=[14])
+    parser.add_argument('--rsi-lower', type=int, nargs='+', default=[30])
+    parser.add_argument('--rsi-upper', type=int, nargs='+', default=[70])
+    parser.add_argument('--bollinger-window', type=int, nargs='+', default=[20])
+    parser.add_argument('--bollinger-std', type=float, nargs='+', default=[2.0])
+    parser.add_argument('--cost-bps', type=float, default=0.001, help='Transaction cost per trade (e.g. 0.001 = 10 bps)')
+    parser.add_argument('--folds', type=int, default=5, help='Number of train/test folds (default: 5)')
+    parser.add_argument('--train-bars', type=int, help='Bars per train window (default: the test window size)')
+    parser.add_argument('--anchored', action='store_true', help='Grow train windows from the start instead of rolling them')
+    parser.add_argument('--objective', type=str, default='Sharpe Ratio', help='Metric maximised on each train window')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: all cores)')
+    parser.add_argument('--output', type=str, help='Optional CSV path for the stitched out-of-sample equity curve')
+
+    args = parser.parse_args()
+
+    if args.strategy == 'trend_following':
+        grid = parameter_grid(short_window=args.short_window, long_window=args.long_window)
+    elif args.strategy == 'rsi':
+        grid = parameter_grid(period=args.rsi_period, lower=args.rsi_lower, upper=args.rsi_upper)
+    elif args.strategy == 'bollinger':
+        grid = parameter_grid(window=args.bollinger_window, num_std=args.bollinger_std)
+
+    print(f"Checking data for {args.ticker}...")
+    get_data([args.ticker], args.start, args.end)
+    print(f"Loading data for {args.ticker}...")
+    df = load_data(args.ticker, args.start, args.end)
+
+    mode = 'anchored' if args.anchored else 'rolling'
+    print(f"Walking {len(grid)} parameter combinations forward over {args.folds} {mode} folds...")
+    folds, equity, metrics = walk_forward(
+        df, args.strategy, grid, n_folds=args.folds, train_size=args.train_bars, anchored=args.anchored,
+        objective=args.objective, initial_cash=args.initial_cash, cost_bps=args.cost_bps, workers=args.workers)
+
+    print("\n--- Folds ---")
+    print(folds.to_string(index=False, float_format="%.2f"))
+
+    print("\n--- Out-of-Sample Performance ---")
+    for k, v in metrics.items():
+        print(f"{k}: {v}")
+
+    if args.output:
+        equity.to_csv(args.output, index_label='Date')
+        print(f"Saved out-of-sample equity curve to {args.output}")
+
+if __name__ == "__main__":
+    main()